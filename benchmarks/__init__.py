@@ -0,0 +1,6 @@
+"""Offline benchmarks of the wrapper against a local stand-in server.
+
+Run them with:
+
+    python -m benchmarks.run --help
+"""
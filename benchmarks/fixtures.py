@@ -0,0 +1,242 @@
+"""Response fixtures for every CryptoCompareMethod.
+
+Recorded responses are read from a directory holding one <METHOD>.json per
+method, see record(). Methods without a recorded response get a
+synthetic one shaped like the responses of the API.
+"""
+import json
+import os
+import random
+
+from cryptocompareapi.methods import CryptoCompareMethod
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_FROM_SYMBOLS = ["BTC", "ETH", "XRP", "LTC", "BCH", "ADA", "DOT", "SOL"]
+_TO_SYMBOLS = ["USD", "EUR", "BTC"]
+
+
+def _bars(count, step, rng):
+    end = 1700000000 // step * step
+    bars = []
+    price = 100.0
+    for time in range(end - (count - 1) * step, end + 1, step):
+        close = price * (1 + rng.gauss(0, 0.01))
+        bars.append({"time": time, "open": price,
+                     "high": max(price, close) * 1.005,
+                     "low": min(price, close) * 0.995, "close": close,
+                     "volumefrom": rng.uniform(10, 1000),
+                     "volumeto": rng.uniform(1e4, 1e6)})
+        price = close
+    return {"Response": "Success", "Type": 100, "Aggregated": False,
+            "Data": bars, "TimeTo": end, "TimeFrom": bars[0]["time"],
+            "FirstValueInArray": True,
+            "ConversionType": {"type": "direct", "conversionSymbol": ""}}
+
+
+def _ticker(from_symbol, to_symbol, rng):
+    price = rng.uniform(0.1, 50000)
+    return {"TYPE": "5", "MARKET": "CCCAGG", "FROMSYMBOL": from_symbol,
+            "TOSYMBOL": to_symbol, "FLAGS": "4", "PRICE": price,
+            "LASTUPDATE": 1700000000, "LASTVOLUME": 0.01,
+            "LASTVOLUMETO": price / 100, "LASTTRADEID": "1234567",
+            "VOLUMEDAY": 1000.0, "VOLUMEDAYTO": price * 1000,
+            "VOLUME24HOUR": 2000.0, "VOLUME24HOURTO": price * 2000,
+            "OPENDAY": price, "HIGHDAY": price * 1.02, "LOWDAY": price * 0.98,
+            "OPEN24HOUR": price, "HIGH24HOUR": price * 1.03,
+            "LOW24HOUR": price * 0.97, "LASTMARKET": "Binance",
+            "CHANGE24HOUR": price * 0.01, "CHANGEPCT24HOUR": 1.0,
+            "CHANGEDAY": price * 0.005, "CHANGEPCTDAY": 0.5,
+            "SUPPLY": 19000000, "MKTCAP": price * 19000000,
+            "TOTALVOLUME24H": 50000.0, "TOTALVOLUME24HTO": price * 50000}
+
+
+def _display(ticker):
+    return {key: "$ {:,.2f}".format(value) if isinstance(value, float)
+            else str(value) for key, value in ticker.items()}
+
+
+def _full(rng):
+    raw = {f: {t: _ticker(f, t, rng) for t in _TO_SYMBOLS}
+           for f in _FROM_SYMBOLS}
+    display = {f: {t: _display(ticker) for t, ticker in tickers.items()}
+               for f, tickers in raw.items()}
+    return {"RAW": raw, "DISPLAY": display}
+
+
+def _coins(count):
+    data = {}
+    for i in range(count):
+        symbol = "C%d" % i
+        data[symbol] = {
+            "Id": str(1000 + i), "Url": "/coins/%s/overview" % symbol.lower(),
+            "ImageUrl": "/media/%d/%s.png" % (i, symbol.lower()),
+            "Name": symbol, "Symbol": symbol, "CoinName": "Coin %d" % i,
+            "FullName": "Coin %d (%s)" % (i, symbol), "Algorithm": "SHA256",
+            "ProofType": "PoW", "FullyPremined": "0",
+            "TotalCoinSupply": "21000000", "PreMinedValue": "N/A",
+            "TotalCoinsFreeFloat": "N/A", "SortOrder": str(i),
+            "Sponsored": False, "IsTrading": True}
+    return {"Response": "Success", "Message": "Coin list succesfully "
+            "returned!", "BaseImageUrl": "https://www.cryptocompare.com",
+            "BaseLinkUrl": "https://www.cryptocompare.com", "Data": data,
+            "Type": 100}
+
+
+def _exchanges(count, rng):
+    symbols = ["C%d" % i for i in range(300)] + _FROM_SYMBOLS
+    return {"Exchange%d" % i: {f: rng.sample(_TO_SYMBOLS, 2)
+                               for f in rng.sample(symbols, 100)}
+            for i in range(count)}
+
+
+def _articles(count):
+    return [{"id": str(100000 - i), "guid": "https://news/%d" % i,
+             "published_on": 1700000000 - 60 * i,
+             "imageurl": "https://images/%d.png" % i,
+             "title": "Article %d" % i, "url": "https://news/%d" % i,
+             "source": "coindesk", "body": "Lorem ipsum " * 40,
+             "tags": "BTC|Market", "lang": "EN",
+             "categories": "BTC|Trading"} for i in range(count)]
+
+
+def synthesize(seed=0):
+    """Create synthetic fixtures of every method.
+
+    Returns:
+        { <CryptoCompareMethod>: <decoded response> }
+    """
+    rng = random.Random(seed)
+    top = [{"exchange": "Exchange%d" % i, "fromSymbol": "BTC",
+            "toSymbol": "USD", "volume24h": 1e4 / (i + 1),
+            "volume24hTo": 1e8 / (i + 1)} for i in range(5)]
+    return {
+        CryptoCompareMethod.PRICE: {t: rng.uniform(1, 5e4)
+                                    for t in _TO_SYMBOLS},
+        CryptoCompareMethod.PRICE_MULT: {
+            f: {t: rng.uniform(1, 5e4) for t in _TO_SYMBOLS}
+            for f in _FROM_SYMBOLS},
+        CryptoCompareMethod.PRICE_MULTI_FULL: _full(rng),
+        CryptoCompareMethod.GENERATE_AVERAGE: {
+            "RAW": _ticker("BTC", "USD", rng),
+            "DISPLAY": _display(_ticker("BTC", "USD", rng))},
+        CryptoCompareMethod.HISTO_DAY: _bars(31, 86400, rng),
+        CryptoCompareMethod.HISTO_HOUR: _bars(2001, 3600, rng),
+        CryptoCompareMethod.HISTO_MINUTE: _bars(2001, 60, rng),
+        CryptoCompareMethod.HISTO_DAY_TIMESTAMP: {"BTC": {"USD": 36500.2}},
+        CryptoCompareMethod.HISTO_DAY_AVERAGE: {
+            "USD": 36521.1, "ConversionType": {"type": "direct",
+                                               "conversionSymbol": ""}},
+        CryptoCompareMethod.TOP_EXCHANGES: {"Response": "Success",
+                                            "Data": top},
+        CryptoCompareMethod.TOP_EXCHANGES_FULL: {
+            "Response": "Success",
+            "Data": {"Exchanges": [_ticker("BTC", "USD", rng)
+                                   for _ in range(5)],
+                     "AggregatedData": _ticker("BTC", "USD", rng)}},
+        CryptoCompareMethod.TOP_VOLUMES: {
+            "Response": "Success",
+            "Data": [{"SYMBOL": "C%d" % i, "SUPPLY": 1e6,
+                      "VOLUME24HOURTO": 1e8 / (i + 1)} for i in range(21)]},
+        CryptoCompareMethod.TOP_PAIRS: {"Response": "Success", "Data": top},
+        CryptoCompareMethod.TOP_COINS: {
+            "Message": "Success", "Type": 100,
+            "Data": [{"CoinInfo": {"Name": "C%d" % i},
+                      "ConversionInfo": {"TotalVolume24H": 1e8 / (i + 1)}}
+                     for i in range(10)]},
+        CryptoCompareMethod.SUBS_WATCHLIST: {
+            f: {"Subs": ["5~CCCAGG~%s~USD" % f], "RAW": _ticker(f, "USD",
+                                                                 rng)}
+            for f in _FROM_SYMBOLS},
+        CryptoCompareMethod.SUBS_BY_PAIR: {
+            t: {"TRADES": ["0~Binance~BTC~%s" % t],
+                "CURRENT": ["2~Binance~BTC~%s" % t],
+                "CURRENTAGG": "5~CCCAGG~BTC~%s" % t} for t in _TO_SYMBOLS},
+        CryptoCompareMethod.LIST_NEWS_PROVIDER: [
+            {"key": "source%d" % i, "name": "Source %d" % i, "lang": "EN",
+             "img": "https://images/source%d.png" % i} for i in range(30)],
+        CryptoCompareMethod.LATEST_NEWS_ARTICLES: _articles(50),
+        CryptoCompareMethod.LIST_EXCHANGES: _exchanges(200, rng),
+        CryptoCompareMethod.LIST_COINS: _coins(5000),
+        CryptoCompareMethod.RATE_LIMIT: {
+            "Response": "Success", "Message": "",
+            "Hour": {"CallsMade": {"Histo": 10, "Price": 100, "News": 1,
+                                   "Strict": 0},
+                     "CallsLeft": {"Histo": 7990, "Price": 99900,
+                                   "News": 99999, "Strict": 500}},
+            "Minute": {"CallsMade": {"Histo": 2, "Price": 10, "News": 0,
+                                     "Strict": 0},
+                       "CallsLeft": {"Histo": 298, "Price": 1990,
+                                     "News": 2000, "Strict": 20}},
+            "Second": {"CallsMade": {"Histo": 0, "Price": 1, "News": 0,
+                                     "Strict": 0},
+                       "CallsLeft": {"Histo": 15, "Price": 49, "News": 50,
+                                     "Strict": 1}}},
+    }
+
+
+def load(directory=FIXTURE_DIR, seed=0):
+    """Get the encoded fixture of every method.
+
+    Recorded responses in directory take precedence over synthetic ones.
+
+    Returns:
+        { <CryptoCompareMethod>: <body as bytes> }
+    """
+    fixtures = {method: json.dumps(response).encode("utf-8")
+                for method, response in synthesize(seed).items()}
+    for method in CryptoCompareMethod:
+        path = os.path.join(directory, method.name + ".json")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                fixtures[method] = f.read()
+    return fixtures
+
+
+def record(client, directory=FIXTURE_DIR):
+    """Record a response of every method from the API.
+
+    Args:
+        client (CryptoCompare): A client using the real API
+        directory (str): Directory to write the <METHOD>.json files to
+    """
+    calls = {
+        CryptoCompareMethod.PRICE: lambda: client.single_symbol_price(
+            "BTC", _TO_SYMBOLS),
+        CryptoCompareMethod.PRICE_MULT: lambda: client.multiple_symbols_price(
+            _FROM_SYMBOLS, _TO_SYMBOLS),
+        CryptoCompareMethod.PRICE_MULTI_FULL:
+            lambda: client.multiple_symbols_full_data(_FROM_SYMBOLS,
+                                                      _TO_SYMBOLS),
+        CryptoCompareMethod.GENERATE_AVERAGE:
+            lambda: client.generate_custom_average("BTC", "USD", "Kraken"),
+        CryptoCompareMethod.HISTO_DAY: lambda: client.historical_daily(
+            "BTC", "USD"),
+        CryptoCompareMethod.HISTO_HOUR: lambda: client.historical_hourly(
+            "BTC", "USD", limit=2000),
+        CryptoCompareMethod.HISTO_MINUTE: lambda: client.historical_minute(
+            "BTC", "USD", limit=2000),
+        CryptoCompareMethod.HISTO_DAY_TIMESTAMP:
+            lambda: client.historical_day_timestamp("BTC", "USD"),
+        CryptoCompareMethod.HISTO_DAY_AVERAGE:
+            lambda: client.historical_day_average("BTC", "USD"),
+        CryptoCompareMethod.TOP_EXCHANGES:
+            lambda: client.top_exchanges_volume("BTC", "USD"),
+        CryptoCompareMethod.TOP_EXCHANGES_FULL:
+            lambda: client.top_exchange_full("BTC", "USD"),
+        CryptoCompareMethod.TOP_VOLUMES: lambda: client.top_volumes("USD"),
+        CryptoCompareMethod.TOP_PAIRS: lambda: client.top_pairs("BTC"),
+        CryptoCompareMethod.TOP_COINS: lambda: client.top_total_volume("USD"),
+        CryptoCompareMethod.SUBS_WATCHLIST: lambda: client.subs_watchlist(
+            _FROM_SYMBOLS, "USD"),
+        CryptoCompareMethod.SUBS_BY_PAIR: lambda: client.subs_by_pair("BTC"),
+        CryptoCompareMethod.LIST_NEWS_PROVIDER: client.list_news_provider,
+        CryptoCompareMethod.LATEST_NEWS_ARTICLES: client.latest_news_articles,
+        CryptoCompareMethod.LIST_EXCHANGES: client.list_exchanges,
+        CryptoCompareMethod.LIST_COINS: client.list_coins,
+        CryptoCompareMethod.RATE_LIMIT: client.rate_limits,
+    }
+    os.makedirs(directory, exist_ok=True)
+    for method, call in calls.items():
+        with open(os.path.join(directory, method.name + ".json"), "w") as f:
+            json.dump(call(), f)
@@ -0,0 +1,112 @@
+"""A local stand-in for the CryptoCompare API replaying fixtures."""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from . import fixtures as _fixtures
+
+
+class MockServer(object):
+    """Serves the fixture of a method on its path, ignoring the params.
+
+    Latency and errors can be injected: every request is delayed by latency
+    plus a uniformly distributed jitter, and fails with error_status at the
+    rate error_rate.
+
+    Use it as context manager and point the client at its url:
+
+        with MockServer() as server:
+            cc = CryptoCompare("bench", base_url=server.url)
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, seed=0):
+        """Create an instance.
+
+        Args:
+            fixtures (dict<CryptoCompareMethod, bytes>): The bodies to serve.
+                Default fixtures.load()
+            latency (dbl): Seconds every response is delayed
+            jitter (dbl): Maximum additional random delay in seconds
+            error_rate (dbl): Share of requests failing, between 0 and 1
+            error_status (int): HTTP status of failing requests
+            seed (int): Seed of the random injection
+        """
+        if fixtures is None:
+            fixtures = _fixtures.load()
+        self.bodies = {method.path: body for method, body in fixtures.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                           self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """The base url of the server."""
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop the server."""
+        self.stop()
+
+    def _respond(self, path):
+        """Get the status and body of a request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            return self.error_status, b"{}"
+        body = self.bodies.get(path)
+        if body is None:
+            return 404, b'{"Response": "Error", "Message": "Unknown path"}'
+        return 200, body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, body = server._respond(urlsplit(self.path).path)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
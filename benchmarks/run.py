@@ -0,0 +1,195 @@
+"""Measure the wrapper against the local stand-in server.
+
+Reports throughput and p50/p99 latency of wrapper methods under
+sequential, threaded and async load, and the parse time and memory of
+every payload type. Responses are never served from the cache.
+
+Usage:
+    python -m benchmarks.run [--calls N] [--threads N] [--latency S]
+                             [--error-rate R] [--json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptocompareapi import (CryptoCompare, CryptoCompareError, HttpError,
+                              TimeoutException)
+from cryptocompareapi.columnar import parse_ohlcv
+from cryptocompareapi.decoding import json_decoder, orjson, orjson_decoder
+
+from . import fixtures
+from .mockserver import MockServer
+
+_SYMBOLS = ["C%d" % i for i in range(500)]
+
+WORKLOADS = {
+    "single_symbol_price": lambda cc: cc.single_symbol_price(
+        "BTC", ["USD", "EUR"]),
+    "multiple_symbols_price": lambda cc: cc.multiple_symbols_price(
+        ["BTC", "ETH"], ["USD", "EUR"]),
+    "multiple_symbols_full_data": lambda cc: cc.multiple_symbols_full_data(
+        ["BTC", "ETH"], ["USD", "EUR"]),
+    "multiple_symbols_price_chunked": lambda cc: cc.multiple_symbols_price(
+        _SYMBOLS, ["USD"]),
+    "historical_minute": lambda cc: cc.historical_minute(
+        "BTC", "USD", limit=2000),
+    "historical_minute_columnar": lambda cc: cc.historical_minute(
+        "BTC", "USD", limit=2000, columnar=True),
+    "top_pairs": lambda cc: cc.top_pairs("BTC"),
+}
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1,
+                             int(q * len(sorted_values)))]
+
+
+def _summary(latencies, elapsed, errors):
+    latencies.sort()
+    return {"calls": len(latencies), "errors": errors,
+            "throughput": len(latencies) / elapsed if elapsed else None,
+            "p50_ms": _percentile(latencies, 0.5) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000}
+
+
+def _timed(call, client):
+    start = time.perf_counter()
+    try:
+        call(client)
+        error = 0
+    except (HttpError, TimeoutException, CryptoCompareError):
+        error = 1
+    return time.perf_counter() - start, error
+
+
+def bench_sequential(client, call, calls):
+    """Perform calls one after another."""
+    start = time.perf_counter()
+    results = [_timed(call, client) for _ in range(calls)]
+    return _summary([r[0] for r in results], time.perf_counter() - start,
+                    sum(r[1] for r in results))
+
+
+def bench_threaded(client, call, calls, threads):
+    """Perform calls on a thread pool sharing the client."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: _timed(call, client),
+                                    range(calls)))
+    return _summary([r[0] for r in results], time.perf_counter() - start,
+                    sum(r[1] for r in results))
+
+
+def bench_async(url, call, calls, concurrency):
+    """Perform calls concurrently with the asyncio client."""
+    from cryptocompareapi.aio import AsyncCryptoCompare
+
+    async def timed(client):
+        start = time.perf_counter()
+        try:
+            await call(client)
+            error = 0
+        except (HttpError, TimeoutException, CryptoCompareError):
+            error = 1
+        return time.perf_counter() - start, error
+
+    async def run():
+        async with AsyncCryptoCompare("bench", base_url=url, cache=False,
+                                      max_concurrency=concurrency) as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *[timed(client) for _ in range(calls)])
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    return _summary([r[0] for r in results], elapsed,
+                    sum(r[1] for r in results))
+
+
+def bench_parsing(bodies, repeat):
+    """Measure the parse time and the memory held by the decoded payloads."""
+    decoders = {"json": json_decoder}
+    if orjson is not None:
+        decoders["orjson"] = orjson_decoder
+    results = {}
+    for method, body in bodies.items():
+        parsers = dict(decoders)
+        if method.name.startswith("HISTO_") and b'"Data": [' in body:
+            parsers["columnar"] = parse_ohlcv
+        for name, parse in parsers.items():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parse(body)
+            elapsed = (time.perf_counter() - start) / repeat
+            tracemalloc.start()
+            result = parse(body)
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del result
+            results["%s/%s" % (method.name, name)] = {
+                "bytes": len(body), "parse_ms": elapsed * 1000,
+                "memory_bytes": size}
+    return results
+
+
+def main(argv=None):
+    """Run the benchmarks and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--parse-repeat", type=int, default=5)
+    parser.add_argument("--fixtures", default=fixtures.FIXTURE_DIR)
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    bodies = fixtures.load(args.fixtures)
+    results = {"load": {}, "parse": bench_parsing(bodies, args.parse_repeat)}
+    with MockServer(bodies, latency=args.latency, jitter=args.jitter,
+                    error_rate=args.error_rate) as server:
+        with CryptoCompare("bench", base_url=server.url, cache=False,
+                           max_workers=args.threads) as client:
+            for name, call in WORKLOADS.items():
+                results["load"][name] = {
+                    "sequential": bench_sequential(client, call, args.calls),
+                    "threaded": bench_threaded(client, call, args.calls,
+                                               args.threads),
+                }
+        try:
+            for name, call in WORKLOADS.items():
+                results["load"][name]["async"] = bench_async(
+                    server.url, call, args.calls, args.threads)
+        except ImportError:
+            pass  # aiohttp is not installed
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print("%-34s %-10s %8s %7s %10s %9s %9s" % (
+        "workload", "mode", "calls", "errors", "calls/s", "p50 ms",
+        "p99 ms"))
+    for name, modes in results["load"].items():
+        for mode, r in modes.items():
+            print("%-34s %-10s %8d %7d %10.1f %9.2f %9.2f" % (
+                name, mode, r["calls"], r["errors"], r["throughput"],
+                r["p50_ms"], r["p99_ms"]))
+    print()
+    print("%-40s %10s %10s %12s" % ("payload/parser", "bytes", "parse ms",
+                                    "memory"))
+    for name, r in results["parse"].items():
+        print("%-40s %10d %10.3f %12d" % (name, r["bytes"], r["parse_ms"],
+                                          r["memory_bytes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,70 @@
-"""An API package for the public CryptoCompare API."""
-from .wrapper import CryptoCompare
+"""An API package for the public CryptoCompare API.
+
+The classes and functions are imported on first access, so importing the
+package does not load the HTTP libraries and optional dependencies a
+program does not use.
+"""
+import importlib
+
 from .methods import CryptoCompareMethod
+from .methods import RateLimitGroup
 from .exceptions import HttpError
 from .exceptions import TimeoutException
 from .exceptions import CryptoCompareError
-__all__ = ['wrapper']
+from .exceptions import CircuitOpenError
+
+# The module of every lazily imported name
+_LAZY = {
+    "CryptoCompare": "wrapper",
+    "AsyncCryptoCompare": "aio",
+    "Transport": "transport",
+    "RequestsTransport": "transport",
+    "backfill": "backfilling",
+    "historical_prices": "points",
+    "TTLCache": "cache",
+    "bypass_cache": "cache",
+    "Catalog": "catalog",
+    "OHLCV": "columnar",
+    "OHLCVStore": "store",
+    "PriceQuote": "models",
+    "Ticker": "models",
+    "Bar": "models",
+    "RateLimiter": "ratelimit",
+    "SharedRateLimiter": "shared",
+    "SQLiteCache": "shared",
+    "ResiliencePolicy": "resilience",
+    "RetryPolicy": "resilience",
+    "Scheduler": "scheduler",
+    "NewsFollower": "news",
+    "MetricsAggregator": "metrics",
+    "Observer": "metrics",
+}
+
+# The submodules, importable as attributes of the package like before
+_SUBMODULES = ("aio", "analytics", "backfilling", "cache", "catalog",
+               "coalesce", "columnar", "decoding", "exceptions", "methods",
+               "metrics", "models", "news", "points", "ratelimit",
+               "resilience", "scheduler", "shared", "store", "transport",
+               "wrapper")
+
+__all__ = ["CryptoCompareMethod", "RateLimitGroup", "HttpError",
+           "TimeoutException", "CryptoCompareError",
+           "CircuitOpenError", "wrapper"] + list(_LAZY)
+
+
+def __getattr__(name):
+    """Import a lazily imported name or submodule on first access."""
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r"
+                             % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the module attributes including the lazily imported names."""
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES))
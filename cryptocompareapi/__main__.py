@@ -0,0 +1,145 @@
+"""Query the CryptoCompare API from the command line.
+
+Usage:
+    python -m cryptocompareapi price BTC,ETH USD,EUR
+    python -m cryptocompareapi histo BTC USD --resolution hour --limit 24
+    python -m cryptocompareapi top volumes USD --format csv
+
+With --cache-dir, responses are cached in a SQLite file in the directory
+and reused by later runs within the caching time of the API, and the
+runs share one rate limit budget.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from .exceptions import CryptoCompareError, HttpError, TimeoutException
+
+DEFAULT_APP_NAME = "cryptocompareapi-cli"
+CACHE_FILE = "cache.sqlite"
+
+_HISTO = {
+    "day": "historical_daily",
+    "hour": "historical_hourly",
+    "minute": "historical_minute",
+}
+
+_TOP = {
+    "volumes": ("top_volumes", "to_symbol"),
+    "pairs": ("top_pairs", "from_symbol"),
+    "total": ("top_total_volume", "to_symbol"),
+}
+
+
+def _symbols(value):
+    return value.split(",")
+
+
+def _client(args):
+    from .wrapper import CryptoCompare
+    if args.cache_dir is None:
+        return CryptoCompare(args.app_name, timeout=args.timeout)
+    os.makedirs(args.cache_dir, mode=0o700, exist_ok=True)
+    return CryptoCompare.shared(args.app_name,
+                                os.path.join(args.cache_dir, CACHE_FILE),
+                                timeout=args.timeout)
+
+
+def _price(client, args):
+    result = client.multiple_symbols_price(args.from_symbols, args.to_symbols,
+                                           args.exchange)
+    rows = [{"fsym": fsym, "tsym": tsym, "price": price}
+            for fsym, prices in result.items()
+            for tsym, price in prices.items()]
+    return result, rows
+
+
+def _histo(client, args):
+    result = getattr(client, _HISTO[args.resolution])(
+        args.from_symbol, args.to_symbol, exchange=args.exchange,
+        limit=args.limit, toTimestamp=args.to)
+    return result, result.get("Data", [])
+
+
+def _top(client, args):
+    method, _ = _TOP[args.kind]
+    result = getattr(client, method)(args.symbol, limit=args.limit)
+    return result, result.get("Data", [])
+
+
+def _write_csv(rows, out):
+    if not rows:
+        return
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    writer = csv.DictWriter(out, fields, lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: json.dumps(value)
+                         if isinstance(value, (dict, list)) else value
+                         for key, value in row.items()})
+
+
+def parser():
+    """Create the parser of the command line arguments."""
+    root = argparse.ArgumentParser(
+        prog="python -m cryptocompareapi",
+        description="Query the CryptoCompare API.")
+    root.add_argument("--format", choices=("json", "csv"), default="json")
+    root.add_argument("--cache-dir",
+                      default=os.environ.get("CRYPTOCOMPARE_CACHE_DIR"),
+                      help="directory of the response cache shared between "
+                           "runs (default $CRYPTOCOMPARE_CACHE_DIR)")
+    root.add_argument("--app-name", default=DEFAULT_APP_NAME)
+    root.add_argument("--timeout", type=float, default=5.0)
+    root.add_argument("--exchange", default="CCCAGG")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    price = commands.add_parser("price", help="current prices")
+    price.add_argument("from_symbols", type=_symbols,
+                       help="comma separated symbols, e.g. BTC,ETH")
+    price.add_argument("to_symbols", type=_symbols,
+                       help="comma separated symbols, e.g. USD,EUR")
+    price.set_defaults(handler=_price)
+
+    histo = commands.add_parser("histo", help="historical bars")
+    histo.add_argument("from_symbol")
+    histo.add_argument("to_symbol")
+    histo.add_argument("--resolution", choices=sorted(_HISTO), default="day")
+    histo.add_argument("--limit", type=int, default=30)
+    histo.add_argument("--to", type=int, help="timestamp of the last bar")
+    histo.set_defaults(handler=_histo)
+
+    top = commands.add_parser("top", help="top lists by volume")
+    top.add_argument("kind", choices=sorted(_TOP))
+    top.add_argument("symbol", help="the to symbol for volumes and total, "
+                                    "the from symbol for pairs")
+    top.add_argument("--limit", type=int, default=10)
+    top.set_defaults(handler=_top)
+    return root
+
+
+def main(argv=None, out=sys.stdout):
+    """Run the command line interface.
+
+    Returns:
+        The exit status
+    """
+    args = parser().parse_args(argv)
+    try:
+        with _client(args) as client:
+            result, rows = args.handler(client, args)
+    except (HttpError, TimeoutException, CryptoCompareError) as e:
+        print("error: %s %s" % (type(e).__name__, e), file=sys.stderr)
+        return 1
+    if args.format == "csv":
+        _write_csv(rows, out)
+    else:
+        json.dump(result, out, indent=2)
+        out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""An asyncio counterpart of the wrapper for the CryptoCompare API.
+
+Requires the optional dependency aiohttp.
+"""
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from .cache import bypass_cache
+from .exceptions import HttpError, TimeoutException
+from .methods import DEFAULT_BASE_URL
+from .metrics import CallEvent
+from .transport import DEFAULT_POOL_SIZE
+from .wrapper import CryptoCompare, DEFAULT_TIMEOUT
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+def _trace_config():
+    """Create a trace config reporting dns and connect times on events."""
+    def timer(phase):
+        async def on_start(session, context, params):
+            setattr(context, phase, time.perf_counter())
+
+        async def on_end(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.timings[phase] = \
+                    time.perf_counter() - getattr(context, phase)
+        return on_start, on_end
+
+    config = aiohttp.TraceConfig()
+    on_start, on_end = timer("dns")
+    config.on_dns_resolvehost_start.append(on_start)
+    config.on_dns_resolvehost_end.append(on_end)
+    on_start, on_end = timer("connect")
+    config.on_connection_create_start.append(on_start)
+    config.on_connection_create_end.append(on_end)
+    return config
+
+
+class AiohttpTransport(object):
+    """Asynchronous transport using a pooled aiohttp.ClientSession.
+
+    Offers the interface of transport.Transport, but get() and close() are
+    coroutines. The session is created on first use inside the running
+    event loop.
+    """
+
+    def __init__(self, pool_maxsize=DEFAULT_POOL_SIZE, keep_alive=True):
+        """Create an instance.
+
+        Args:
+            pool_maxsize (int): Maximum number of connections kept open
+            keep_alive (bool): If set to false, connections are closed after
+                every request (Default true)
+        """
+        if aiohttp is None:
+            raise ImportError("AiohttpTransport requires aiohttp")
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.session = None
+
+    async def get(self, url, params, timeout, event=None):
+        """Perform a GET request on the pooled session.
+
+        Resolving the host and connecting are reported as separate phases.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize, force_close=not self.keep_alive)
+            self.session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[_trace_config()])
+        # aiohttp only accepts str values, requests converts them the same
+        params = {k: str(v) for k, v in params.items()}
+        start = time.perf_counter()
+        try:
+            async with self.session.get(
+                    url, params=params,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                    trace_request_ctx=event) as response:
+                response.raise_for_status()
+                headers = time.perf_counter()
+                content = await response.read()
+                if event is not None:
+                    event.timings["ttfb"] = headers - start
+                    event.timings["download"] = time.perf_counter() - headers
+                return content
+        except aiohttp.ClientResponseError as e:
+            raise HttpError(e.status) from e
+        except asyncio.TimeoutError as e:
+            raise TimeoutException() from e
+        except aiohttp.ClientError as e:
+            raise HttpError() from e
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncCryptoCompare(CryptoCompare):
+    """Asyncio wrapper around the Crypto-Compare-API.
+
+    Offers the same methods as CryptoCompare, but they return coroutines:
+
+        async with AsyncCryptoCompare("myApp") as cc:
+            prices = await asyncio.gather(
+                cc.single_symbol_price("BTC", "USD"),
+                cc.single_symbol_price("ETH", "USD"))
+
+    At most max_concurrency requests are in flight at the same time. The
+    methods raise the same exceptions as the ones of CryptoCompare.
+    """
+
+    def __init__(self, appName, timeout=DEFAULT_TIMEOUT, transport=None,
+                 base_url=DEFAULT_BASE_URL, cache=None, rate_limiter=None,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, decoder=None,
+                 observers=None, resilience=None):
+        """Create an instance.
+
+        Args:
+            appName (str): Name of your application, is send with every
+                request
+            timeout (dbl): Seconds to wait for a server response. Default 5s
+            transport (AiohttpTransport): The asynchronous transport used to
+                perform requests. Default is an AiohttpTransport
+            base_url (str): The url the API-methods are resolved against
+            cache (TTLCache): The cache for responses. Default is a TTLCache
+                of default size, pass False to disable caching
+            rate_limiter (RateLimiter): Paces the requests per
+                RateLimitGroup. Default None, requests are not limited
+            max_concurrency (int): Maximum number of requests in flight
+            decoder (callable): Decodes the bodies of the responses
+            observers (list<metrics.Observer>): Notified with the timings and
+                metadata of every call
+            resilience (ResiliencePolicy): Retries, hedges and circuit
+                breakers for failed and slow requests
+        """
+        if transport is None:
+            transport = AiohttpTransport(pool_maxsize=max_concurrency)
+        super().__init__(appName, timeout, transport, base_url, cache,
+                         rate_limiter, decoder=decoder, observers=observers,
+                         resilience=resilience)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def close(self):
+        """Close the transport and its pooled connections."""
+        await self.transport.close()
+        if self.resilience is not None:
+            self.resilience.close()
+
+    async def __aenter__(self):
+        """Enter the context, returns the instance."""
+        return self
+
+    async def __aexit__(self, *args):
+        """Exit the context, closes the instance."""
+        await self.close()
+
+    async def seed_rate_limiter(self):
+        """Seed the rate limiter with the limits left for you."""
+        with bypass_cache():
+            self.rate_limiter.seed(await self.rate_limits())
+
+    def iter_coins(self):
+        """Not supported, the aiohttp transport does not stream bodies.
+
+        Raises:
+            NotImplementedError: Use list_coins() or a CryptoCompare
+        """
+        raise NotImplementedError(
+            "AsyncCryptoCompare can not stream responses, use list_coins() "
+            "or the iter_coins() of a CryptoCompare.")
+
+    def iter_exchanges(self):
+        """Not supported, the aiohttp transport does not stream bodies.
+
+        Raises:
+            NotImplementedError: Use list_exchanges() or a CryptoCompare
+        """
+        raise NotImplementedError(
+            "AsyncCryptoCompare can not stream responses, use "
+            "list_exchanges() or the iter_exchanges() of a CryptoCompare.")
+
+    async def _try_get_requests(self, method, params_list, merge,
+                                parse=None):
+        """Perform several requests concurrently and merge their results.
+
+        See CryptoCompare._try_get_requests
+        """
+        if not params_list:  # An empty symbol list
+            return merge([])
+        if len(params_list) == 1:
+            return await self._try_get_request(method, params_list[0], parse)
+        results = await asyncio.gather(
+            *[self._try_get_request(method, params, parse)
+              for params in params_list])
+        return merge(results)
+
+    async def _try_get_request(self, method, params, parse=None):
+        """Try to perform a get request without blocking the event loop.
+
+        See CryptoCompare._try_get_request
+        """
+        if self.observers:
+            return await self._observed(self._try_get_request_event, method,
+                                        params, parse)
+        return await self._try_get_request_event(method, params, parse)
+
+    async def _try_get_request_event(self, method, params, parse=None,
+                                     event=None):
+        """Perform a get request, reporting on event if given."""
+        key = self._cache_key(method, params, parse)
+        if key is not None:
+            found, result = self.cache.get(key)
+            if found:
+                if event is not None:
+                    event.cache_hit = True
+                return result
+
+        params["extraParams"] = self.appName
+        content = await self._send(method, params, event)
+        if event is None:
+            return self._handle_response(method, key, content, parse)
+        event.size = len(content)
+        start = time.perf_counter()
+        result = self._handle_response(method, key, content, parse)
+        event.timings["parse"] = time.perf_counter() - start
+        return result
+
+    async def _send(self, method, params, event=None):
+        """Send a request once the rate limiter allows it.
+
+        See CryptoCompare._send
+        """
+        url = method.url(self.base_url)
+
+        async def send(event):
+            async with self._semaphore:
+                return await self.transport.get(url, params, self.timeout,
+                                                event)
+
+        if self.resilience is not None:
+            return await self.resilience.call_async(
+                send, method.rateLimitGroup, self.rate_limiter, event)
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(method.rateLimitGroup)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if event is not None:
+                event.timings["rate_limit"] = delay
+        return await send(event)
+
+    async def _observed(self, request, method, params, parse):
+        """Perform a request with an event and notify the observers."""
+        event = CallEvent(method)
+        start = time.perf_counter()
+        try:
+            return await request(method, params, parse, event)
+        except Exception as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.timings["total"] = time.perf_counter() - start
+            self._notify(event)
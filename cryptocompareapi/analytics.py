@@ -0,0 +1,197 @@
+"""Vectorized analytics of the bars returned by the histo API-methods.
+
+The functions take the bars as OHLCV (see columnar), as dictionary of
+NumPy arrays or as the list of bars the API returns, and compute locally
+what would otherwise take additional API calls or loops over rows.
+Functions on prices also accept 2-dimensional arrays holding one pair per
+row, and compute along the last axis for all pairs at once.
+
+Requires the optional dependency numpy.
+
+Example:
+    bars = cc.historical_minute("BTC", "USD", limit=2000, columnar=True)
+    quarters = resample(bars, "15m")
+    volatility = rolling_volatility(log_returns(quarters.close), 96)
+"""
+import numpy
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .columnar import COLUMNS, OHLCV
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _seconds(period):
+    """Get the seconds of a period given as int or as string like "15m"."""
+    if isinstance(period, str):
+        period = int(period[:-1] or 1) * _UNITS[period[-1]]
+    if period <= 0:
+        raise ValueError("The period must be positive")
+    return int(period)
+
+
+def _columns(bars):
+    """Get the columns of bars as dictionary of NumPy arrays."""
+    if isinstance(bars, OHLCV):
+        return bars.to_numpy()
+    if isinstance(bars, dict):
+        return {name: numpy.asarray(bars[name]) for name in COLUMNS}
+    return {name: numpy.array([bar[name] for bar in bars],
+                              dtype="i8" if name == "time" else "f8")
+            for name in COLUMNS}
+
+
+def resample(bars, period, origin=0):
+    """Aggregate bars into bars of a longer period.
+
+    A bar covers [time, time + period). Periods without bars are skipped.
+
+    Args:
+        bars (OHLCV): The bars, sorted by time
+        period (int or str): Seconds of the new bars or a string like "15m",
+            "4h", "1d" or "1w"
+        origin (int): Timestamp the periods are aligned to. Default 0, the
+            periods of the API (weeks would start on Thursdays)
+
+    Returns:
+        OHLCV
+    """
+    period = _seconds(period)
+    columns = _columns(bars)
+    time = columns["time"]
+    if not len(time):
+        return OHLCV.empty()
+    slots = (time - origin) // period
+    starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(slots)) + 1))
+    ends = numpy.append(starts[1:], len(time)) - 1
+    return OHLCV(
+        numpy.ascontiguousarray(slots[starts] * period + origin, dtype="i8"),
+        columns["open"][starts],
+        numpy.maximum.reduceat(columns["high"], starts),
+        numpy.minimum.reduceat(columns["low"], starts),
+        columns["close"][ends],
+        numpy.add.reduceat(columns["volumefrom"], starts),
+        numpy.add.reduceat(columns["volumeto"], starts))
+
+
+def vwap(bars, window=None):
+    """Get the volume weighted average price.
+
+    Args:
+        bars (OHLCV): The bars
+        window (int): Number of bars to average over. Default None, the
+            average price of every single bar
+
+    Returns:
+        numpy.ndarray, NaN where no volume was traded. With a window, the
+        first window - 1 values are NaN as well
+    """
+    if window is not None and window < 1:
+        raise ValueError("The window must hold at least one bar")
+    columns = _columns(bars)
+    volumeto = columns["volumeto"].astype("f8")
+    volumefrom = columns["volumefrom"].astype("f8")
+    if window is not None:
+        volumeto = _rolling_sum(volumeto, window)
+        volumefrom = _rolling_sum(volumefrom, window)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return numpy.where(volumefrom > 0, volumeto / volumefrom, numpy.nan)
+
+
+def _rolling_sum(values, window):
+    """Sum over the last window values, NaN for the first window - 1."""
+    result = numpy.full(values.shape, numpy.nan)
+    if values.shape[-1] < window:
+        return result
+    sums = numpy.cumsum(values, axis=-1)
+    result[..., window - 1] = sums[..., window - 1]
+    result[..., window:] = sums[..., window:] - sums[..., :-window]
+    return result
+
+
+def log_returns(prices):
+    """Get the log returns between consecutive prices.
+
+    Args:
+        prices (numpy.ndarray): The prices, one pair per row if 2-dimensional
+
+    Returns:
+        numpy.ndarray, one value less than prices along the last axis
+    """
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return numpy.diff(numpy.log(numpy.asarray(prices, dtype="f8")),
+                          axis=-1)
+
+
+def rolling_volatility(returns, window, periods_per_year=None):
+    """Get the standard deviation of returns over a rolling window.
+
+    Args:
+        returns (numpy.ndarray): The returns, one pair per row if
+            2-dimensional
+        window (int): Number of returns per window, at least 2
+        periods_per_year (dbl): Annualize the volatility with this number of
+            returns per year, e.g. 365 for daily returns. Default None
+
+    Returns:
+        numpy.ndarray of the same shape as returns, the first window - 1
+        values are NaN
+    """
+    if window < 2:
+        raise ValueError("The window must hold at least two returns")
+    returns = numpy.asarray(returns, dtype="f8")
+    result = numpy.full(returns.shape, numpy.nan)
+    if returns.shape[-1] >= window:
+        result[..., window - 1:] = sliding_window_view(
+            returns, window, axis=-1).std(axis=-1, ddof=1)
+    if periods_per_year is not None:
+        result *= numpy.sqrt(periods_per_year)
+    return result
+
+
+def align(series, column="close", how="inner"):
+    """Align a column of several pairs on common timestamps.
+
+    Args:
+        series (dict<str, OHLCV>): The bars per pair
+        column (str): The column to align
+        how (str): "inner" keeps the timestamps all pairs have, "outer"
+            keeps all timestamps and fills missing values with NaN
+
+    Returns:
+        A tuple (keys, time, values) with the keys of series, the
+        timestamps and a matrix with one row per key
+    """
+    keys = list(series)
+    columns = [_columns(series[key]) for key in keys]
+    times = [c["time"] for c in columns]
+    if not times:
+        return keys, numpy.empty(0, dtype="i8"), numpy.empty((0, 0))
+    merge = numpy.intersect1d if how == "inner" else numpy.union1d
+    time = times[0]
+    for other in times[1:]:
+        time = merge(time, other)
+    values = numpy.full((len(keys), len(time)), numpy.nan)
+    for row, (own, c) in enumerate(zip(times, columns)):
+        positions = numpy.searchsorted(time, own)
+        inside = positions < len(time)
+        inside[inside] = time[positions[inside]] == own[inside]
+        values[row, positions[inside]] = c[column][inside]
+    return keys, time, values
+
+
+def correlation_matrix(series, column="close"):
+    """Get the correlations of the log returns of several pairs.
+
+    The returns are computed on the timestamps all pairs have.
+
+    Args:
+        series (dict<str, OHLCV>): The bars per pair
+        column (str): The price column
+
+    Returns:
+        A tuple (keys, matrix) with the keys of series and the symmetric
+        matrix of correlation coefficients in their order
+    """
+    keys, _, values = align(series, column)
+    return keys, numpy.atleast_2d(numpy.corrcoef(log_returns(values)))
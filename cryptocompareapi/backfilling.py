@@ -0,0 +1,106 @@
+"""Paginated backfill of historical data over arbitrary time ranges."""
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from .cache import bypass_cache
+from .wrapper import DEFAULT_EXCHANGE
+
+# Seconds per bar of the resolutions
+RESOLUTIONS = {
+    "day": 86400,
+    "hour": 3600,
+    "minute": 60,
+}
+
+MAX_PAGE_SIZE = 2000  # Maximum limit accepted by the histo API-methods
+
+_FETCHERS = {
+    "day": "historical_daily",
+    "hour": "historical_hourly",
+    "minute": "historical_minute",
+}
+
+_PRICE_FIELDS = ("open", "high", "low", "close", "volumefrom", "volumeto")
+
+
+def _is_empty(bar):
+    """Whether a bar is a zero filled bar before the pair was traded."""
+    return not any(bar.get(field) for field in _PRICE_FIELDS)
+
+
+def backfill(client, from_symbol, to_symbol, start, end=None,
+             resolution="day", exchange=DEFAULT_EXCHANGE,
+             try_conversion=True, page_size=MAX_PAGE_SIZE, prefetch=4):
+    """Stream the bars of a pair between start and end, newest first.
+
+    Walks backwards from end with the toTs parameter of the histo
+    API-methods. Up to prefetch pages are requested concurrently, which
+    are paced by the rate limiter of the client, if any. The pages bypass
+    the cache of the client, as they are read only once. Overlapping bars
+    of adjacent pages are skipped and the walk stops at the first page
+    holding no traded bars.
+
+    Args:
+        client (CryptoCompare): The client to fetch the pages with
+        from_symbol (str): The symbol to get the bars for
+        to_symbol (str): The symbol to convert into
+        start (int): Unix timestamp of the oldest bar to yield
+        end (int): Unix timestamp of the newest bar to yield. Default now
+        resolution (str): "day", "hour" or "minute"
+        exchange (str): The exchange to obtain data from (Default "CCCAGG")
+        try_conversion (bool): If set to false, it will try to get only
+            direct trading values (Default true)
+        page_size (int): Bars per request, at most 2000
+        prefetch (int): Maximum number of pages requested concurrently
+
+    Yields:
+        The bars as returned by the API, with strictly decreasing times
+
+    Raises:
+        HttpError: The Request failed due to a HTTPError
+        TimeoutException: The Request timed out
+        CryptoCompareError: The API returned an error message
+
+    """
+    step = RESOLUTIONS[resolution]
+    fetch = getattr(client, _FETCHERS[resolution])
+    if end is None:
+        end = int(time.time())
+    end -= end % step
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    # A page with limit n holds the n + 1 bars up to toTs
+    page_span = (page_size + 1) * step
+
+    def fetch_page(to_timestamp):
+        limit = min(page_size, (to_timestamp - start) // step)
+        # The pages are read once, caching them would only hold memory
+        with bypass_cache():
+            return fetch(from_symbol, to_symbol, exchange=exchange,
+                         try_conversion=try_conversion, limit=max(limit, 1),
+                         toTimestamp=to_timestamp)
+
+    pages = iter(range(end, start - 1, -page_span))
+    last = end + 1
+    with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+        pending = deque(executor.submit(fetch_page, to_timestamp)
+                        for to_timestamp in islice(pages, max(prefetch, 1)))
+        try:
+            while pending:
+                bars = pending.popleft().result().get("Data", [])
+                to_timestamp = next(pages, None)
+                if to_timestamp is not None:
+                    pending.append(executor.submit(fetch_page, to_timestamp))
+                if not bars or all(_is_empty(bar) for bar in bars):
+                    return
+                for bar in reversed(bars):
+                    if bar["time"] >= last or bar["time"] < start:
+                        continue
+                    if _is_empty(bar):
+                        return
+                    yield bar
+                    last = bar["time"]
+        finally:
+            for future in pending:
+                future.cancel()
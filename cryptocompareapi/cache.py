@@ -0,0 +1,120 @@
+"""A response cache based on the caching times of the API."""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_CACHE_SIZE = 1024
+
+_cache_bypassed = ContextVar("cache_bypassed", default=False)
+
+
+def make_key(method, params):
+    """Create a cache key from a method and its params.
+
+    The params are normalized, so the order in which they were added does not
+    matter. The extraParams holding the app name are ignored.
+    """
+    items = tuple(sorted((k, str(v)) for k, v in params.items()
+                         if k != "extraParams"))
+    return (method.name, items)
+
+
+@contextmanager
+def bypass_cache():
+    """Context in which requests are neither served from nor stored in cache.
+
+    Example:
+        with bypass_cache():
+            price = cc.single_symbol_price("BTC", "USD")
+    """
+    token = _cache_bypassed.set(True)
+    try:
+        yield
+    finally:
+        _cache_bypassed.reset(token)
+
+
+def cache_bypassed():
+    """Return whether the current context bypasses the cache."""
+    return _cache_bypassed.get()
+
+
+class CacheStats(object):
+    """Counters of a cache."""
+
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        """Create an instance with all counters set to zero."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self):
+        """Return the counters as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        """Return a readable representation."""
+        return "CacheStats(%s)" % ", ".join(
+            "%s=%d" % item for item in self.as_dict().items())
+
+
+class TTLCache(object):
+    """A thread-safe, bounded LRU cache with a time to live per entry."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, clock=time.monotonic):
+        """Create an instance.
+
+        Args:
+            maxsize (int): Maximum number of entries, the least recently used
+                entry is evicted when exceeded
+            clock (callable): Returns the current time in seconds
+        """
+        self.maxsize = maxsize
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a value from the cache.
+
+        Returns:
+            A tuple (found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl):
+        """Store a value in the cache for ttl seconds."""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        """Return the number of entries, including expired ones."""
+        return len(self._entries)
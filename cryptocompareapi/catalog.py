@@ -0,0 +1,187 @@
+"""An indexed catalog of the coins and exchanges known to the API."""
+import difflib
+import gzip
+import json
+import os
+import time
+from bisect import bisect_left
+
+from .exceptions import CryptoCompareError
+from .methods import CryptoCompareMethod
+
+DEFAULT_MAX_AGE = max(CryptoCompareMethod.LIST_COINS.caching,
+                      CryptoCompareMethod.LIST_EXCHANGES.caching)
+
+
+class _Index(object):
+    """The indexes of one version of the catalog."""
+
+    __slots__ = ("coins", "exchanges", "pair_exchanges", "symbols",
+                 "sorted_symbols", "names")
+
+    def __init__(self, coins, exchanges):
+        self.coins = coins
+        self.exchanges = {}
+        self.pair_exchanges = {}
+        symbols = set(coins)
+        for exchange, pairs in exchanges.items():
+            exchange_pairs = set()
+            for from_symbol, to_symbols in pairs.items():
+                symbols.add(from_symbol)
+                for to_symbol in to_symbols:
+                    symbols.add(to_symbol)
+                    pair = (from_symbol, to_symbol)
+                    exchange_pairs.add(pair)
+                    self.pair_exchanges.setdefault(pair, []).append(exchange)
+            self.exchanges[exchange] = frozenset(exchange_pairs)
+        self.symbols = frozenset(symbols)
+        self.sorted_symbols = sorted(symbols)
+        self.names = {info.get("CoinName", "").lower(): symbol
+                      for symbol, info in coins.items()
+                      if info.get("CoinName")}
+
+
+class Catalog(object):
+    """Symbols, coins and exchanges of the API with prebuilt indexes.
+
+    Built from list_coins() and list_exchanges(), it answers lookups of
+    coins, of the pairs of an exchange, of the exchanges listing a pair and
+    of symbols by prefix or similarity without calling the API. Symbols can
+    be validated before spending rate limited calls on them.
+
+    The catalog is rebuilt by refresh() once it is older than max_age, which
+    defaults to the caching time of the API-methods. A snapshot can be saved
+    to disk and loaded for a fast cold start.
+    """
+
+    def __init__(self, client=None, max_age=DEFAULT_MAX_AGE):
+        """Create an empty instance.
+
+        Args:
+            client (CryptoCompare): The client used to refresh the catalog,
+                an AsyncCryptoCompare can not stream the lists
+            max_age (dbl): Seconds after which the catalog is stale
+        """
+        self.client = client
+        self.max_age = max_age
+        self.updated = None
+        self._raw = ({}, {})
+        self._index = _Index({}, {})
+
+    @property
+    def stale(self):
+        """Whether the catalog is older than max_age."""
+        return self.updated is None or \
+            time.time() - self.updated >= self.max_age
+
+    def refresh(self, force=False):
+        """Rebuild the catalog from the API if it is stale.
+
+        Returns:
+            Whether the catalog was rebuilt
+        """
+        if not force and not self.stale:
+            return False
+        coins = dict(self.client.iter_coins())
+        exchanges = dict(self.client.iter_exchanges())
+        self._update(coins, exchanges, time.time())
+        return True
+
+    def _update(self, coins, exchanges, updated):
+        # Swap in the new indexes at once, so readers see a consistent state
+        self._index = _Index(coins, exchanges)
+        self._raw = (coins, exchanges)
+        self.updated = updated
+
+    def coin(self, symbol):
+        """Get the info of a coin as returned by list_coins(), or None."""
+        return self._index.coins.get(symbol)
+
+    def pairs(self, exchange):
+        """Get the pairs (<from_symbol>, <to_symbol>) listed by an exchange."""
+        return self._index.exchanges.get(exchange, frozenset())
+
+    def exchanges(self, from_symbol=None, to_symbol=None):
+        """Get the exchanges, or those listing the given pair."""
+        if from_symbol is None:
+            return list(self._index.exchanges)
+        return list(self._index.pair_exchanges.get(
+            (from_symbol, to_symbol), ()))
+
+    def __contains__(self, symbol):
+        """Whether a symbol is a coin or traded on any exchange."""
+        return symbol in self._index.symbols
+
+    def unknown_symbols(self, symbols):
+        """Get the symbols that are neither a coin nor traded anywhere.
+
+        Args:
+            symbols (list<str>): Symbols, e.g. from_symbols or to_symbols
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        known = self._index.symbols
+        return [symbol for symbol in symbols if symbol not in known]
+
+    def validate(self, symbols):
+        """Check that all symbols are known before requesting them.
+
+        Raises:
+            CryptoCompareError: Some symbols are unknown
+        """
+        unknown = self.unknown_symbols(symbols)
+        if unknown:
+            raise CryptoCompareError(
+                "Unknown symbols: %s" % ", ".join(unknown))
+
+    def search(self, prefix, limit=10):
+        """Get the symbols starting with prefix, in alphabetical order."""
+        sorted_symbols = self._index.sorted_symbols
+        result = []
+        i = bisect_left(sorted_symbols, prefix)
+        while i < len(sorted_symbols) and len(result) < limit \
+                and sorted_symbols[i].startswith(prefix):
+            result.append(sorted_symbols[i])
+            i += 1
+        return result
+
+    def similar(self, query, limit=5, cutoff=0.6):
+        """Get the symbols closest to a symbol or coin name.
+
+        Args:
+            query (str): A misspelled symbol or coin name
+            limit (int): Maximum number of symbols
+            cutoff (dbl): Minimum similarity between 0 and 1
+        """
+        index = self._index
+        result = difflib.get_close_matches(
+            query.upper(), index.sorted_symbols, limit, cutoff)
+        for name in difflib.get_close_matches(
+                query.lower(), index.names, limit, cutoff):
+            if index.names[name] not in result:
+                result.append(index.names[name])
+        return result[:limit]
+
+    def save(self, path):
+        """Save a compressed snapshot of the catalog."""
+        coins, exchanges = self._raw
+        snapshot = {"updated": self.updated, "coins": coins,
+                    "exchanges": exchanges}
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, client=None, max_age=DEFAULT_MAX_AGE):
+        """Load a catalog from a snapshot.
+
+        The catalog keeps the age of the snapshot, refresh() rebuilds it
+        once it is stale.
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        catalog = cls(client, max_age)
+        catalog._update(snapshot["coins"], snapshot["exchanges"],
+                        snapshot["updated"])
+        return catalog
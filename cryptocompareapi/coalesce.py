@@ -0,0 +1,120 @@
+"""Coalescing of concurrent single symbol price requests."""
+import contextvars
+import threading
+from concurrent.futures import Future
+
+from .exceptions import CryptoCompareError
+from .methods import CryptoCompareMethod
+
+DEFAULT_WINDOW = 0.01  # In seconds
+
+
+class PriceCoalescer(object):
+    """Merges single symbol price requests into multiple symbol requests.
+
+    Requests arriving within a time window are collected and send as one
+    CryptoCompareMethod.PRICE_MULT request per exchange and conversion
+    setting. The result is split back to every caller. Identical requests
+    pending or in flight share one result.
+    """
+
+    def __init__(self, client, window=DEFAULT_WINDOW):
+        """Create an instance.
+
+        Args:
+            client (CryptoCompare): Performs the merged requests
+            window (dbl): Seconds to collect requests before sending them
+        """
+        self.client = client
+        self.window = window
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._futures = {}
+
+    def price(self, params):
+        """Get the result of a CryptoCompareMethod.PRICE request.
+
+        Args:
+            params (dict<str>): The params of the single symbol request
+
+        Returns:
+            { <to_symbol_1> : <value_1>,
+            ...
+             <to_symbol_n>: <value_n> }
+
+        """
+        key = self.client._cache_key(CryptoCompareMethod.PRICE, params)
+        if key is not None:
+            found, result = self.client.cache.get(key)
+            if found:
+                return result
+        result = self.submit(params["fsym"], params["tsyms"], params["e"],
+                             params["tryConversion"]).result()
+        if key is not None:
+            self.client.cache.set(key, result,
+                                  CryptoCompareMethod.PRICE.caching)
+        return result
+
+    def submit(self, from_symbol, to_symbols, exchange, try_conversion):
+        """Submit a single symbol price request.
+
+        Args:
+            from_symbol (str): The symbol to get the price for
+            to_symbols (str): Comma separated symbols to convert into
+            exchange (str): The exchange to obtain data from
+            try_conversion (bool): Whether to try conversions
+
+        Returns:
+            A concurrent.futures.Future of the result
+
+        """
+        request = (from_symbol, to_symbols, exchange, try_conversion)
+        with self._lock:
+            future = self._futures.get(request)
+            if future is not None:
+                return future
+            future = Future()
+            self._futures[request] = future
+            batch_key = (exchange, try_conversion)
+            batch = self._batches.get(batch_key)
+            if batch is None:
+                batch = self._batches[batch_key] = []
+                # The batch is sent in the context of its first request
+                timer = threading.Timer(self.window,
+                                        contextvars.copy_context().run,
+                                        (self._flush, batch_key))
+                timer.daemon = True
+                timer.start()
+            batch.append(request)
+        return future
+
+    def _flush(self, batch_key):
+        """Send all requests collected for a batch."""
+        with self._lock:
+            batch = self._batches.pop(batch_key)
+        exchange, try_conversion = batch_key
+        from_symbols = list(dict.fromkeys(r[0] for r in batch))
+        to_symbols = list(dict.fromkeys(
+            symbol for r in batch for symbol in r[1].split(",")))
+        try:
+            result = self.client.multiple_symbols_price(
+                from_symbols, to_symbols, exchange, try_conversion)
+        except Exception as e:
+            for request in batch:
+                self._pop(request).set_exception(e)
+            return
+        for request in batch:
+            prices = result.get(request[0], {})
+            prices = {symbol: prices[symbol]
+                      for symbol in request[1].split(",")
+                      if symbol in prices}
+            future = self._pop(request)
+            if prices:
+                future.set_result(prices)
+            else:
+                future.set_exception(CryptoCompareError(
+                    "There is no data for the symbol %s." % request[0]))
+
+    def _pop(self, request):
+        with self._lock:
+            return self._futures.pop(request)
@@ -0,0 +1,118 @@
+"""Columnar, array backed results of the histo API-methods."""
+import json
+from array import array
+
+from .exceptions import CryptoCompareError
+
+COLUMNS = ("time", "open", "high", "low", "close", "volumefrom", "volumeto")
+_TYPECODES = ("q",) + ("d",) * 6  # int64 timestamps, float64 values
+
+
+class OHLCV(object):
+    """Bars of a histo API-method stored as one contiguous column per field.
+
+    The columns are memoryviews on int64 (time) and float64 arrays. Slicing
+    returns views on the same memory. A column can be wrapped into a NumPy
+    array without a copy, see to_numpy().
+    """
+
+    __slots__ = COLUMNS
+
+    def __init__(self, time, open, high, low, close, volumefrom, volumeto):
+        """Create an instance from the columns.
+
+        Args:
+            time, open, ... : Arrays or memoryviews of the columns
+        """
+        for name, column in zip(COLUMNS, (time, open, high, low, close,
+                                          volumefrom, volumeto)):
+            setattr(self, name, memoryview(column))
+
+    @classmethod
+    def empty(cls):
+        """Create an instance without bars."""
+        return cls(*(array(typecode) for typecode in _TYPECODES))
+
+    @classmethod
+    def from_bars(cls, bars):
+        """Create an instance from the bars returned by the API."""
+        columns = [array(typecode) for typecode in _TYPECODES]
+        for bar in bars:
+            for name, column in zip(COLUMNS, columns):
+                column.append(bar[name])
+        return cls(*columns)
+
+    @classmethod
+    def concat(cls, parts):
+        """Concatenate instances, copying every column once."""
+        columns = [array(typecode) for typecode in _TYPECODES]
+        for part in parts:
+            for name, column in zip(COLUMNS, columns):
+                view = getattr(part, name)
+                column.frombytes(view.cast("B") if view.contiguous
+                                 else view.tobytes())
+        return cls(*columns)
+
+    def __reduce__(self):
+        """Pickle the columns as arrays, memoryviews cannot be pickled."""
+        return OHLCV, tuple(array(typecode, getattr(self, name).tobytes())
+                            for name, typecode in zip(COLUMNS, _TYPECODES))
+
+    def __len__(self):
+        """Return the number of bars."""
+        return len(self.time)
+
+    def __getitem__(self, index):
+        """Get a bar as dictionary, or a slice of bars as OHLCV view."""
+        if isinstance(index, slice):
+            return OHLCV(*(getattr(self, name)[index] for name in COLUMNS))
+        return {name: getattr(self, name)[index] for name in COLUMNS}
+
+    def __iter__(self):
+        """Iterate the bars as dictionaries."""
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        """Return a readable representation."""
+        if not len(self):
+            return "OHLCV(0 bars)"
+        return "OHLCV(%d bars, %d - %d)" % (len(self), self.time[0],
+                                            self.time[-1])
+
+    def to_numpy(self):
+        """Get the columns as NumPy arrays sharing the memory of the columns.
+
+        Requires the optional dependency numpy.
+
+        Returns:
+            { <column>: numpy.ndarray, ... }
+        """
+        import numpy
+        return {name: numpy.asarray(getattr(self, name)) for name in COLUMNS}
+
+
+def parse_ohlcv(content):
+    """Parse the body of a histo response directly into an OHLCV.
+
+    The bars are appended to the columns while they are decoded, so the
+    decoded dictionaries of the bars are dropped right away.
+
+    Raises:
+        CryptoCompareError: The API returned an error message
+    """
+    columns = [array(typecode) for typecode in _TYPECODES]
+    appenders = [(name, column.append)
+                 for name, column in zip(COLUMNS, columns)]
+
+    def append_bar(obj):
+        if "time" in obj and "close" in obj:
+            for name, append in appenders:
+                append(obj[name])
+            return None
+        return obj
+
+    result = json.loads(content, object_hook=append_bar)
+    if isinstance(result, dict) and result.get("Response") == "Error":
+        raise CryptoCompareError(result["Message"])
+    return OHLCV(*columns)
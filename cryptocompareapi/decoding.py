@@ -0,0 +1,149 @@
+"""Decoders for the bodies of API responses.
+
+A decoder is a callable turning the body of a response into the decoded
+json-object. orjson is used by default if it is installed. For large
+collections, iter_object_items() decodes the entries one at a time from a
+stream of chunks.
+"""
+import codecs
+import json
+
+from .exceptions import CryptoCompareError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_WHITESPACE = " \t\n\r"
+_COMPACT_SIZE = 1 << 16
+
+
+def json_decoder(content):
+    """Decode a body with the json module of the standard library."""
+    return json.loads(content)
+
+
+def orjson_decoder(content):
+    """Decode a body with orjson, requires the optional dependency."""
+    return orjson.loads(content)
+
+
+def default_decoder():
+    """Get the fastest available decoder."""
+    return orjson_decoder if orjson is not None else json_decoder
+
+
+class _Reader(object):
+    """Reads json values from a stream of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read the next chunk, return False at the end of the stream."""
+        if self.eof:
+            return False
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer += self.text.decode(chunk)
+                return True
+        self.buffer += self.text.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Skip whitespace and get the next character, "" at the end."""
+        if self.pos > _COMPACT_SIZE:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        while True:
+            while self.pos < len(self.buffer) \
+                    and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        """Consume the next character, which has to be char."""
+        if self.peek() != char:
+            raise ValueError("Expected %r at position %d of the response"
+                             % (char, self.pos))
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number or literal at the end of the buffer may be truncated
+            if end < len(self.buffer) or not self.fill():
+                self.pos = end
+                return value
+
+    def items(self):
+        """Yield the members of the next object."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key, self.value()
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("}")
+                return
+
+
+def iter_object_items(chunks, key=None):
+    """Yield the members of an object in a streamed response one at a time.
+
+    Args:
+        chunks (iterable<bytes>): The body of the response
+        key (str): The member of the top-level object holding the object to
+            iterate, None to iterate the top-level object itself
+
+    Yields:
+        Tuples (<key>, <value>)
+
+    Raises:
+        CryptoCompareError: The API returned an error message
+
+    """
+    reader = _Reader(chunks)
+    status = {}
+    reader.expect("{")
+    while reader.peek() != "}":
+        name = reader.value()
+        reader.expect(":")
+        if key is None:
+            value = reader.value()
+            if name in ("Response", "Message") and isinstance(value, str):
+                status[name] = value
+            else:
+                yield name, value
+        elif name == key and reader.peek() == "{":
+            yield from reader.items()
+        else:
+            status[name] = reader.value()
+        if reader.peek() != ",":
+            break
+        reader.pos += 1
+    reader.expect("}")
+    if status.get("Response") == "Error":
+        raise CryptoCompareError(status.get("Message"))
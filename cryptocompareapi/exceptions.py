@@ -2,7 +2,15 @@
 
 
 class HttpError(Exception):
-    """A HTTP Error occured and needs to be handled."""
+    """A HTTP Error occured and needs to be handled.
+
+    The status_code is None if no response was received.
+    """
+
+    def __init__(self, status_code=None):
+        """Create an instance for the HTTP status code of the response."""
+        super().__init__(*([] if status_code is None else [status_code]))
+        self.status_code = status_code
 
 
 class TimeoutException(Exception):
@@ -11,3 +19,7 @@ class TimeoutException(Exception):
 
 class CryptoCompareError(Exception):
     """The API request resulted in a Error."""
+
+
+class CircuitOpenError(HttpError):
+    """The API failed repeatedly, requests fail fast until it recovers."""
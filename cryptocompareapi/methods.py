@@ -1,6 +1,8 @@
 """Contains Enumerations containing information about API-methods."""
 from enum import Enum
 
+DEFAULT_BASE_URL = "https://min-api.cryptocompare.com"
+
 
 class RateLimitGroup(Enum):
     """Enumeration of the different Rate limit groups.
@@ -18,80 +20,85 @@ class RateLimitGroup(Enum):
 class CryptoCompareMethod(Enum):
     """Enumeration of methods defined by API, holding static information.
 
-    Use full_url property to get the full url
+    Use full_url property to get the full url, or url() to resolve the
+    method against another base url (e.g. a local stand-in server)
     """
 
     PRICE = (
-        "https://min-api.cryptocompare.com/data/price",
+        "/data/price",
         10, RateLimitGroup.PRICE)
     PRICE_MULT = (
-        "https://min-api.cryptocompare.com/data/pricemulti",
+        "/data/pricemulti",
         10, RateLimitGroup.PRICE)
     PRICE_MULTI_FULL = (
-        "https://min-api.cryptocompare.com/data/pricemultifull",
+        "/data/pricemultifull",
         10, RateLimitGroup.PRICE)
     GENERATE_AVERAGE = (
-        "https://min-api.cryptocompare.com/data/generateAvg",
+        "/data/generateAvg",
         10, RateLimitGroup.PRICE)
     HISTO_DAY = (
-        "https://min-api.cryptocompare.com/data/histoday",
+        "/data/histoday",
         610, RateLimitGroup.HISTO)
     HISTO_HOUR = (
-        "https://min-api.cryptocompare.com/data/histohour",
+        "/data/histohour",
         610, RateLimitGroup.HISTO)
     HISTO_MINUTE = (
-        "https://min-api.cryptocompare.com/data/histominute",
+        "/data/histominute",
         40, RateLimitGroup.HISTO)
     HISTO_DAY_TIMESTAMP = (
-        "https://min-api.cryptocompare.com/data/pricehistorical",
+        "/data/pricehistorical",
         86400, RateLimitGroup.HISTO)
     HISTO_DAY_AVERAGE = (
-        "https://min-api.cryptocompare.com/data/dayAvg",
+        "/data/dayAvg",
         610, RateLimitGroup.HISTO)
     TOP_EXCHANGES = (
-        "https://min-api.cryptocompare.com/data/top/exchanges",
+        "/data/top/exchanges",
         120, RateLimitGroup.PRICE)
     TOP_EXCHANGES_FULL = (
-        "https://min-api.cryptocompare.com/data/top/exchange/full",
+        "/data/top/exchange/full",
         120, RateLimitGroup.PRICE)
     TOP_VOLUMES = (
-        "https://min-api.cryptocompare.com/data/top/volumes",
+        "/data/top/volumes",
         120, RateLimitGroup.PRICE)
     TOP_PAIRS = (
-        "https://min-api.cryptocompare.com/data/top/pairs",
+        "/data/top/pairs",
         120, RateLimitGroup.PRICE)
     TOP_COINS = (
-        "https://min-api.cryptocompare.com/data/top/totalvol",
+        "/data/top/totalvol",
         120, RateLimitGroup.PRICE)
     SUBS_WATCHLIST = (
-        "https://min-api.cryptocompare.com/data/subsWatchlist",
+        "/data/subsWatchlist",
         60, RateLimitGroup.PRICE)
     SUBS_BY_PAIR = (
-        "https://min-api.cryptocompare.com/data/subs",
+        "/data/subs",
         10, RateLimitGroup.PRICE)
     LIST_NEWS_PROVIDER = (
-        "https://min-api.cryptocompare.com/data/news/providers",
+        "/data/news/providers",
         120, RateLimitGroup.NEWS)
     LATEST_NEWS_ARTICLES = (
-        "https://min-api.cryptocompare.com/data/news/",
+        "/data/news/",
         120, RateLimitGroup.NEWS)
     LIST_EXCHANGES = (
-        "https://min-api.cryptocompare.com/data/all/exchanges",
+        "/data/all/exchanges",
         60, RateLimitGroup.PRICE)
     LIST_COINS = (
-        "https://min-api.cryptocompare.com/data/all/coinlist",
+        "/data/all/coinlist",
         60, RateLimitGroup.PRICE)
     RATE_LIMIT = (
-        "https://min-api.cryptocompare.com/stats/rate/limit",
+        "/stats/rate/limit",
         1, RateLimitGroup.NO)
 
-    def __init__(self, full_url, caching, rateLimitGroup):
+    def __init__(self, path, caching, rateLimitGroup):
         """Enum constructor."""
-        self.full_url = full_url
+        self.path = path
         self.caching = caching
         self.rateLimitGroup = rateLimitGroup
 
     @property
     def full_url(self):
         """Get the full url to the API-method."""
-        return self.full_url
+        return self.url(DEFAULT_BASE_URL)
+
+    def url(self, base_url=DEFAULT_BASE_URL):
+        """Get the url to the API-method relative to base_url."""
+        return base_url.rstrip("/") + self.path
@@ -0,0 +1,210 @@
+"""Instrumentation of the API calls.
+
+Observers passed to the client are notified with a CallEvent after every
+call. MetricsAggregator is an observer collecting histograms in process,
+which can be exported as Prometheus text or JSON.
+"""
+import json
+import threading
+from bisect import bisect_left
+
+# Upper bounds in seconds of the histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CallEvent(object):
+    """Metadata and timings of one API call.
+
+    Attributes:
+        method (CryptoCompareMethod): The requested method
+        cache_hit (bool): Whether the result was served from the cache
+        retries (int): Retries performed by the transport and the
+            ResiliencePolicy
+        size (int): Size of the response body in bytes
+        error (str): Class name of the raised exception, None on success
+        timings (dict<str, dbl>): Seconds spent per phase. Phases are
+            "rate_limit" (waiting for the rate limiter), "dns" and
+            "connect" (if reported by the transport), "ttfb" (until the
+            response headers arrived), "download", "parse" and "total"
+    """
+
+    __slots__ = ("method", "cache_hit", "retries", "size", "error",
+                 "timings")
+
+    def __init__(self, method):
+        """Create an instance for a call of method."""
+        self.method = method
+        self.cache_hit = False
+        self.retries = 0
+        self.size = 0
+        self.error = None
+        self.timings = {}
+
+    @property
+    def group(self):
+        """The RateLimitGroup of the method."""
+        return self.method.rateLimitGroup
+
+    def __repr__(self):
+        """Return a readable representation."""
+        return "CallEvent(%s, cache_hit=%s, error=%s, timings=%r)" % (
+            self.method.name, self.cache_hit, self.error, self.timings)
+
+
+class Observer(object):
+    """Interface of an observer of API calls."""
+
+    def on_call(self, event):
+        """Handle a finished call.
+
+        Called in the thread performing the call, so it should be fast.
+
+        Args:
+            event (CallEvent): The metadata of the call
+        """
+        raise NotImplementedError()
+
+
+class Histogram(object):
+    """A histogram with fixed buckets."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Create an empty instance."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Add a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by the upper bound of its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self):
+        """Return the histogram as dictionary."""
+        return {"count": self.count, "sum": self.sum,
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"],
+                                    self.counts)),
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+
+class MetricsAggregator(Observer):
+    """Aggregates the CallEvents of a client in process.
+
+    Collects per method a histogram of the seconds spent per phase and
+    counters of calls, cache hits, errors by class, retries and bytes.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Create an instance.
+
+        Args:
+            buckets (tuple<dbl>): Upper bounds of the histogram buckets
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def on_call(self, event):
+        """Add the event to the metrics."""
+        method = event.method.name
+        with self._lock:
+            for phase, seconds in event.timings.items():
+                key = (method, phase)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            self._count(method, "calls", 1)
+            self._count(method, "cache_hits", int(event.cache_hit))
+            self._count(method, "retries", event.retries)
+            self._count(method, "bytes", event.size)
+            if event.error is not None:
+                self._count(method, "errors", 1, event.error)
+
+    def _count(self, method, name, value, error=None):
+        key = (method, name, error)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def histogram(self, method, phase):
+        """Get the histogram of a phase of a method, None if not observed."""
+        return self._histograms.get((method.name, phase))
+
+    def snapshot(self):
+        """Get all metrics as a dictionary.
+
+        Returns:
+            { <method>: { "timings": { <phase>: <histogram> },
+                          "calls": <int>, "cache_hits": <int>,
+                          "retries": <int>, "bytes": <int>,
+                          "errors": { <error class>: <int> } } }
+        """
+        result = {}
+        with self._lock:
+            for (method, phase), histogram in self._histograms.items():
+                entry = result.setdefault(method, {"timings": {},
+                                                   "errors": {}})
+                entry["timings"][phase] = histogram.as_dict()
+            for (method, name, error), value in self._counters.items():
+                entry = result.setdefault(method, {"timings": {},
+                                                   "errors": {}})
+                if error is None:
+                    entry[name] = value
+                else:
+                    entry["errors"][error] = value
+        return result
+
+    def to_json(self):
+        """Export the metrics as JSON."""
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self, prefix="cryptocompare"):
+        """Export the metrics in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            name = "%s_call_phase_seconds" % prefix
+            lines.append("# TYPE %s histogram" % name)
+            for (method, phase), histogram in sorted(
+                    self._histograms.items()):
+                labels = 'method="%s",phase="%s"' % (method, phase)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append('%s_bucket{%s,le="%s"} %d'
+                                 % (name, labels, bound, cumulative))
+                lines.append('%s_bucket{%s,le="+Inf"} %d'
+                             % (name, labels, histogram.count))
+                lines.append("%s_sum{%s} %r" % (name, labels, histogram.sum))
+                lines.append("%s_count{%s} %d"
+                             % (name, labels, histogram.count))
+            counters = sorted(self._counters.items(),
+                              key=lambda item: tuple(str(k) for k in item[0]))
+            for counter in ("calls", "cache_hits", "retries", "bytes",
+                            "errors"):
+                name = "%s_%s_total" % (prefix, counter)
+                lines.append("# TYPE %s counter" % name)
+                for (method, key, error), value in counters:
+                    if key != counter:
+                        continue
+                    labels = 'method="%s"' % method
+                    if error is not None:
+                        labels += ',error="%s"' % error
+                    lines.append("%s{%s} %d" % (name, labels, value))
+        return "\n".join(lines) + "\n"
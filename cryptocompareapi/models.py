@@ -0,0 +1,162 @@
+"""Compact, typed results of the API-methods.
+
+The models are slotted classes built while the body of a response is
+decoded: the json object_hook replaces every decoded object by its model
+right away, so no intermediate dictionaries are kept. The formatted
+DISPLAY strings of the full data methods can be dropped the same way.
+"""
+import json
+
+from .exceptions import CryptoCompareError
+
+
+class _Model(object):
+    """Base of the models, compared and represented by their fields.
+
+    FIELDS holds tuples (attribute, key in the response).
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, *values):
+        """Create an instance from the values in the order of FIELDS."""
+        for (name, _), value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_api(cls, obj):
+        """Create an instance from an object of a response."""
+        model = cls.__new__(cls)
+        for name, key in cls.FIELDS:
+            setattr(model, name, obj.get(key))
+        return model
+
+    def as_dict(self):
+        """Return the fields with the keys of the API."""
+        return {key: getattr(self, name) for name, key in self.FIELDS}
+
+    def __eq__(self, other):
+        """Compare the fields of models of the same type."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Return a readable representation."""
+        return "%s(%s)" % (type(self).__name__, ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__))
+
+
+class PriceQuote(_Model):
+    """The price of a pair."""
+
+    FIELDS = (("from_symbol", "FROMSYMBOL"), ("to_symbol", "TOSYMBOL"),
+              ("price", "PRICE"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class Ticker(_Model):
+    """The full trading info of a pair, from the RAW data of the API."""
+
+    FIELDS = (
+        ("type", "TYPE"), ("market", "MARKET"),
+        ("from_symbol", "FROMSYMBOL"), ("to_symbol", "TOSYMBOL"),
+        ("flags", "FLAGS"), ("price", "PRICE"),
+        ("last_update", "LASTUPDATE"), ("last_volume", "LASTVOLUME"),
+        ("last_volume_to", "LASTVOLUMETO"), ("last_trade_id", "LASTTRADEID"),
+        ("volume_day", "VOLUMEDAY"), ("volume_day_to", "VOLUMEDAYTO"),
+        ("volume_24h", "VOLUME24HOUR"), ("volume_24h_to", "VOLUME24HOURTO"),
+        ("open_day", "OPENDAY"), ("high_day", "HIGHDAY"),
+        ("low_day", "LOWDAY"), ("open_24h", "OPEN24HOUR"),
+        ("high_24h", "HIGH24HOUR"), ("low_24h", "LOW24HOUR"),
+        ("last_market", "LASTMARKET"), ("change_24h", "CHANGE24HOUR"),
+        ("change_pct_24h", "CHANGEPCT24HOUR"), ("change_day", "CHANGEDAY"),
+        ("change_pct_day", "CHANGEPCTDAY"), ("supply", "SUPPLY"),
+        ("market_cap", "MKTCAP"), ("total_volume_24h", "TOTALVOLUME24H"),
+        ("total_volume_24h_to", "TOTALVOLUME24HTO"),
+    )
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class Bar(_Model):
+    """A bar of a histo API-method."""
+
+    FIELDS = (("time", "time"), ("open", "open"), ("high", "high"),
+              ("low", "low"), ("close", "close"),
+              ("volumefrom", "volumefrom"), ("volumeto", "volumeto"))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+def _check(result):
+    if isinstance(result, dict) and result.get("Response") == "Error":
+        raise CryptoCompareError(result["Message"])
+    return result
+
+
+def _parser(typed, display):
+    """Create the parser of full data and histo responses."""
+    def hook(obj):
+        if "FROMSYMBOL" in obj and "PRICE" in obj:
+            if isinstance(obj["PRICE"], str):  # An entry of DISPLAY
+                return obj if display else None
+            return Ticker.from_api(obj) if typed else obj
+        if typed and "time" in obj and "close" in obj:
+            return Bar.from_api(obj)
+        if not display:
+            obj.pop("DISPLAY", None)
+        return obj
+
+    def parse(content):
+        return _check(json.loads(content, object_hook=hook))
+
+    # The name is part of the cache key of the parsed responses
+    parse.__name__ = "parse_%s%s" % ("typed" if typed else "raw",
+                                     "" if display else "_without_display")
+    return parse
+
+
+_PARSERS = {(typed, display): _parser(typed, display)
+            for typed in (False, True) for display in (False, True)}
+
+
+def parser(typed=False, display=True):
+    """Get the parser of full data and histo responses.
+
+    Args:
+        typed (bool): Build a Ticker of every RAW entry and a Bar of every
+            bar of a histo response
+        display (bool): Keep the DISPLAY data
+
+    Returns:
+        The parser, None for the raw response
+    """
+    if not typed and display:
+        return None
+    return _PARSERS[(typed, display)]
+
+
+def quote_parser(from_symbol=None):
+    """Get the parser of price responses building PriceQuotes.
+
+    Args:
+        from_symbol (str): The symbol of a single symbol price response.
+            Default None, a multiple symbols price response
+
+    Returns:
+        The parser
+    """
+    def quotes(fsym, prices):
+        return {tsym: PriceQuote(fsym, tsym, price)
+                for tsym, price in prices.items()}
+
+    def parse_quotes(content):
+        result = _check(json.loads(content))
+        if from_symbol is not None:
+            return quotes(from_symbol, result)
+        return {fsym: quotes(fsym, prices) for fsym, prices in result.items()}
+
+    return parse_quotes
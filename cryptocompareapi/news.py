@@ -0,0 +1,161 @@
+"""Incremental following of the news articles of latest_news_articles."""
+import json
+import os
+import time
+from collections import OrderedDict
+
+from .methods import CryptoCompareMethod
+
+DEFAULT_SEEN_SIZE = 10000
+DEFAULT_MAX_PAGES = 20
+
+
+def _articles(response):
+    """Get the articles of a response, in the format of API v1 or v2."""
+    if isinstance(response, dict):
+        return response.get("Data") or []
+    return response or []
+
+
+class NewsFollower(object):
+    """Yields the articles of a news query that were not yielded before.
+
+    The follower keeps the publishing time of the newest article as high
+    water mark. When the latest page does not reach back to it, e.g. after
+    downtime, older pages are requested with lTs until the gap is filled.
+    Articles are de-duplicated by id with a bounded set of the latest seen
+    ids.
+
+    The state can be checkpointed to a JSON file, so a restarted follower
+    continues where it stopped. One file can hold the state of followers
+    of different feeds and languages.
+
+    Example:
+        follower = NewsFollower(cc, feeds=["coindesk"], checkpoint="news.json")
+        for article in follower.follow():
+            store(article)
+    """
+
+    def __init__(self, client, feeds=None, lang="EN",
+                 seen_size=DEFAULT_SEEN_SIZE, checkpoint=None, start=None,
+                 max_pages=DEFAULT_MAX_PAGES):
+        """Create an instance.
+
+        Args:
+            client (CryptoCompare): Performs the requests
+            feeds (list<str>): The feeds to follow. Default None, all feeds
+            lang (str): The language of the articles
+            seen_size (int): Number of article ids remembered
+            checkpoint (str): A JSON file to load and store the state.
+                Default None, the state is kept in memory only
+            start (int): Timestamp to catch up from on the first poll.
+                Default None, the first poll yields the latest page only
+            max_pages (int): Maximum number of pages requested per poll
+        """
+        self.client = client
+        self.feeds = feeds
+        self.lang = lang
+        self.seen_size = seen_size
+        self.checkpoint = checkpoint
+        self.max_pages = max_pages
+        self.high_water_mark = start
+        self._seen = OrderedDict()
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self._load()
+
+    @property
+    def key(self):
+        """The key of the state of the follower in the checkpoint."""
+        feeds = self.feeds
+        if feeds is not None and not isinstance(feeds, str):
+            feeds = ",".join(sorted(feeds))
+        return "%s|%s" % (feeds or "ALL", self.lang)
+
+    def seen(self, article_id):
+        """Return whether an article was yielded before."""
+        return str(article_id) in self._seen
+
+    def poll(self):
+        """Get the articles published since the last poll.
+
+        Returns:
+            The new articles, the oldest first
+        """
+        new = []
+        last_timestamp = None
+        for _ in range(self.max_pages):
+            page = _articles(self.client.latest_news_articles(
+                self.feeds, last_timestamp, self.lang))
+            fresh = [a for a in page
+                     if not self.seen(a["id"])
+                     and (self.high_water_mark is None
+                          or a["published_on"] >= self.high_water_mark)]
+            new.extend(fresh)
+            if not fresh or self.high_water_mark is None:
+                break
+            oldest = min(a["published_on"] for a in page)
+            if oldest <= self.high_water_mark:
+                break
+            # lTs includes its timestamp, the duplicates are filtered
+            last_timestamp = oldest
+        unique = OrderedDict()
+        for article in sorted(new, key=lambda a: a["published_on"]):
+            unique[str(article["id"])] = article
+        for article_id, article in unique.items():
+            self._remember(article_id)
+            self.high_water_mark = max(self.high_water_mark or 0,
+                                       article["published_on"])
+        if unique and self.checkpoint is not None:
+            self.save()
+        return list(unique.values())
+
+    def follow(self, interval=None, sleep=time.sleep):
+        """Poll forever and yield the new articles.
+
+        Args:
+            interval (dbl): Seconds between two polls. Default the caching
+                period of the API-method, polling more often returns the
+                same page
+            sleep (callable): Sleeps for the given seconds
+
+        Yields:
+            The new articles, the oldest first
+        """
+        if interval is None:
+            interval = CryptoCompareMethod.LATEST_NEWS_ARTICLES.caching
+        while True:
+            for article in self.poll():
+                yield article
+            sleep(interval)
+
+    def _remember(self, article_id):
+        self._seen[article_id] = None
+        self._seen.move_to_end(article_id)
+        while len(self._seen) > self.seen_size:
+            self._seen.popitem(last=False)
+
+    def _load(self):
+        with open(self.checkpoint, encoding="utf-8") as f:
+            state = json.load(f).get(self.key)
+        if state is None:
+            return
+        self.high_water_mark = state["high_water_mark"]
+        for article_id in state["seen"][-self.seen_size:]:
+            self._seen[article_id] = None
+
+    def save(self, path=None):
+        """Write the state to the checkpoint file, replacing it atomically.
+
+        The states of other followers in the file are kept.
+        """
+        path = path or self.checkpoint
+        states = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                states = json.load(f)
+        states[self.key] = {"high_water_mark": self.high_water_mark,
+                            "seen": list(self._seen)}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(states, f, separators=(",", ":"))
+        os.replace(tmp, path)
@@ -0,0 +1,146 @@
+"""Bulk lookups of historical prices at many (pair, timestamp) points."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .backfilling import MAX_PAGE_SIZE, RESOLUTIONS, _FETCHERS
+from .methods import CryptoCompareMethod
+from .wrapper import DEFAULT_EXCHANGE, CalculationType
+
+
+def _point_params(from_symbol, to_symbol, timestamp, exchange,
+                  try_conversion):
+    """The params of the historical_day_timestamp request of a point."""
+    return {"fsym": from_symbol, "tsym": to_symbol, "e": exchange,
+            "tryConversion": try_conversion,
+            "calculationType": CalculationType.CLOSE, "ts": timestamp}
+
+
+def _windows(bar_times, step, page_size):
+    """Split sorted bar times into ranges fetched with one request each.
+
+    Returns:
+        A list of tuples (to_timestamp, limit)
+    """
+    windows = []
+    end = None
+    for bar_time in reversed(bar_times):
+        if end is None or end - bar_time > page_size * step:
+            if end is not None:
+                windows.append((end, (end - first) // step))
+            end = bar_time
+        first = bar_time
+    if end is not None:
+        windows.append((end, (end - first) // step))
+    return windows
+
+
+def historical_prices(client, points, resolution="day",
+                      exchange=DEFAULT_EXCHANGE, try_conversion=True,
+                      page_size=MAX_PAGE_SIZE, fallback=True):
+    """Get the prices of pairs at many timestamps with few requests.
+
+    The points are grouped by pair and resolved from the close of the bar
+    holding their timestamp. The bars are requested in ranges of up to
+    page_size bars, so a year of daily points of a pair takes one request
+    instead of one per point.
+
+    With resolution "day" the price equals the one of
+    historical_day_timestamp. The prices of completed days never change,
+    they are stored in the cache of the client as the result of
+    historical_day_timestamp for 86400 seconds, and points already cached
+    are not requested again. Points whose bar is missing or was not traded
+    are requested with historical_day_timestamp if fallback is set.
+
+    Args:
+        client (CryptoCompare): Performs the requests
+        points (list<tuple>): Tuples (from_symbol, to_symbol, timestamp)
+        resolution (str): "day" or "hour", the bars to take the close of
+        exchange (str): The exchange to obtain data from (Default "CCCAGG")
+        try_conversion (bool): If set to false, it will try to get only
+            direct trading values (Default true)
+        page_size (int): Bars per request, at most 2000
+        fallback (bool): Whether to request unresolved points one by one
+
+    Returns:
+        The prices in the order of the points, None for unresolved points
+
+    Raises:
+        HttpError: The Request failed due to a HTTPError
+        TimeoutException: The Request timed out
+        CryptoCompareError: The API returned an error message
+    """
+    step = RESOLUTIONS[resolution]
+    fetch = getattr(client, _FETCHERS[resolution])
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    cacheable = resolution == "day"
+    prices = [None] * len(points)
+    pairs = {}
+    for index, (from_symbol, to_symbol, timestamp) in enumerate(points):
+        if cacheable:
+            key = client._cache_key(
+                CryptoCompareMethod.HISTO_DAY_TIMESTAMP,
+                _point_params(from_symbol, to_symbol, timestamp, exchange,
+                              try_conversion))
+            if key is not None:
+                found, result = client.cache.get(key)
+                if found:
+                    prices[index] = result.get(from_symbol, {}).get(to_symbol)
+                    continue
+        pairs.setdefault((from_symbol, to_symbol), []).append(index)
+
+    requests = []
+    for (from_symbol, to_symbol), indices in pairs.items():
+        bar_times = sorted({points[i][2] // step * step for i in indices})
+        for to_timestamp, limit in _windows(bar_times, step, page_size):
+            requests.append((from_symbol, to_symbol, to_timestamp, limit))
+
+    def get_bars(request):
+        from_symbol, to_symbol, to_timestamp, limit = request
+        return fetch(from_symbol, to_symbol, exchange=exchange,
+                     try_conversion=try_conversion, limit=max(limit, 1),
+                     toTimestamp=to_timestamp, columnar=True)
+
+    closes = {}
+    workers = max(1, min(client.max_workers, len(requests)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for request, bars in zip(requests, executor.map(get_bars, requests)):
+            pair_closes = closes.setdefault(request[:2], {})
+            for bar_time, close in zip(bars.time, bars.close):
+                if close:
+                    pair_closes[bar_time] = close
+
+    completed = time.time() // step * step
+    unresolved = []
+    for (from_symbol, to_symbol), indices in pairs.items():
+        pair_closes = closes.get((from_symbol, to_symbol), {})
+        for index in indices:
+            timestamp = points[index][2]
+            bar_time = timestamp // step * step
+            close = pair_closes.get(bar_time)
+            if close is None:
+                unresolved.append(index)
+                continue
+            prices[index] = close
+            if cacheable and bar_time < completed:
+                key = client._cache_key(
+                    CryptoCompareMethod.HISTO_DAY_TIMESTAMP,
+                    _point_params(from_symbol, to_symbol, timestamp,
+                                  exchange, try_conversion))
+                if key is not None:
+                    client.cache.set(
+                        key, {from_symbol: {to_symbol: close}},
+                        CryptoCompareMethod.HISTO_DAY_TIMESTAMP.caching)
+
+    if fallback and unresolved:
+        def get_point(index):
+            from_symbol, to_symbol, timestamp = points[index]
+            result = client.historical_day_timestamp(
+                from_symbol, to_symbol, timestamp, exchange, try_conversion)
+            return result.get(from_symbol, {}).get(to_symbol)
+
+        workers = max(1, min(client.max_workers, len(unresolved)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, price in zip(unresolved,
+                                    executor.map(get_point, unresolved)):
+                prices[index] = price or None
+    return prices
@@ -0,0 +1,189 @@
+"""Client-side rate limiting and request accounting per RateLimitGroup."""
+import threading
+import time
+
+from .methods import RateLimitGroup
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+# The limits of the free API, in calls per period
+DEFAULT_LIMITS = {
+    RateLimitGroup.HISTO: {"second": 15, "minute": 300, "hour": 8000},
+    RateLimitGroup.PRICE: {"second": 50, "minute": 2000, "hour": 100000},
+    RateLimitGroup.NEWS: {"second": 50, "minute": 2000, "hour": 100000},
+    RateLimitGroup.STRICT: {"second": 1, "minute": 20, "hour": 500},
+}
+
+# Names of the groups in the response of the rate limit API-method
+GROUP_NAMES = {
+    "Histo": RateLimitGroup.HISTO,
+    "Price": RateLimitGroup.PRICE,
+    "News": RateLimitGroup.NEWS,
+    "Strict": RateLimitGroup.STRICT,
+}
+
+
+class _Bucket(object):
+    """A token bucket refilling `capacity` tokens per `period` seconds.
+
+    The tokens may become negative, the deficit is the time later callers
+    have to wait. This paces calls evenly instead of letting them burst
+    until the limit is hit.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, period, now):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """Seconds until one token is available."""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter(object):
+    """Shapes calls to stay within the limits of each RateLimitGroup.
+
+    Every group has one token bucket per period (second, minute, hour). A
+    call reserves a token in all buckets of its group and waits until all
+    of them allow it. Methods of the group RateLimitGroup.NO and groups
+    without configured limits are never delayed.
+
+    The calls made are counted per group in the current second, minute and
+    hour, like the API does.
+    """
+
+    def __init__(self, limits=None, clock=time.monotonic, sleep=time.sleep):
+        """Create an instance.
+
+        Args:
+            limits (dict<RateLimitGroup, dict<str, int>>): Calls allowed per
+                "second", "minute" and "hour" for each group. Default
+                DEFAULT_LIMITS
+            clock (callable): Returns the current time in seconds
+            sleep (callable): Sleeps for the given seconds
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._counters = {}
+        now = clock()
+        if limits is None:
+            limits = DEFAULT_LIMITS
+        for group, periods in limits.items():
+            for period, capacity in periods.items():
+                self.set_limit(group, period, capacity, now)
+
+    def set_limit(self, group, period, capacity, now=None):
+        """Set the calls allowed for a group in a period."""
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            self._buckets.setdefault(group, {})[period] = _Bucket(
+                capacity, PERIODS[period], now)
+
+    def reserve(self, group):
+        """Reserve a call for the group without waiting.
+
+        Returns:
+            The seconds the caller has to wait before performing the call
+        """
+        with self._lock:
+            now = self.clock()
+            delay = 0.0
+            buckets = self._buckets.get(group, {})
+            for bucket in buckets.values():
+                bucket.refill(now)
+                delay = max(delay, bucket.delay())
+            for bucket in buckets.values():
+                bucket.tokens -= 1
+            self._count(group, now + delay)
+            return delay
+
+    def try_acquire(self, group):
+        """Reserve a call for the group only if it is allowed right now.
+
+        Returns:
+            Whether the call was reserved
+        """
+        with self._lock:
+            now = self.clock()
+            buckets = self._buckets.get(group, {})
+            for bucket in buckets.values():
+                bucket.refill(now)
+                if bucket.delay() > 0:
+                    return False
+            for bucket in buckets.values():
+                bucket.tokens -= 1
+            self._count(group, now)
+            return True
+
+    def acquire(self, group):
+        """Wait until a call for the group is allowed and reserve it."""
+        delay = self.reserve(group)
+        if delay > 0:
+            self.sleep(delay)
+
+    def _count(self, group, at):
+        counters = self._counters.setdefault(group, {})
+        for period, length in PERIODS.items():
+            window = int(at // length)
+            current, count = counters.get(period, (window, 0))
+            if current != window:
+                count = 0
+            counters[period] = (window, count + 1)
+
+    def counts(self, group):
+        """Get the calls made by a group in the current periods.
+
+        Returns:
+            { "second": <calls>, "minute": <calls>, "hour": <calls> }
+        """
+        with self._lock:
+            now = self.clock()
+            counters = self._counters.get(group, {})
+            result = {}
+            for period, length in PERIODS.items():
+                window, count = counters.get(period, (None, 0))
+                result[period] = count if window == int(now // length) else 0
+            return result
+
+    def seed(self, rate_limits):
+        """Seed limits and counters from the response of rate_limits().
+
+        The limit of a period is set to the calls made plus the calls left,
+        and the bucket only holds the calls left.
+
+        Args:
+            rate_limits (dict): The response of CryptoCompare.rate_limits()
+        """
+        with self._lock:
+            now = self.clock()
+            for period in PERIODS:
+                stats = rate_limits.get(period.capitalize())
+                if not stats:
+                    continue
+                made = stats.get("CallsMade", {})
+                left = stats.get("CallsLeft", {})
+                for name, group in GROUP_NAMES.items():
+                    if name not in made or name not in left:
+                        continue
+                    bucket = _Bucket(made[name] + left[name],
+                                     PERIODS[period], now)
+                    bucket.tokens = left[name]
+                    self._buckets.setdefault(group, {})[period] = bucket
+                    window = int(now // PERIODS[period])
+                    self._counters.setdefault(group, {})[period] = (
+                        window, made[name])
@@ -0,0 +1,401 @@
+"""Retries, hedged requests and circuit breakers for transient failures."""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .exceptions import CircuitOpenError, HttpError, TimeoutException
+from .methods import RateLimitGroup
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy(object):
+    """Exponential backoff with full jitter.
+
+    The n-th retry waits a random time between 0 and
+    min(max_delay, base_delay * 2 ** n) seconds.
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.1, max_delay=5.0,
+                 status_codes=RETRY_STATUS_CODES, rng=None):
+        """Create an instance.
+
+        Args:
+            max_retries (int): Retries after the first attempt
+            base_delay (dbl): Seconds of the first backoff
+            max_delay (dbl): Maximum seconds of a backoff
+            status_codes (tuple<int>): HTTP status codes that are retried,
+                timeouts and requests without response are always retried
+            rng (random.Random): Source of the jitter
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.status_codes = status_codes
+        self.rng = rng if rng is not None else random.Random()
+
+    def retryable(self, error):
+        """Whether an error of an attempt is transient."""
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, TimeoutException):
+            return True
+        return isinstance(error, HttpError) and (
+            error.status_code is None
+            or error.status_code in self.status_codes)
+
+    def backoff(self, retry):
+        """Get the seconds to wait before the retry (counting from 0)."""
+        return self.rng.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class CircuitBreaker(object):
+    """Fails fast after repeated failures, until the API recovers.
+
+    After failure_threshold consecutive failed calls the circuit opens and
+    requests raise CircuitOpenError for reset_timeout seconds. Then a
+    single trial request is let through: its success closes the circuit,
+    its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0,
+                 clock=time.monotonic):
+        """Create an instance.
+
+        Args:
+            failure_threshold (int): Consecutive failures opening the circuit
+            reset_timeout (dbl): Seconds the circuit stays open
+            clock (callable): Returns the current time in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """"closed", "open" or "half-open"."""
+        if self.opened is None:
+            return "closed"
+        if self.clock() - self.opened < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        """Check whether a request may be performed.
+
+        Returns:
+            Whether the request is the trial request of a half-open circuit
+
+        Raises:
+            CircuitOpenError: The circuit is open
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+        raise CircuitOpenError()
+
+    def record_success(self):
+        """Record a successful request."""
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+            self._trial = False
+
+    def record_failure(self):
+        """Record a failed request."""
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened = self.clock()
+            self._trial = False
+
+
+class _Latencies(object):
+    """The latest latencies of successful requests."""
+
+    def __init__(self, window):
+        self.values = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.values.append(seconds)
+
+    def quantile(self, q):
+        values = sorted(self.values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class ResiliencePolicy(object):
+    """Retries, hedging and circuit breaking for the requests of a client.
+
+    Failed requests are retried with the RetryPolicy. The backoff and the
+    wait of the rate limiter overlap: a retry waits for the longer of both.
+    Every RateLimitGroup has its own CircuitBreaker, counting the calls that
+    failed with a transient error after all their retries. Requests of the
+    groups in hedge_groups that take longer than the hedge_quantile of their
+    recent latencies are duplicated, and the first response is used.
+    """
+
+    def __init__(self, retry=None, failure_threshold=5, reset_timeout=30.0,
+                 hedge_groups=(RateLimitGroup.PRICE,), hedge_quantile=0.95,
+                 hedge_min_samples=20, hedge_window=200, max_hedges=4,
+                 hedge_threads=32, clock=time.monotonic, sleep=time.sleep):
+        """Create an instance.
+
+        Args:
+            retry (RetryPolicy): Default RetryPolicy(), pass False to disable
+                retries
+            failure_threshold (int): Consecutive failures opening a circuit
+            reset_timeout (dbl): Seconds a circuit stays open
+            hedge_groups (tuple<RateLimitGroup>): Groups whose requests are
+                hedged, pass () to disable hedging
+            hedge_quantile (dbl): Quantile of the latency after which a
+                request is hedged
+            hedge_min_samples (int): Latencies to observe before hedging
+            hedge_window (int): Number of recent latencies considered
+            max_hedges (int): Maximum number of duplicate requests in flight
+            hedge_threads (int): Threads performing the requests of the
+                hedged groups
+            clock (callable): Returns the current time in seconds
+            sleep (callable): Sleeps for the given seconds
+        """
+        if retry is None:
+            retry = RetryPolicy()
+        self.retry = retry or RetryPolicy(max_retries=0)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_groups = frozenset(hedge_groups)
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_window = hedge_window
+        self.max_hedges = max_hedges
+        self.hedge_threads = hedge_threads
+        self._hedges = 0
+        self.clock = clock
+        self.sleep = sleep
+        self._breakers = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def breaker(self, group):
+        """Get the CircuitBreaker of a RateLimitGroup."""
+        with self._lock:
+            breaker = self._breakers.get(group)
+            if breaker is None:
+                breaker = self._breakers[group] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout, self.clock)
+            return breaker
+
+    def hedge_delay(self, group):
+        """Get the seconds after which a request is hedged, None if not."""
+        if group not in self.hedge_groups:
+            return None
+        latencies = self._latencies.get(group)
+        if latencies is None or len(latencies.values) < self.hedge_min_samples:
+            return None
+        return latencies.quantile(self.hedge_quantile)
+
+    def _observe(self, group, seconds):
+        with self._lock:
+            latencies = self._latencies.get(group)
+            if latencies is None:
+                latencies = self._latencies[group] = _Latencies(
+                    self.hedge_window)
+            latencies.add(seconds)
+
+    def call(self, send, group, rate_limiter=None, event=None, hedge=True):
+        """Perform a request with retries, hedging and circuit breaking.
+
+        Args:
+            send (callable): Performs one attempt, called with the event
+                to report on or None
+            group (RateLimitGroup): The group of the requested method
+            rate_limiter (RateLimiter): Reserves every attempt, if given
+            event (metrics.CallEvent): Reports retries and waits, if given
+            hedge (bool): If set to false, the request is never duplicated,
+                e.g. for streamed responses
+
+        Returns:
+            The body of the response
+
+        """
+        breaker = self.breaker(group)
+        trial = breaker.allow()
+        try:
+            return self._retried(send, group, breaker, rate_limiter, event,
+                                 hedge)
+        except Exception:
+            raise
+        except BaseException:
+            # Cancelled or interrupted, e.g. by asyncio.wait_for: a trial
+            # request must not keep the circuit locked
+            if trial:
+                breaker.record_failure()
+            raise
+
+    def _retried(self, send, group, breaker, rate_limiter, event, hedge):
+        """Perform the attempts of a call until one is final."""
+        retry = 0
+        while True:
+            wait_for = self.retry.backoff(retry - 1) if retry else 0.0
+            if rate_limiter is not None:
+                wait_for = max(wait_for, rate_limiter.reserve(group))
+            if wait_for > 0:
+                self.sleep(wait_for)
+            if event is not None and rate_limiter is not None:
+                event.timings["rate_limit"] = wait_for
+            start = self.clock()
+            try:
+                if hedge:
+                    content = self._hedged(send, group, rate_limiter, event)
+                else:
+                    content = send(event)
+            except Exception as e:
+                if self._give_up(breaker, retry, e):
+                    raise
+                retry += 1
+                if event is not None:
+                    event.retries += 1
+                continue
+            breaker.record_success()
+            self._observe(group, self.clock() - start)
+            return content
+
+    def _give_up(self, breaker, retry, error):
+        """Whether a failed attempt is final, recording it if so.
+
+        Only a call failing with a transient error after all its retries
+        counts as failure of the breaker. Other errors, like a 404 of a
+        wrong request, show that the API is up and count as success.
+        """
+        retryable = self.retry.retryable(error)
+        if retryable and retry < self.retry.max_retries:
+            return False
+        if retryable:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return True
+
+    def _start_hedge(self, group, rate_limiter):
+        """Whether a duplicate request is allowed now, reserving it if so."""
+        with self._lock:
+            if self._hedges >= self.max_hedges:
+                return False
+            if rate_limiter is not None and \
+                    not rate_limiter.try_acquire(group):
+                return False
+            self._hedges += 1
+            return True
+
+    def _end_hedge(self, *args):
+        with self._lock:
+            self._hedges -= 1
+
+    def _hedged(self, send, group, rate_limiter, event):
+        """Send a request, and a duplicate if it is slow."""
+        delay = self.hedge_delay(group)
+        if delay is None:
+            return send(event)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_threads,
+                    thread_name_prefix="hedge")
+        primary = self._executor.submit(send, event)
+        done, _ = wait((primary,), timeout=delay)
+        if done or not self._start_hedge(group, rate_limiter):
+            return primary.result()
+        hedge = self._executor.submit(send, None)
+        hedge.add_done_callback(self._end_hedge)
+        done, _ = wait((primary, hedge), return_when=FIRST_COMPLETED)
+        first = done.pop()
+        if first.exception() is None:
+            return first.result()
+        # The first response failed, the other one may still succeed
+        other = hedge if first is primary else primary
+        return other.result()
+
+    async def call_async(self, send, group, rate_limiter=None, event=None):
+        """Perform a request without blocking the event loop.
+
+        See call(), send is a coroutine function.
+        """
+        breaker = self.breaker(group)
+        trial = breaker.allow()
+        try:
+            return await self._retried_async(send, group, breaker,
+                                             rate_limiter, event)
+        except Exception:
+            raise
+        except BaseException:
+            # Cancelled or interrupted, e.g. by asyncio.wait_for: a trial
+            # request must not keep the circuit locked
+            if trial:
+                breaker.record_failure()
+            raise
+
+    async def _retried_async(self, send, group, breaker, rate_limiter,
+                             event):
+        """Perform the attempts of a call until one is final."""
+        retry = 0
+        while True:
+            wait_for = self.retry.backoff(retry - 1) if retry else 0.0
+            if rate_limiter is not None:
+                wait_for = max(wait_for, rate_limiter.reserve(group))
+            if wait_for > 0:
+                await asyncio.sleep(wait_for)
+            if event is not None and rate_limiter is not None:
+                event.timings["rate_limit"] = wait_for
+            start = self.clock()
+            try:
+                content = await self._hedged_async(send, group, rate_limiter,
+                                                   event)
+            except Exception as e:
+                if self._give_up(breaker, retry, e):
+                    raise
+                retry += 1
+                if event is not None:
+                    event.retries += 1
+                continue
+            breaker.record_success()
+            self._observe(group, self.clock() - start)
+            return content
+
+    async def _hedged_async(self, send, group, rate_limiter, event):
+        """Send a request, and a duplicate if it is slow."""
+        delay = self.hedge_delay(group)
+        if delay is None:
+            return await send(event)
+        primary = asyncio.ensure_future(send(event))
+        done, _ = await asyncio.wait((primary,), timeout=delay)
+        if done or not self._start_hedge(group, rate_limiter):
+            return await primary
+        hedge = asyncio.ensure_future(send(None))
+        hedge.add_done_callback(self._end_hedge)
+        done, pending = await asyncio.wait(
+            (primary, hedge), return_when=asyncio.FIRST_COMPLETED)
+        first = done.pop()
+        if first.exception() is None:
+            for task in pending:
+                task.cancel()
+            return first.result()
+        other = hedge if first is primary else primary
+        return await other
+
+    def close(self):
+        """Stop the threads performing hedged requests."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,342 @@
+"""Polling of API-methods aligned to the caching periods of the API.
+
+The API caches the response of a method for CryptoCompareMethod.caching
+seconds, polling it more often returns the same data. The Scheduler
+fetches every subscription once per period, just after the period
+started, and notifies the subscribers only when the result changed.
+
+Example:
+    scheduler = Scheduler(cc)
+    scheduler.subscribe("single_symbol_price", "BTC", ["USD", "EUR"],
+                        callback=lambda sub, value: print(value))
+    scheduler.subscribe("top_volumes", "USD", every=3600)
+    scheduler.start()
+"""
+import asyncio
+import inspect
+import logging
+import math
+import threading
+import time
+
+from .cache import bypass_cache
+from .methods import CryptoCompareMethod
+
+# The API-method requested by each client method that can be subscribed
+METHODS = {
+    "single_symbol_price": CryptoCompareMethod.PRICE,
+    "multiple_symbols_price": CryptoCompareMethod.PRICE_MULT,
+    "multiple_symbols_full_data": CryptoCompareMethod.PRICE_MULTI_FULL,
+    "generate_custom_average": CryptoCompareMethod.GENERATE_AVERAGE,
+    "historical_daily": CryptoCompareMethod.HISTO_DAY,
+    "historical_hourly": CryptoCompareMethod.HISTO_HOUR,
+    "historical_minute": CryptoCompareMethod.HISTO_MINUTE,
+    "historical_day_average": CryptoCompareMethod.HISTO_DAY_AVERAGE,
+    "top_exchanges_volume": CryptoCompareMethod.TOP_EXCHANGES,
+    "top_exchange_full": CryptoCompareMethod.TOP_EXCHANGES_FULL,
+    "top_volumes": CryptoCompareMethod.TOP_VOLUMES,
+    "top_pairs": CryptoCompareMethod.TOP_PAIRS,
+    "top_total_volume": CryptoCompareMethod.TOP_COINS,
+    "subs_watchlist": CryptoCompareMethod.SUBS_WATCHLIST,
+    "subs_by_pair": CryptoCompareMethod.SUBS_BY_PAIR,
+    "list_news_provider": CryptoCompareMethod.LIST_NEWS_PROVIDER,
+    "latest_news_articles": CryptoCompareMethod.LATEST_NEWS_ARTICLES,
+}
+
+# Seconds to wait after a period started, so the API renewed its cache
+DEFAULT_OFFSET = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+def _symbols(symbols):
+    """Get a list of symbols given as list or comma separated string."""
+    if isinstance(symbols, str):
+        return symbols.split(",")
+    return list(symbols)
+
+
+class Subscription(object):
+    """A client method polled by a Scheduler.
+
+    Attributes:
+        name (str): The name of the client method
+        arguments (dict<str>): The arguments of the call by parameter name
+        period (dbl): Seconds between two fetches
+        callback (callable): Called with the subscription and the new value
+        value: The latest value, None before the first fetch
+        due (dbl): Time of the next fetch
+    """
+
+    __slots__ = ("name", "arguments", "period", "callback", "value", "due",
+                 "fetched")
+
+    def __init__(self, name, arguments, period, callback):
+        """Create an instance, see Scheduler.subscribe."""
+        self.name = name
+        self.arguments = arguments
+        self.period = period
+        self.callback = callback
+        self.value = None
+        self.due = 0.0
+        self.fetched = False
+
+    def schedule(self, now, offset):
+        """Set the next fetch to the start of the next period."""
+        self.due = math.ceil((now - offset) / self.period) * self.period \
+            + offset
+        if self.due <= now:
+            self.due += self.period
+
+    def batch_key(self):
+        """Key of the subscriptions that can be fetched in one call.
+
+        Single symbol prices of the same exchange and conversion setting
+        are merged, other subscriptions, including typed prices, are
+        fetched on their own.
+        """
+        if self.name != "single_symbol_price" \
+                or self.arguments.get("typed"):
+            return None
+        return (self.arguments["exchange"], self.arguments["try_conversion"])
+
+    def __repr__(self):
+        """Return a readable representation."""
+        return "Subscription(%s, %r, period=%s)" % (
+            self.name, self.arguments, self.period)
+
+
+class Scheduler(object):
+    """Polls subscriptions, aligned to the caching periods of the API.
+
+    Subscriptions due at the same time are fetched together, and single
+    symbol prices are merged into multiple symbol requests. The requests
+    bypass the cache of the client and go through its rate limiter, so a
+    client with a RateLimiter keeps the scheduler within the limits of every
+    RateLimitGroup.
+
+    Updates are delivered to the callbacks of the subscriptions, to the
+    on_update callable and to the async iterators of updates(). A
+    subscriber is only notified when the fetched value differs from the
+    previous one.
+    """
+
+    def __init__(self, client, on_update=None, on_error=None,
+                 offset=DEFAULT_OFFSET, clock=time.time):
+        """Create an instance.
+
+        Args:
+            client (CryptoCompare): Performs the requests
+            on_update (callable): Called with the subscription and the new
+                value of every update
+            on_error (callable): Called with the subscription and the
+                exception when a fetch or a callback failed. The subscription
+                is fetched again in its next period. Default None, the errors
+                are logged
+            offset (dbl): Seconds to wait after a period started
+            clock (callable): Returns the current wall-clock time in seconds
+        """
+        self.client = client
+        self.on_update = on_update
+        self.on_error = on_error
+        self.offset = offset
+        self.clock = clock
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._queues = []
+        self._thread = None
+        self._stopped = threading.Event()
+        self._changed = threading.Event()
+
+    def subscribe(self, name, *args, every=None, callback=None, **kwargs):
+        """Subscribe to the result of a client method.
+
+        Args:
+            name (str): The client method, one of METHODS
+            *args, **kwargs: The arguments of the client method
+            every (dbl): Seconds between two fetches. Default and minimum is
+                the caching period of the API-method, it is rounded up to a
+                multiple of it
+            callback (callable): Called with the subscription and the new
+                value whenever it changed
+
+        Returns:
+            Subscription
+        """
+        if name not in METHODS:
+            raise ValueError("The method %s can not be subscribed." % name)
+        caching = METHODS[name].caching
+        period = caching
+        if every is not None and every > caching:
+            period = math.ceil(every / caching) * caching
+        bound = inspect.signature(getattr(self.client, name)).bind(
+            *args, **kwargs)
+        bound.apply_defaults()
+        subscription = Subscription(name, dict(bound.arguments), period,
+                                    callback)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        self._changed.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop polling a subscription."""
+        with self._lock:
+            self._subscriptions.remove(subscription)
+
+    @property
+    def subscriptions(self):
+        """The list of subscriptions."""
+        with self._lock:
+            return list(self._subscriptions)
+
+    def next_due(self):
+        """Get the time of the next fetch, None without subscriptions."""
+        with self._lock:
+            return min((s.due for s in self._subscriptions), default=None)
+
+    def run_pending(self):
+        """Fetch the subscriptions that are due, in the calling thread.
+
+        Subscriptions are fetched for the first time right away.
+
+        Returns:
+            The number of subscriptions fetched
+        """
+        now = self.clock()
+        with self._lock:
+            due = [s for s in self._subscriptions if s.due <= now]
+        batches = {}
+        for subscription in due:
+            batches.setdefault(subscription.batch_key() or subscription,
+                               []).append(subscription)
+        try:
+            with bypass_cache():
+                for key, subscriptions in batches.items():
+                    if isinstance(key, Subscription):
+                        self._fetch(key)
+                    else:
+                        self._fetch_prices(key, subscriptions)
+        finally:
+            for subscription in due:
+                subscription.schedule(now, self.offset)
+        return len(due)
+
+    def _fetch(self, subscription):
+        """Fetch a single subscription."""
+        try:
+            value = getattr(self.client, subscription.name)(
+                **subscription.arguments)
+        except Exception as e:
+            self._error(subscription, e)
+            return
+        self._update(subscription, value)
+
+    def _fetch_prices(self, key, subscriptions):
+        """Fetch single symbol prices in one multiple symbols request."""
+        exchange, try_conversion = key
+        from_symbols = list(dict.fromkeys(
+            s.arguments["from_symbol"] for s in subscriptions))
+        to_symbols = list(dict.fromkeys(
+            symbol for s in subscriptions
+            for symbol in _symbols(s.arguments["to_symbols"])))
+        try:
+            result = self.client.multiple_symbols_price(
+                from_symbols, to_symbols, exchange, try_conversion)
+        except Exception as e:
+            for subscription in subscriptions:
+                self._error(subscription, e)
+            return
+        for subscription in subscriptions:
+            prices = result.get(subscription.arguments["from_symbol"], {})
+            self._update(subscription, {
+                symbol: prices[symbol]
+                for symbol in _symbols(subscription.arguments["to_symbols"])
+                if symbol in prices})
+
+    def _error(self, subscription, error):
+        """Report an error to on_error, or log it without on_error."""
+        if self.on_error is None:
+            logger.error("Polling %r failed", subscription, exc_info=error)
+            return
+        try:
+            self.on_error(subscription, error)
+        except Exception:
+            logger.exception("on_error failed for %r", subscription)
+
+    def _notify(self, callback, subscription, value):
+        """Call a callback, reporting its exception as error."""
+        try:
+            callback(subscription, value)
+        except Exception as e:
+            self._error(subscription, e)
+
+    def _update(self, subscription, value):
+        """Store a fetched value and notify if it changed."""
+        if subscription.fetched and value == subscription.value:
+            return
+        subscription.value = value
+        subscription.fetched = True
+        if subscription.callback is not None:
+            self._notify(subscription.callback, subscription, value)
+        if self.on_update is not None:
+            self._notify(self.on_update, subscription, value)
+        with self._lock:
+            queues = list(self._queues)
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait,
+                                          (subscription, value))
+            except RuntimeError:  # The loop of the iterator was closed
+                pass
+
+    def start(self):
+        """Poll the subscriptions in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="cryptocompare-scheduler")
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, waiting for a running fetch."""
+        self._stopped.set()
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._changed.clear()
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Polling the subscriptions failed")
+            due = self.next_due()
+            wait = None if due is None else max(0.0, due - self.clock())
+            self._changed.wait(wait)
+
+    async def updates(self):
+        """Iterate the updates asynchronously.
+
+        Starts the background thread if it is not running.
+
+        Example:
+            async for subscription, value in scheduler.updates():
+                ...
+
+        Yields:
+            Tuples (subscription, value)
+        """
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._queues.append(entry)
+        self.start()
+        try:
+            while True:
+                yield await entry[1].get()
+        finally:
+            with self._lock:
+                self._queues.remove(entry)
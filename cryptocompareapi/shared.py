@@ -0,0 +1,379 @@
+"""A response cache and a rate limiter shared by processes on one host.
+
+Both keep their state in a SQLite database, so the workers of a gunicorn
+or multiprocessing pool reuse each other's responses and respect a single
+API budget. Point all of them at the same file:
+
+    cc = CryptoCompare.shared("myApp", "/var/lib/myapp/cryptocompare.sqlite")
+
+The file is created readable and writable by its owner only. Keep it in a
+directory other users can not write to, not in a shared one like /tmp.
+
+The times are wall-clock seconds, as monotonic clocks are not comparable
+between processes.
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from .cache import DEFAULT_CACHE_SIZE, CacheStats
+from .columnar import COLUMNS, OHLCV, _TYPECODES
+from .models import Bar, PriceQuote, Ticker
+from .ratelimit import (DEFAULT_LIMITS, GROUP_NAMES, PERIODS, RateLimiter,
+                        _Bucket)
+
+# Seconds to wait for a lock on the database held by another process
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS buckets (
+    grp TEXT NOT NULL, period TEXT NOT NULL, capacity REAL NOT NULL,
+    tokens REAL NOT NULL, updated REAL NOT NULL,
+    PRIMARY KEY (grp, period));
+CREATE TABLE IF NOT EXISTS counters (
+    grp TEXT NOT NULL, period TEXT NOT NULL, window INTEGER NOT NULL,
+    count INTEGER NOT NULL, PRIMARY KEY (grp, period));
+"""
+
+
+# The tag of the objects that are not plain JSON in the stored values
+_TAG = "__cryptocompareapi__"
+_MODELS = {model.__name__: model for model in (PriceQuote, Ticker, Bar)}
+
+
+def _encode(value):
+    """Encode an OHLCV or a model as tagged JSON object."""
+    if isinstance(value, OHLCV):
+        return {_TAG: "OHLCV", "columns": [
+            base64.b64encode(getattr(value, name).tobytes()).decode("ascii")
+            for name in COLUMNS]}
+    if type(value).__name__ in _MODELS:
+        return {_TAG: type(value).__name__,
+                "values": [getattr(value, name) for name in value.__slots__]}
+    raise TypeError("%s can not be cached" % type(value).__name__)
+
+
+def _decode(obj):
+    """Decode the tagged JSON objects written by _encode."""
+    tag = obj.get(_TAG)
+    if tag is None:
+        return obj
+    if tag == "OHLCV":
+        return OHLCV(*(array(typecode, base64.b64decode(column))
+                       for typecode, column in zip(_TYPECODES,
+                                                   obj["columns"])))
+    return _MODELS[tag](*obj["values"])
+
+
+def dumps(value):
+    """Serialize a cached value, see loads()."""
+    return json.dumps(value, default=_encode,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def loads(blob):
+    """Deserialize a cached value.
+
+    The values are JSON, so a tampered file can not execute code. OHLCV
+    results and models are stored as tagged objects.
+    """
+    return json.loads(blob, object_hook=_decode)
+
+
+def _create_private(path):
+    """Create a file readable and writable by its owner only."""
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+    except FileExistsError:
+        pass
+
+
+class _Database(object):
+    """Connections to a SQLite file, one per thread and process."""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        _create_private(path)
+        self.connection().executescript(_SCHEMA)
+
+    def connection(self):
+        """Get the connection of the current thread.
+
+        A forked child process opens its own connections instead of using
+        the ones inherited from its parent.
+        """
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    @contextmanager
+    def transaction(self):
+        """Context holding the write lock of the database.
+
+        Taking the lock up front serializes the read-modify-write of all
+        processes.
+        """
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+
+class SQLiteCache(object):
+    """A response cache in a SQLite file, shared by processes.
+
+    Has the interface of TTLCache. The values are stored as JSON, see
+    loads(). When maxsize is exceeded, the entries expiring first are
+    evicted. The stats count the operations of the current process only.
+    """
+
+    def __init__(self, path, maxsize=DEFAULT_CACHE_SIZE,
+                 timeout=DEFAULT_LOCK_TIMEOUT, clock=time.time):
+        """Create an instance.
+
+        Args:
+            path (str): The SQLite file, created if it does not exist
+            maxsize (int): Maximum number of entries
+            timeout (dbl): Seconds to wait for a lock held by another process
+            clock (callable): Returns the current wall-clock time in seconds
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.clock = clock
+        self.stats = CacheStats()
+        self._db = _Database(path, timeout)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a value from the cache.
+
+        Returns:
+            A tuple (found, value)
+        """
+        row = self._db.connection().execute(
+            "SELECT expires, value FROM cache WHERE key = ?",
+            (repr(key),)).fetchone()
+        found = row is not None and row[0] > self.clock()
+        with self._lock:
+            if found:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+                if row is not None:
+                    self.stats.expirations += 1
+        if not found:
+            return False, None
+        return True, loads(row[1])
+
+    def set(self, key, value, ttl):
+        """Store a value in the cache for ttl seconds."""
+        if ttl <= 0:
+            return
+        blob = dumps(value)
+        now = self.clock()
+        with self._db.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) "
+                "VALUES (?, ?, ?)", (repr(key), now + ttl, blob))
+            size = connection.execute(
+                "SELECT COUNT(*) FROM cache").fetchone()[0]
+            if size <= self.maxsize:
+                return
+            expired = connection.execute(
+                "DELETE FROM cache WHERE expires <= ?", (now,)).rowcount
+            size -= expired
+            evicted = 0
+            if size > self.maxsize:
+                evicted = connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                    "ORDER BY expires LIMIT ?)",
+                    (size - self.maxsize,)).rowcount
+        with self._lock:
+            self.stats.expirations += expired
+            self.stats.evictions += evicted
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._db.transaction() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def __len__(self):
+        """Return the number of entries, including expired ones."""
+        return self._db.connection().execute(
+            "SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def _load_bucket(capacity, period, tokens, updated):
+    bucket = _Bucket(capacity, PERIODS[period], updated)
+    bucket.tokens = tokens
+    return bucket
+
+
+class SharedRateLimiter(RateLimiter):
+    """A RateLimiter whose buckets and counters live in a SQLite file.
+
+    All processes using the same file share the calls allowed per group.
+    The limits are only written by the first process creating the file,
+    later instances keep the stored limits unless set_limit() or seed()
+    change them.
+    """
+
+    def __init__(self, path, limits=None, timeout=DEFAULT_LOCK_TIMEOUT,
+                 clock=time.time, sleep=time.sleep):
+        """Create an instance.
+
+        Args:
+            path (str): The SQLite file, created if it does not exist
+            limits (dict<RateLimitGroup, dict<str, int>>): Calls allowed per
+                "second", "minute" and "hour" for each group. Default
+                DEFAULT_LIMITS
+            timeout (dbl): Seconds to wait for a lock held by another process
+            clock (callable): Returns the current wall-clock time in seconds
+            sleep (callable): Sleeps for the given seconds
+        """
+        self.path = path
+        self.clock = clock
+        self.sleep = sleep
+        self._db = _Database(path, timeout)
+        if limits is None:
+            limits = DEFAULT_LIMITS
+        now = clock()
+        with self._db.transaction() as connection:
+            for group, periods in limits.items():
+                for period, capacity in periods.items():
+                    capacity = max(capacity, 1)
+                    connection.execute(
+                        "INSERT OR IGNORE INTO buckets "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (group.name, period, capacity, capacity, now))
+
+    def set_limit(self, group, period, capacity, now=None):
+        """Set the calls allowed for a group in a period."""
+        if now is None:
+            now = self.clock()
+        capacity = max(capacity, 1)
+        with self._db.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)",
+                (group.name, period, capacity, capacity, now))
+
+    def _buckets_of(self, connection, group, now):
+        """Load and refill the buckets of a group."""
+        buckets = {}
+        for period, capacity, tokens, updated in connection.execute(
+                "SELECT period, capacity, tokens, updated FROM buckets "
+                "WHERE grp = ?", (group.name,)):
+            bucket = _load_bucket(capacity, period, tokens, updated)
+            # Clocks of processes may differ slightly, never refill backwards
+            bucket.refill(max(now, updated))
+            buckets[period] = bucket
+        return buckets
+
+    def _take(self, connection, group, buckets, at):
+        """Take a token from every bucket and count the call."""
+        for period, bucket in buckets.items():
+            connection.execute(
+                "UPDATE buckets SET tokens = ?, updated = ? "
+                "WHERE grp = ? AND period = ?",
+                (bucket.tokens - 1, bucket.updated, group.name, period))
+        for period, length in PERIODS.items():
+            window = int(at // length)
+            row = connection.execute(
+                "SELECT window, count FROM counters "
+                "WHERE grp = ? AND period = ?",
+                (group.name, period)).fetchone()
+            count = row[1] if row is not None and row[0] == window else 0
+            connection.execute(
+                "INSERT OR REPLACE INTO counters VALUES (?, ?, ?, ?)",
+                (group.name, period, window, count + 1))
+
+    def reserve(self, group):
+        """Reserve a call for the group without waiting.
+
+        Returns:
+            The seconds the caller has to wait before performing the call
+        """
+        with self._db.transaction() as connection:
+            now = self.clock()
+            buckets = self._buckets_of(connection, group, now)
+            delay = max([b.delay() for b in buckets.values()] + [0.0])
+            self._take(connection, group, buckets, now + delay)
+        return delay
+
+    def try_acquire(self, group):
+        """Reserve a call for the group only if it is allowed right now.
+
+        Returns:
+            Whether the call was reserved
+        """
+        with self._db.transaction() as connection:
+            now = self.clock()
+            buckets = self._buckets_of(connection, group, now)
+            if any(b.delay() > 0 for b in buckets.values()):
+                return False
+            self._take(connection, group, buckets, now)
+        return True
+
+    def counts(self, group):
+        """Get the calls made by all processes in the current periods.
+
+        Returns:
+            { "second": <calls>, "minute": <calls>, "hour": <calls> }
+        """
+        now = self.clock()
+        rows = dict((period, (window, count))
+                    for period, window, count in self._db.connection().execute(
+                        "SELECT period, window, count FROM counters "
+                        "WHERE grp = ?", (group.name,)))
+        result = {}
+        for period, length in PERIODS.items():
+            window, count = rows.get(period, (None, 0))
+            result[period] = count if window == int(now // length) else 0
+        return result
+
+    def seed(self, rate_limits):
+        """Seed limits and counters from the response of rate_limits().
+
+        See RateLimiter.seed
+        """
+        with self._db.transaction() as connection:
+            now = self.clock()
+            for period in PERIODS:
+                stats = rate_limits.get(period.capitalize())
+                if not stats:
+                    continue
+                made = stats.get("CallsMade", {})
+                left = stats.get("CallsLeft", {})
+                for name, group in GROUP_NAMES.items():
+                    if name not in made or name not in left:
+                        continue
+                    connection.execute(
+                        "INSERT OR REPLACE INTO buckets "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (group.name, period,
+                         max(made[name] + left[name], 1), left[name], now))
+                    connection.execute(
+                        "INSERT OR REPLACE INTO counters VALUES (?, ?, ?, ?)",
+                        (group.name, period, int(now // PERIODS[period]),
+                         made[name]))
@@ -0,0 +1,192 @@
+"""A persistent local store for the bars of the histo API-methods."""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from itertools import islice, takewhile
+
+from .backfilling import MAX_PAGE_SIZE, RESOLUTIONS, backfill
+from .columnar import OHLCV, COLUMNS
+from .wrapper import DEFAULT_EXCHANGE
+
+# One bar: int64 time followed by the float64 columns, little-endian
+RECORD = struct.Struct("<q6d")
+
+
+def _pack(bars):
+    """Pack bars into consecutive records."""
+    return b"".join(RECORD.pack(*(bar[name] for name in COLUMNS))
+                    for bar in bars)
+
+
+def _pages(bars, size=MAX_PAGE_SIZE):
+    """Split an iterable of bars into lists of at most size bars."""
+    bars = iter(bars)
+    page = list(islice(bars, size))
+    while page:
+        yield page
+        page = list(islice(bars, size))
+
+
+def _reversed_blocks(f, sizes):
+    """Read the blocks of sizes ending at the position of f, last first."""
+    offset = f.tell()
+    for size in reversed(sizes):
+        offset -= size
+        f.seek(offset)
+        yield f.read(size)
+
+
+class OHLCVStore(object):
+    """Append-only files of bars, one per exchange, pair and resolution.
+
+    Every file is a sequence of fixed size records ordered by time. Range
+    queries memory-map the file and return an OHLCV whose columns are views
+    on the mapped file, so no bars are copied or requested from the API.
+    Use sync() to append the bars newer than the last stored one.
+    """
+
+    def __init__(self, root):
+        """Create an instance.
+
+        Args:
+            root (str): Directory holding the files, created if missing
+        """
+        self.root = root
+        self._lock = threading.Lock()
+
+    def path(self, from_symbol, to_symbol, resolution="day",
+             exchange=DEFAULT_EXCHANGE):
+        """Get the path of the file of a pair."""
+        RESOLUTIONS[resolution]  # Raises KeyError for unknown resolutions
+        return os.path.join(self.root, exchange, "%s-%s-%s.bin" % (
+            from_symbol, to_symbol, resolution))
+
+    def last_timestamp(self, from_symbol, to_symbol, resolution="day",
+                       exchange=DEFAULT_EXCHANGE):
+        """Get the time of the last stored bar, None if there is none."""
+        path = self.path(from_symbol, to_symbol, resolution, exchange)
+        try:
+            with open(path, "rb") as f:
+                count = os.fstat(f.fileno()).st_size // RECORD.size
+                if not count:
+                    return None
+                f.seek((count - 1) * RECORD.size)
+                return RECORD.unpack(f.read(RECORD.size))[0]
+        except FileNotFoundError:
+            return None
+
+    def append(self, from_symbol, to_symbol, bars, resolution="day",
+               exchange=DEFAULT_EXCHANGE):
+        """Append bars newer than the last stored bar.
+
+        Args:
+            bars (iterable<dict>): Bars as returned by the API, in any order
+
+        Returns:
+            The number of bars appended
+        """
+        path = self.path(from_symbol, to_symbol, resolution, exchange)
+        with self._lock:
+            last = self.last_timestamp(from_symbol, to_symbol, resolution,
+                                       exchange)
+            bars = sorted((bar for bar in bars
+                           if last is None or bar["time"] > last),
+                          key=lambda bar: bar["time"])
+            if bars:
+                self._write(path, [_pack(bars)])
+            return len(bars)
+
+    @staticmethod
+    def _write(path, blocks):
+        """Append blocks of records to a file, the lock must be held."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as f:
+            # Drop a partially written record of an interrupted append
+            f.truncate(f.tell() - f.tell() % RECORD.size)
+            for block in blocks:
+                f.write(block)
+
+    def read(self, from_symbol, to_symbol, start=None, end=None,
+             resolution="day", exchange=DEFAULT_EXCHANGE):
+        """Get the stored bars with start <= time <= end.
+
+        Returns:
+            An OHLCV with views on the memory-mapped file
+        """
+        path = self.path(from_symbol, to_symbol, resolution, exchange)
+        try:
+            with open(path, "rb") as f:
+                count = os.fstat(f.fileno()).st_size // RECORD.size
+                if not count:
+                    return OHLCV.empty()
+                mapped = mmap.mmap(f.fileno(), count * RECORD.size,
+                                   access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return OHLCV.empty()
+        first = 0 if start is None else self._search(mapped, count, start)
+        stop = count if end is None else self._search(mapped, count, end + 1)
+        records = memoryview(mapped)[first * RECORD.size:stop * RECORD.size]
+        if sys.byteorder != "little":
+            return OHLCV.from_bars(dict(zip(COLUMNS, values))
+                                   for values in RECORD.iter_unpack(records))
+        fields = len(COLUMNS)
+        times = records.cast("q")[0::fields]
+        values = records.cast("d")
+        return OHLCV(times, *(values[i::fields] for i in range(1, fields)))
+
+    @staticmethod
+    def _search(mapped, count, timestamp):
+        """Get the index of the first record with time >= timestamp."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(mapped, middle * RECORD.size)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def sync(self, client, from_symbol, to_symbol, start, resolution="day",
+             exchange=DEFAULT_EXCHANGE):
+        """Fetch and append the completed bars newer than the last stored.
+
+        The backfill yields the newest bars first. They are packed one page
+        at a time into a temporary file and appended from the oldest page,
+        so only a page of bars is held in memory.
+
+        Args:
+            client (CryptoCompare): The client to fetch the bars with
+            start (int): Unix timestamp to start from if nothing is stored
+
+        Returns:
+            The number of bars appended
+        """
+        step = RESOLUTIONS[resolution]
+        last = self.last_timestamp(from_symbol, to_symbol, resolution,
+                                   exchange)
+        if last is not None:
+            start = last + step
+        # The bar of the current period is still changing
+        end = int(time.time()) // step * step - step
+        if start > end:
+            return 0
+        bars = backfill(client, from_symbol, to_symbol, start, end,
+                        resolution=resolution, exchange=exchange)
+        path = self.path(from_symbol, to_symbol, resolution, exchange)
+        with self._lock, tempfile.TemporaryFile() as spill:
+            # Another sync may have appended bars in the meantime
+            last = self.last_timestamp(from_symbol, to_symbol, resolution,
+                                       exchange)
+            if last is not None:
+                bars = takewhile(lambda bar: bar["time"] > last, bars)
+            sizes = []
+            for page in _pages(bars):
+                spill.write(_pack(reversed(page)))
+                sizes.append(len(page) * RECORD.size)
+            if sizes:
+                self._write(path, _reversed_blocks(spill, sizes))
+            return sum(sizes) // RECORD.size
@@ -0,0 +1,200 @@
+"""HTTP transports used by the wrapper to talk to the API.
+
+A transport performs a single GET request and returns the raw body of the
+response. It is responsible for mapping the errors of the used HTTP library
+to the exceptions of this package.
+"""
+import os
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from .exceptions import HttpError, TimeoutException
+
+DEFAULT_POOL_SIZE = 10
+RETRY_STATUS_CODES = (502, 503, 504)
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Transports whose pooled connections are dropped in forked processes
+_transports = weakref.WeakSet()
+
+
+def _after_fork():
+    """Drop the pooled connections inherited from the parent process."""
+    for transport in list(_transports):
+        transport._mount()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _is_read_timeout(error):
+    """Whether a ConnectionError wraps a timeout while reading.
+
+    With a Retry configured, urllib3 wraps the timeout in a MaxRetryError.
+    """
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, ReadTimeoutError)
+
+
+class Transport(object):
+    """Interface of a transport.
+
+    Subclass it to plug in another HTTP library or a stand-in for the API.
+    """
+
+    def get(self, url, params, timeout, event=None):
+        """Perform a GET request.
+
+        Args:
+            url (str): The url to request
+            params (dict<str>): The query parameters
+            timeout (dbl): Seconds to wait for a server response
+            event (metrics.CallEvent): If given, the timings of the phases
+                of the request and the retries are reported on it
+
+        Returns:
+            The body of the response as bytes
+
+        Raises:
+            HttpError: The Request failed with a status != 200 or no
+                response was received
+            TimeoutException: The Request timed out
+
+        """
+        raise NotImplementedError()
+
+    def stream(self, url, params, timeout):
+        """Perform a GET request and stream the body of the response.
+
+        Returns:
+            An iterable of the chunks of the body as bytes
+
+        Raises:
+            HttpError: The Request failed with a status != 200 or no
+                response was received
+            TimeoutException: The Request timed out
+
+        """
+        return [self.get(url, params, timeout)]
+
+    def close(self):
+        """Release all resources held by the transport."""
+
+
+class RequestsTransport(Transport):
+    """Transport using a pooled requests.Session.
+
+    Connections to the API are kept alive and reused between calls, so only
+    the first request to a host pays for the TCP and TLS handshake.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_SIZE,
+                 pool_maxsize=DEFAULT_POOL_SIZE, max_retries=0,
+                 backoff_factor=0.3, keep_alive=True, session=None):
+        """Create an instance.
+
+        Args:
+            pool_connections (int): Number of hosts to keep pools for
+            pool_maxsize (int): Maximum number of connections kept per host
+            max_retries (int): Retries on connection errors and on the status
+                codes 502, 503 and 504. Default 0
+            backoff_factor (dbl): Backoff factor between retries
+            keep_alive (bool): If set to false, connections are closed after
+                every request (Default true)
+            session (requests.Session): Use this session instead of creating
+                a new one
+        """
+        self.session = session if session is not None else requests.Session()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry = Retry(total=max_retries,
+                           backoff_factor=backoff_factor,
+                           status_forcelist=RETRY_STATUS_CODES,
+                           allowed_methods=("GET",),
+                           raise_on_status=False)
+        self._mount()
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        _transports.add(self)
+
+    def _mount(self):
+        """Mount adapters with new, empty connection pools on the session.
+
+        Also called in forked child processes, which must not share the
+        sockets of the parent.
+        """
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              max_retries=self.retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, params, timeout, event=None):
+        """Perform a GET request on the pooled session.
+
+        The time to the first byte reported includes resolving the host
+        and connecting, which requests does not report separately.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, timeout=timeout,
+                                        stream=True)
+            # Closing releases the connection, also of failed responses
+            with response:
+                response.raise_for_status()
+                headers = time.perf_counter()
+                content = response.content
+        except requests.exceptions.HTTPError as e:
+            raise HttpError(e.response.status_code) from e
+        except requests.exceptions.Timeout as e:
+            raise TimeoutException() from e
+        except requests.exceptions.ConnectionError as e:
+            if _is_read_timeout(e):
+                raise TimeoutException() from e
+            raise HttpError() from e
+        if event is not None:
+            event.timings["ttfb"] = headers - start
+            event.timings["download"] = time.perf_counter() - headers
+            retries = getattr(response.raw, "retries", None)
+            if retries is not None:
+                event.retries += len(retries.history)
+        return content
+
+    def stream(self, url, params, timeout, chunk_size=STREAM_CHUNK_SIZE):
+        """Perform a GET request and stream the body in chunks."""
+        try:
+            response = self.session.get(url, params=params, timeout=timeout,
+                                        stream=True)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            e.response.close()
+            raise HttpError(e.response.status_code) from e
+        except requests.exceptions.Timeout as e:
+            raise TimeoutException() from e
+        except requests.exceptions.ConnectionError as e:
+            if _is_read_timeout(e):
+                raise TimeoutException() from e
+            raise HttpError() from e
+        return self._iter_content(response, chunk_size)
+
+    @staticmethod
+    def _iter_content(response, chunk_size):
+        with response:
+            try:
+                yield from response.iter_content(chunk_size)
+            except requests.exceptions.ConnectionError as e:
+                if _is_read_timeout(e):
+                    raise TimeoutException() from e
+                raise HttpError() from e
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
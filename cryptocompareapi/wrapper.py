@@ -1,22 +1,31 @@
 """A wrapper for the CryptoCompare API.
 
 TODO:
-    - The length of lists in parameters is limited by the API, check if API
-      returns an error message for to long param, else check in code
-    - Test
-    - Implement a cache based on the caching times of the API
-    - Count the requests per Group in a time period
     - Additional Errors necessary?
 """
-import requests
+import contextvars
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
-from .exceptions import HttpError, TimeoutException, CryptoCompareError
-from .methods import CryptoCompareMethod
+from .cache import (DEFAULT_CACHE_SIZE, TTLCache, make_key, cache_bypassed,
+                    bypass_cache)
+from .coalesce import PriceCoalescer
+from .columnar import parse_ohlcv
+from .decoding import default_decoder, iter_object_items
+from .exceptions import CryptoCompareError
+from .metrics import CallEvent
+from .models import parser, quote_parser
+from .methods import CryptoCompareMethod, DEFAULT_BASE_URL
 
 DEFAULT_EXCHANGE = "CCCAGG"
 DEFAULT_TIMEOUT = 5.0  # In seconds
+DEFAULT_MAX_WORKERS = 4
+
+# Maximum length of the list parameters accepted by the API
+MAX_FSYMS_LENGTH = 300
+MAX_TSYMS_LENGTH = 100
 
 
 class CalculationType(Enum):
@@ -38,6 +47,76 @@ def _create_param_list_string(object):
     return ",".join(lst)
 
 
+def _chunk_param_list(object, max_length):
+    """Split a list parameter into the fewest strings within max_length.
+
+    Duplicate symbols are dropped. A single symbol longer than max_length
+    is send on its own and left to the API to reject.
+    """
+    if isinstance(object, str) or not isinstance(object, list):
+        object = [object]
+    chunks = []
+    current = []
+    length = -1
+    for symbol in dict.fromkeys(object):
+        if current and length + 1 + len(symbol) > max_length:
+            chunks.append(",".join(current))
+            current = []
+            length = -1
+        current.append(symbol)
+        length += 1 + len(symbol)
+    if current:
+        chunks.append(",".join(current))
+    return chunks
+
+
+def _chunk_symbol_params(params, from_symbols, to_symbols):
+    """Create the params of every request needed for the symbol lists."""
+    params_list = []
+    for fsyms in _chunk_param_list(from_symbols, MAX_FSYMS_LENGTH):
+        for tsyms in _chunk_param_list(to_symbols, MAX_TSYMS_LENGTH):
+            chunk = dict(params)
+            chunk["fsyms"] = fsyms
+            chunk["tsyms"] = tsyms
+            params_list.append(chunk)
+    return params_list
+
+
+def _merge_nested(results, depth):
+    """Merge the dictionaries of chunked requests up to the given depth.
+
+    The results themselves are not modified, as they may be cached.
+    """
+    if depth == 1:
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return merged
+    groups = {}
+    for result in results:
+        for key, value in result.items():
+            groups.setdefault(key, []).append(value)
+    return {key: _merge_nested(values, depth - 1)
+            for key, values in groups.items()}
+
+
+def _merge_price_multi(results):
+    """Merge results of CryptoCompareMethod.PRICE_MULT."""
+    return _merge_nested(results, 2)
+
+
+def _merge_price_multi_full(results):
+    """Merge results of CryptoCompareMethod.PRICE_MULTI_FULL."""
+    return _merge_nested(results, 3)
+
+
+def _histo_parser(columnar, typed):
+    """Get the parser of histo responses."""
+    if columnar:
+        return parse_ohlcv
+    return parser(typed)
+
+
 class CryptoCompare(object):
     """Wrapper around the Crypto-Compare-API.
 
@@ -47,24 +126,106 @@ class CryptoCompare(object):
     Please consult the API documentation for further information.
 
     The methods may raise different types of Exceptions that should be catched:
-        - HTTPError: in case the HTTP-request failed with a status != 200
+        - HTTPError: in case the HTTP-request failed with a status != 200,
+          or CircuitOpenError if a ResiliencePolicy fails fast
         - TimeoutException: in case the connection to API timed out
         - CryptoCompareError: in case the API returned an error message
+
+    Responses are cached for the caching time the API states for the method.
+    Cached results are shared between callers and must not be modified. Use
+    cache.bypass_cache() to skip the cache for single calls.
     """
 
-    def __init__(self, appName, timeout=DEFAULT_TIMEOUT):
+    def __init__(self, appName, timeout=DEFAULT_TIMEOUT, transport=None,
+                 base_url=DEFAULT_BASE_URL, cache=None, rate_limiter=None,
+                 max_workers=DEFAULT_MAX_WORKERS, coalesce_window=None,
+                 decoder=None, observers=None, resilience=None):
         """Create an instance.
 
         Args:
             appName (str): Name of your application, is send with every
                 request
             timeout (dbl): Seconds to wait for a server response. Default 5s
+            transport (Transport): The transport used to perform requests.
+                Default is a RequestsTransport with a keep-alive pool
+            base_url (str): The url the API-methods are resolved against,
+                e.g. to use a local stand-in server
+            cache (TTLCache): The cache for responses. Default is a TTLCache
+                of default size, pass False to disable caching
+            rate_limiter (RateLimiter): Paces the requests per
+                RateLimitGroup. Default None, requests are not limited
+            max_workers (int): Maximum number of threads performing the
+                requests of one call concurrently, e.g. of chunked symbol
+                lists. Default 4
+            coalesce_window (dbl): If set, single_symbol_price requests
+                arriving within this many seconds are merged into one
+                multiple_symbols_price request. Default None
+            decoder (callable): Decodes the bodies of the responses. Default
+                is orjson if installed, else the json module
+            observers (list<metrics.Observer>): Notified with the timings and
+                metadata of every call
+            resilience (ResiliencePolicy): Retries, hedges and circuit
+                breakers for failed and slow requests. Default None, failures
+                are raised right away
         """
         self.appName = appName
         self.timeout = timeout
+        if transport is None:
+            # Imported on demand, requests is slow to import
+            from .transport import RequestsTransport
+            transport = RequestsTransport()
+        self.transport = transport
+        self.base_url = base_url
+        if cache is None:
+            cache = TTLCache()
+        self.cache = cache if cache is not False else None
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self.decoder = decoder if decoder is not None else default_decoder()
+        self.observers = list(observers) if observers else []
+        self.resilience = resilience
+        self._coalescer = None
+        if coalesce_window is not None:
+            self._coalescer = PriceCoalescer(self, coalesce_window)
+
+    @classmethod
+    def shared(cls, appName, path, maxsize=DEFAULT_CACHE_SIZE, limits=None,
+               **kwargs):
+        """Create an instance sharing its cache and rate limits.
+
+        All instances created with the same path, in any process on the
+        host, serve each other's cached responses and share the calls
+        allowed per RateLimitGroup.
+
+        Args:
+            appName (str): The name of the app
+            path (str): The SQLite file holding the shared state
+            maxsize (int): Maximum number of cached responses
+            limits (dict<RateLimitGroup, dict<str, int>>): The limits, see
+                RateLimiter
+            **kwargs: Further arguments of the constructor
+        """
+        from .shared import SharedRateLimiter, SQLiteCache
+        return cls(appName, cache=SQLiteCache(path, maxsize),
+                   rate_limiter=SharedRateLimiter(path, limits), **kwargs)
+
+    def close(self):
+        """Close the transport and its pooled connections."""
+        self.transport.close()
+        if self.resilience is not None:
+            self.resilience.close()
+
+    def __enter__(self):
+        """Enter the context, returns the instance."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit the context, closes the instance."""
+        self.close()
 
     def single_symbol_price(self, from_symbol, to_symbols,
-                            exchange=DEFAULT_EXCHANGE, try_conversion=True):
+                            exchange=DEFAULT_EXCHANGE, try_conversion=True,
+                            typed=False):
         """Get the current price of a cryptocurrency.
 
         Args:
@@ -73,6 +234,7 @@ class CryptoCompare(object):
             tryConversion(bool): If set to false, it will try to get only
                     direct trading values(Default true)
             exchange(str): The exchange to obtain data from (Default "CCCAGG")
+            typed (bool): If set, the values are models.PriceQuote
 
         Returns:
             { <to_symbol_1> : <value_1>,
@@ -91,19 +253,30 @@ class CryptoCompare(object):
         params["tsyms"] = _create_param_list_string(to_symbols)
         params["e"] = exchange
         params["tryConversion"] = try_conversion
+        if typed:
+            return self._try_get_request(CryptoCompareMethod.PRICE, params,
+                                         quote_parser(from_symbol))
+        if self._coalescer is not None:
+            return self._coalescer.price(params)
         return self._try_get_request(
             CryptoCompareMethod.PRICE, params)
 
     def multiple_symbols_price(self, from_symbols, to_symbols,
-                               exchange=DEFAULT_EXCHANGE, try_conversion=True):
+                               exchange=DEFAULT_EXCHANGE, try_conversion=True,
+                               typed=False):
         """Get the current price of one or more cryptocurrencies.
 
+        Symbol lists exceeding the length allowed by the API are split into
+        concurrent requests and their results merged. An empty symbol list
+        gives an empty result without a request.
+
         Args:
             from_symbols (list<str>): The symbols to get the price for
             to_symbols (list<str>): the symbols to convert into
             tryConversion(bool): If set to false, it will try to get only
                 direct trading values(Default true)
             exchange(str): The exchange to obtain data from (Default "CCCAGG")
+            typed (bool): If set, the values are models.PriceQuote
 
         Returns:
             {
@@ -128,23 +301,32 @@ class CryptoCompare(object):
 
         """
         params = {}
-        params["fsyms"] = _create_param_list_string(from_symbols)
-        params["tsyms"] = _create_param_list_string(to_symbols)
         params["e"] = exchange
         params["tryConversion"] = try_conversion
-        return self._try_get_request(CryptoCompareMethod.PRICE_MULT, params)
+        return self._try_get_requests(
+            CryptoCompareMethod.PRICE_MULT,
+            _chunk_symbol_params(params, from_symbols, to_symbols),
+            _merge_price_multi, quote_parser() if typed else None)
 
     def multiple_symbols_full_data(self, from_symbols, to_symbols,
                                    exchange=DEFAULT_EXCHANGE,
-                                   try_conversion=True):
+                                   try_conversion=True, typed=False,
+                                   display=True):
         """Get all the current trading info (price, vol, open, high, low etc).
 
+        Symbol lists exceeding the length allowed by the API are split into
+        concurrent requests and their results merged. An empty symbol list
+        gives an empty result without a request.
+
         Args:
             from_symbols (list<str>): The symbols to get the price for
             to_symbols (list<str>): the symbols to convert into
             tryConversion(bool): If set to false, it will try to get only
                 direct trading values(Default True)
             exchange(str): The exchange to obtain data from (Default "CCCAGG")
+            typed (bool): If set, the RAW values are models.Ticker
+            display (bool): If set to false, the formatted DISPLAY values
+                are dropped while decoding (Default True)
 
         Returns:
             An dictionary with the structure:
@@ -168,14 +350,13 @@ class CryptoCompare(object):
             CryptoCompareError: The API returned an error message
 
         """
-        # Make single symbols to a singleton list
         params = {}
-        params["fsyms"] = _create_param_list_string(from_symbols)
-        params["tsyms"] = _create_param_list_string(to_symbols)
         params["e"] = exchange
         params["tryConversion"] = try_conversion
-        return self._try_get_request(
-            CryptoCompareMethod.PRICE_MULTI_FULL, params)
+        return self._try_get_requests(
+            CryptoCompareMethod.PRICE_MULTI_FULL,
+            _chunk_symbol_params(params, from_symbols, to_symbols),
+            _merge_price_multi_full, parser(typed, display))
 
     def generate_custom_average(self, from_symbol, to_symbol,
                                 exchange=DEFAULT_EXCHANGE):
@@ -221,8 +402,14 @@ class CryptoCompare(object):
                          aggregate=1,
                          limit=31,
                          allData=False,
-                         toTimestamp=None):
-        """Get close, high, ..- from the daily historical data."""
+                         toTimestamp=None,
+                         columnar=False,
+                         typed=False):
+        """Get close, high, ..- from the daily historical data.
+
+        With columnar set, the bars are returned as columnar.OHLCV, with
+        typed set as list of models.Bar.
+        """
         params = {}
         params["fsym"] = from_symbol
         params["tsym"] = to_symbol
@@ -234,15 +421,22 @@ class CryptoCompare(object):
             params["allData"] = allData
         if toTimestamp is not None:
             params["toTs"] = toTimestamp
-        return self._try_get_request(CryptoCompareMethod.HISTO_DAY, params)
+        return self._try_get_request(CryptoCompareMethod.HISTO_DAY, params,
+                                     _histo_parser(columnar, typed))
 
     def historical_hourly(self, from_symbol, to_symbol,
                           exchange=DEFAULT_EXCHANGE,
                           try_conversion=True,
                           aggregate=1,
                           limit=170,
-                          toTimestamp=None):
-        """Get close, high, ... from the houry historical data."""
+                          toTimestamp=None,
+                          columnar=False,
+                          typed=False):
+        """Get close, high, ... from the houry historical data.
+
+        With columnar set, the bars are returned as columnar.OHLCV, with
+        typed set as list of models.Bar.
+        """
         params = {}
         params["fsym"] = from_symbol
         params["tsym"] = to_symbol
@@ -252,15 +446,22 @@ class CryptoCompare(object):
         params["limit"] = limit
         if toTimestamp is not None:
             params["toTs"] = toTimestamp
-        return self._try_get_request(CryptoCompareMethod.HISTO_HOUR, params)
+        return self._try_get_request(CryptoCompareMethod.HISTO_HOUR, params,
+                                     _histo_parser(columnar, typed))
 
     def historical_minute(self, from_symbol, to_symbol,
                           exchange=DEFAULT_EXCHANGE,
                           try_conversion=True,
                           aggregate=1,
                           limit=170,
-                          toTimestamp=None):
-        """Get close, high, ... from the minute historical data."""
+                          toTimestamp=None,
+                          columnar=False,
+                          typed=False):
+        """Get close, high, ... from the minute historical data.
+
+        With columnar set, the bars are returned as columnar.OHLCV, with
+        typed set as list of models.Bar.
+        """
         params = {}
         params["fsym"] = from_symbol
         params["tsym"] = to_symbol
@@ -270,7 +471,8 @@ class CryptoCompare(object):
         params["limit"] = limit
         if toTimestamp is not None:
             params["toTs"] = toTimestamp
-        return self._try_get_request(CryptoCompareMethod.HISTO_MINUTE, params)
+        return self._try_get_request(CryptoCompareMethod.HISTO_MINUTE, params,
+                                     _histo_parser(columnar, typed))
 
     def historical_day_timestamp(self, from_symbol, to_symbol,
                                  timestamp=None,
@@ -316,14 +518,19 @@ class CryptoCompare(object):
         params["limit"] = limit
         return self._try_get_request(CryptoCompareMethod.TOP_EXCHANGES, params)
 
-    def top_exchange_full(self, from_symbol, to_symbol, limit=5):
-        """Get top exchanges by volume for a pair plus the full CCCAGG data."""
+    def top_exchange_full(self, from_symbol, to_symbol, limit=5, typed=False,
+                          display=True):
+        """Get top exchanges by volume for a pair plus the full CCCAGG data.
+
+        With typed set, the full data is returned as models.Ticker. With
+        display set to false, the formatted DISPLAY values are dropped.
+        """
         params = {}
         params["fsym"] = from_symbol
         params["tsym"] = to_symbol
         params["limit"] = limit
         return self._try_get_request(CryptoCompareMethod.TOP_EXCHANGES_FULL,
-                                     params)
+                                     params, parser(typed, display))
 
     def top_volumes(self, to_symbol, limit=21):
         """Get top coins by volume for the to currency."""
@@ -387,11 +594,37 @@ class CryptoCompare(object):
         """Return all the coins that CryptoCompare added to the website."""
         return self._try_get_request(CryptoCompareMethod.LIST_COINS, {})
 
+    def iter_coins(self):
+        """Stream the coins of list_coins() one at a time.
+
+        The response is decoded while it is received, without building the
+        whole dictionary of coins. The results are not cached.
+
+        Yields:
+            Tuples (<symbol>, <coin info>)
+
+        """
+        return self._iter_request(CryptoCompareMethod.LIST_COINS, {}, "Data")
+
+    def iter_exchanges(self):
+        """Stream the exchanges of list_exchanges() one at a time.
+
+        Yields:
+            Tuples (<exchange>, { <from_symbol>: [<to_symbol>, ...], ... })
+
+        """
+        return self._iter_request(CryptoCompareMethod.LIST_EXCHANGES, {})
+
     def rate_limits(self):
         """Get the rate limits left for you."""
         return self._try_get_request(CryptoCompareMethod.RATE_LIMIT, {})
 
-    def _try_get_request(self, method, params):
+    def seed_rate_limiter(self):
+        """Seed the rate limiter with the limits left for you."""
+        with bypass_cache():
+            self.rate_limiter.seed(self.rate_limits())
+
+    def _try_get_request(self, method, params, parse=None):
         """Try to perform a get request.
 
         Used to access used HTTP library just in one place
@@ -399,6 +632,8 @@ class CryptoCompare(object):
         Args:
             methdo (CryptoCompareMethod) : The requested Method
             params (dict<str>) : A dictionary of params to send with request
+            parse (callable) : Parses the body of the response instead of
+                the default json decoding
 
         Returns:
             The json-object inside the Response
@@ -410,16 +645,170 @@ class CryptoCompare(object):
             CryptoCompareError: The API returned an error message
 
         """
+        if self.observers:
+            return self._observed(self._try_get_request_event, method, params,
+                                  parse)
+        return self._try_get_request_event(method, params, parse)
+
+    def _try_get_request_event(self, method, params, parse=None, event=None):
+        """Perform a get request, reporting on event if given."""
+        key = self._cache_key(method, params, parse)
+        if key is not None:
+            found, result = self.cache.get(key)
+            if found:
+                if event is not None:
+                    event.cache_hit = True
+                return result
+
         params["extraParams"] = self.appName
+        content = self._send(method, params, event)
+        if event is None:
+            return self._handle_response(method, key, content, parse)
+        event.size = len(content)
+        start = time.perf_counter()
+        result = self._handle_response(method, key, content, parse)
+        event.timings["parse"] = time.perf_counter() - start
+        return result
+
+    def _send(self, method, params, event=None, stream=False):
+        """Send a request once the rate limiter allows it.
+
+        Args:
+            stream (bool): Stream the body, streamed requests are retried
+                but never hedged
+
+        Returns:
+            The body of the response, an iterable of its chunks if streamed
+        """
+        url = method.url(self.base_url)
+
+        def send(event):
+            if stream:
+                return self.transport.stream(url, params, self.timeout)
+            if event is None:
+                return self.transport.get(url, params, self.timeout)
+            return self.transport.get(url, params, self.timeout, event)
+
+        if self.resilience is not None:
+            return self.resilience.call(send, method.rateLimitGroup,
+                                        self.rate_limiter, event,
+                                        hedge=not stream)
+        if self.rate_limiter is not None:
+            if event is None:
+                self.rate_limiter.acquire(method.rateLimitGroup)
+            else:
+                start = time.perf_counter()
+                self.rate_limiter.acquire(method.rateLimitGroup)
+                event.timings["rate_limit"] = time.perf_counter() - start
+        return send(event)
+
+    def _observed(self, request, method, params, parse):
+        """Perform a request with an event and notify the observers."""
+        event = CallEvent(method)
+        start = time.perf_counter()
         try:
-            response = requests.get(method.full_url, params)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            raise HttpError() from e
-        except requests.exceptions.Timeout as e:
-            raise TimeoutException() from e
-
-        json = response.json()
-        if "Response" in json and json["Response"] == "Error":
-            raise CryptoCompareError(json["Message"])
-        return json
+            return request(method, params, parse, event)
+        except Exception as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.timings["total"] = time.perf_counter() - start
+            self._notify(event)
+
+    def _notify(self, event):
+        """Notify the observers of a finished call."""
+        for observer in self.observers:
+            observer.on_call(event)
+
+    def _iter_request(self, method, params, key=None):
+        """Perform a get request and stream the members of an object.
+
+        The request goes through the rate limiter and the resilience policy.
+        The observers are notified once the stream was consumed or closed.
+
+        Args:
+            method (CryptoCompareMethod) : The requested Method
+            params (dict<str>) : A dictionary of params to send with request
+            key (str) : The member of the response holding the object,
+                None for the response itself
+
+        """
+        params["extraParams"] = self.appName
+        if self.observers:
+            return self._iter_observed(method, params, key)
+        return iter_object_items(self._send(method, params, stream=True), key)
+
+    def _iter_observed(self, method, params, key):
+        """Stream the members of an object and notify the observers."""
+        event = CallEvent(method)
+        start = time.perf_counter()
+
+        def counted(chunks):
+            for chunk in chunks:
+                event.size += len(chunk)
+                yield chunk
+
+        try:
+            chunks = self._send(method, params, event, stream=True)
+            yield from iter_object_items(counted(chunks), key)
+        except Exception as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.timings["total"] = time.perf_counter() - start
+            self._notify(event)
+
+    def _try_get_requests(self, method, params_list, merge, parse=None):
+        """Perform several requests concurrently and merge their results.
+
+        Args:
+            method (CryptoCompareMethod) : The requested Method
+            params_list (list<dict<str>>) : The params of every request
+            merge (callable) : Merges the list of results into one
+            parse (callable) : Parses the body of every response, see
+                _try_get_request
+
+        Returns:
+            The merged json-objects of the Responses
+
+        """
+        if not params_list:  # An empty symbol list
+            return merge([])
+        if len(params_list) == 1:
+            return self._try_get_request(method, params_list[0], parse)
+        workers = min(self.max_workers, len(params_list))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # The threads run in a copy of the caller's context, so e.g.
+            # bypass_cache() applies to every chunk
+            futures = [executor.submit(contextvars.copy_context().run,
+                                       self._try_get_request, method, params,
+                                       parse)
+                       for params in params_list]
+            results = [future.result() for future in futures]
+        return merge(results)
+
+    def _cache_key(self, method, params, parse=None):
+        """Get the cache key of a request, None if the cache is not used."""
+        if self.cache is None or cache_bypassed():
+            return None
+        key = make_key(method, params)
+        if parse is not None:
+            key += (parse.__name__,)
+        return key
+
+    def _handle_response(self, method, key, content, parse=None):
+        """Decode the body of a response and store it in the cache.
+
+        Raises:
+            CryptoCompareError: The API returned an error message
+
+        """
+        if parse is not None:
+            result = parse(content)
+        else:
+            result = self.decoder(content)
+            if isinstance(result, dict) and result.get("Response") == "Error":
+                raise CryptoCompareError(result["Message"])
+        if key is not None:
+            self.cache.set(key, result, method.caching)
+        return result
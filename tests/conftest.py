@@ -0,0 +1,58 @@
+"""Shared fixtures of the tests, which run offline."""
+import json
+import threading
+
+import pytest
+
+from cryptocompareapi import CryptoCompare
+from cryptocompareapi.transport import Transport
+
+BASE_URL = "http://fake"
+
+
+class FakeTransport(Transport):
+    """Answers requests with a function of the path and the params.
+
+    The responses are given as json-objects, every request is recorded as
+    tuple (path, params).
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, timeout, event=None):
+        path = url[len(BASE_URL):]
+        with self._lock:
+            self.requests.append((path, dict(params)))
+        return json.dumps(self.respond(path, params)).encode()
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+
+class Clock(object):
+    """A clock that only moves when now is set."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A Clock starting at 0."""
+    return Clock()
+
+
+@pytest.fixture
+def client_factory():
+    """Create clients answering with a function of the path and params."""
+    def create(respond, **kwargs):
+        transport = FakeTransport(respond)
+        return CryptoCompare("tests", transport=transport,
+                             base_url=BASE_URL, **kwargs)
+    return create
@@ -0,0 +1,82 @@
+"""The asyncio client."""
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.mockserver import MockServer
+from cryptocompareapi import HttpError
+from cryptocompareapi.aio import AsyncCryptoCompare
+
+SYMBOLS = ["C%d" % i for i in range(200)]
+
+
+class FakeAsyncTransport(object):
+    """Answers with the prices of the requested symbols after a delay."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, params, timeout, event=None):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return json.dumps({
+            fsym: {tsym: 1.0 for tsym in params["tsyms"].split(",")}
+            for fsym in params["fsyms"].split(",")}).encode()
+
+    async def close(self):
+        pass
+
+
+def test_requests_against_the_server():
+    async def run():
+        async with AsyncCryptoCompare("tests", base_url=server.url) as cc:
+            pairs, volumes = await asyncio.gather(cc.top_pairs("BTC"),
+                                                  cc.top_volumes("USD"))
+            return pairs, volumes, await cc.top_pairs("BTC")
+
+    with MockServer() as server:
+        pairs, volumes, cached = asyncio.run(run())
+    assert pairs["Response"] == volumes["Response"] == "Success"
+    assert cached is pairs
+    assert server.requests == 2
+
+
+def test_errors_are_raised():
+    async def run():
+        async with AsyncCryptoCompare("tests", base_url=server.url) as cc:
+            await cc.top_pairs("BTC")
+
+    with MockServer(error_rate=1.0, error_status=503) as server:
+        with pytest.raises(HttpError) as info:
+            asyncio.run(run())
+    assert info.value.status_code == 503
+
+
+def test_chunks_are_requested_concurrently():
+    async def run():
+        cc = AsyncCryptoCompare("tests", transport=transport,
+                                max_concurrency=2)
+        result = await cc.multiple_symbols_price(SYMBOLS, ["USD"])
+        assert await cc.multiple_symbols_price([], ["USD"]) == {}
+        return result
+
+    transport = FakeAsyncTransport()
+    result = asyncio.run(run())
+    assert sorted(result) == sorted(SYMBOLS)
+    assert transport.requests > 2
+    assert transport.max_in_flight == 2
+
+
+def test_streaming_is_not_supported():
+    cc = AsyncCryptoCompare("tests", transport=FakeAsyncTransport())
+    with pytest.raises(NotImplementedError):
+        cc.iter_coins()
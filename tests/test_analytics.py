@@ -0,0 +1,75 @@
+"""Vectorized analytics of the bars."""
+import pytest
+
+from cryptocompareapi.columnar import OHLCV
+
+numpy = pytest.importorskip("numpy")
+analytics = pytest.importorskip("cryptocompareapi.analytics")
+
+MINUTE = 60
+
+
+def _bars(closes, start=0, step=MINUTE):
+    return OHLCV.from_bars(
+        {"time": start + i * step, "open": close, "high": close + 1,
+         "low": close - 1, "close": close, "volumefrom": 1.0 + i,
+         "volumeto": close * (1.0 + i)}
+        for i, close in enumerate(closes))
+
+
+def test_resample():
+    bars = analytics.resample(_bars([1.0, 2.0, 3.0, 4.0, 5.0]), "3m")
+    assert list(bars.time) == [0, 180]
+    assert list(bars.open) == [1.0, 4.0]
+    assert list(bars.close) == [3.0, 5.0]
+    assert list(bars.high) == [4.0, 6.0]
+    assert list(bars.low) == [0.0, 3.0]
+    assert list(bars.volumefrom) == [6.0, 9.0]
+    assert len(analytics.resample(OHLCV.empty(), "1h")) == 0
+    with pytest.raises(ValueError):
+        analytics.resample(_bars([1.0]), 0)
+
+
+def test_vwap():
+    bars = _bars([2.0, 4.0, 6.0])
+    assert list(analytics.vwap(bars)) == [2.0, 4.0, 6.0]
+    assert numpy.allclose(analytics.vwap(bars, 2),
+                          [numpy.nan, 10 / 3, 26 / 5], equal_nan=True)
+    assert numpy.isnan(analytics.vwap(bars, 5)).all()
+    with pytest.raises(ValueError):
+        analytics.vwap(bars, 0)
+
+
+def test_vwap_of_bars_without_volume():
+    bars = [{"time": 0, "open": 1, "high": 1, "low": 1, "close": 1,
+             "volumefrom": 0, "volumeto": 0}]
+    assert numpy.isnan(analytics.vwap(bars)).all()
+
+
+def test_returns_and_volatility():
+    prices = numpy.array([[1.0, 2.0, 4.0, 8.0], [1.0, 1.0, 1.0, 1.0]])
+    returns = analytics.log_returns(prices)
+    assert returns.shape == (2, 3)
+    assert numpy.allclose(returns[0], numpy.log(2))
+    volatility = analytics.rolling_volatility(returns, 2,
+                                              periods_per_year=365)
+    assert numpy.isnan(volatility[:, 0]).all()
+    assert numpy.allclose(volatility[:, 1:], 0)
+    assert numpy.isnan(analytics.rolling_volatility(returns, 5)).all()
+    with pytest.raises(ValueError):
+        analytics.rolling_volatility(returns, 1)
+
+
+def test_align_and_correlation():
+    series = {"BTC": _bars([1.0, 2.0, 4.0, 8.0]),
+              "ETH": _bars([3.0, 6.0, 12.0], start=MINUTE)}
+    keys, time, values = analytics.align(series)
+    assert keys == ["BTC", "ETH"]
+    assert list(time) == [60, 120, 180]
+    assert values.tolist() == [[2.0, 4.0, 8.0], [3.0, 6.0, 12.0]]
+    _, time, values = analytics.align(series, how="outer")
+    assert list(time) == [0, 60, 120, 180]
+    assert numpy.isnan(values[1, 0])
+    keys, matrix = analytics.correlation_matrix(
+        {"A": _bars([1.0, 2.0, 3.0, 5.0]), "B": _bars([2.0, 4.0, 6.0, 10.0])})
+    assert numpy.allclose(matrix, 1.0)
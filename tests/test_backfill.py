@@ -0,0 +1,47 @@
+"""Paginated backfill of historical bars."""
+import pytest
+
+from cryptocompareapi.backfilling import backfill
+
+DAY = 86400
+LISTED = 1600000000 // DAY * DAY  # Older bars are zero filled
+NOW = LISTED + 100 * DAY
+
+
+def _bar(time):
+    price = 0.0 if time < LISTED else 1.0
+    return {"time": time, "open": price, "high": price, "low": price,
+            "close": price, "volumefrom": price, "volumeto": price}
+
+
+def _histo(path, params):
+    assert path == "/data/histoday"
+    end = params["toTs"]
+    return {"Response": "Success",
+            "Data": [_bar(end - i * DAY)
+                     for i in reversed(range(params["limit"] + 1))]}
+
+
+@pytest.mark.parametrize("page_size", [7, 30, 2000])
+def test_pages_are_joined_without_gaps(client_factory, page_size):
+    cc = client_factory(_histo)
+    start = LISTED + 10 * DAY
+    bars = list(backfill(cc, "BTC", "USD", start, NOW, page_size=page_size,
+                         prefetch=3))
+    assert [bar["time"] for bar in bars] == list(
+        range(NOW, start - 1, -DAY))
+
+
+def test_stops_before_the_pair_was_traded(client_factory):
+    cc = client_factory(_histo)
+    bars = list(backfill(cc, "BTC", "USD", LISTED - 50 * DAY, NOW,
+                         page_size=20, prefetch=2))
+    assert bars[-1]["time"] == LISTED
+    assert len(bars) == 101
+
+
+def test_pages_bypass_the_cache(client_factory):
+    cc = client_factory(_histo)
+    list(backfill(cc, "BTC", "USD", LISTED, NOW, page_size=20))
+    assert len(cc.cache) == 0
+    assert len(cc.transport.requests) >= 5
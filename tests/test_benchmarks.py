@@ -0,0 +1,27 @@
+"""The stand-in server and the fixtures of the benchmarks."""
+import os
+
+import pytest
+
+from benchmarks import fixtures
+from benchmarks.mockserver import MockServer
+from cryptocompareapi import CryptoCompare, HttpError
+from cryptocompareapi.methods import CryptoCompareMethod
+
+
+def test_every_method_is_recorded(tmp_path):
+    with MockServer() as server:
+        with CryptoCompare("tests", base_url=server.url) as cc:
+            fixtures.record(cc, str(tmp_path))
+    assert sorted(os.listdir(str(tmp_path))) == sorted(
+        method.name + ".json" for method in CryptoCompareMethod)
+    assert set(fixtures.load(str(tmp_path))) == set(CryptoCompareMethod)
+
+
+def test_errors_are_injected():
+    with MockServer(error_rate=1.0, error_status=429) as server:
+        with CryptoCompare("tests", base_url=server.url) as cc:
+            with pytest.raises(HttpError) as info:
+                cc.top_pairs("BTC")
+        assert info.value.status_code == 429
+        assert server.requests == 1
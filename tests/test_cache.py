@@ -0,0 +1,65 @@
+"""The TTL response cache."""
+from cryptocompareapi.cache import TTLCache, bypass_cache, make_key
+from cryptocompareapi.methods import CryptoCompareMethod
+
+
+def _prices(path, params):
+    return {"USD": 1.0}
+
+
+def test_entries_expire(clock):
+    cache = TTLCache(clock=clock)
+    cache.set("key", 1, 10)
+    clock.now = 9.9
+    assert cache.get("key") == (True, 1)
+    clock.now = 10.0
+    assert cache.get("key") == (False, None)
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.misses,
+            cache.stats.expirations) == (1, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 10)
+    cache.get("a")
+    cache.set("c", 3, 10)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_zero_ttl_is_not_stored():
+    cache = TTLCache()
+    cache.set("key", 1, 0)
+    assert len(cache) == 0
+
+
+def test_keys_ignore_the_order_and_the_app_name():
+    method = CryptoCompareMethod.PRICE
+    assert make_key(method, {"fsym": "BTC", "tsyms": "USD"}) == make_key(
+        method, {"tsyms": "USD", "fsym": "BTC", "extraParams": "app"})
+    assert make_key(method, {"fsym": "BTC"}) != make_key(
+        CryptoCompareMethod.PRICE_MULT, {"fsym": "BTC"})
+
+
+def test_client_serves_responses_from_the_cache(client_factory, clock):
+    cc = client_factory(_prices, cache=TTLCache(clock=clock))
+    for _ in range(3):
+        assert cc.single_symbol_price("BTC", "USD") == {"USD": 1.0}
+    assert len(cc.transport.requests) == 1
+    clock.now = CryptoCompareMethod.PRICE.caching
+    cc.single_symbol_price("BTC", "USD")
+    assert len(cc.transport.requests) == 2
+
+
+def test_bypass_cache(client_factory):
+    cc = client_factory(_prices)
+    cc.single_symbol_price("BTC", "USD")
+    with bypass_cache():
+        cc.single_symbol_price("BTC", "USD")
+        cc.single_symbol_price("ETH", "USD")
+    assert len(cc.transport.requests) == 3
+    assert len(cc.cache) == 1
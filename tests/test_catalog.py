@@ -0,0 +1,66 @@
+"""The indexed catalog of coins and exchanges."""
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.catalog import Catalog
+
+COINS = {"BTC": {"CoinName": "Bitcoin"}, "ETH": {"CoinName": "Ethereum"},
+         "ETC": {"CoinName": "Ethereum Classic"}}
+EXCHANGES = {"Kraken": {"BTC": ["USD", "EUR"], "ETH": ["USD"]},
+             "Bitstamp": {"BTC": ["USD"]}}
+
+
+def _lists(path, params):
+    if path == "/data/all/coinlist":
+        return {"Response": "Success", "Data": COINS}
+    return EXCHANGES
+
+
+@pytest.fixture
+def catalog(client_factory):
+    catalog = Catalog(client_factory(_lists))
+    assert catalog.refresh()
+    return catalog
+
+
+def test_refresh_only_when_stale(catalog):
+    requests = len(catalog.client.transport.requests)
+    assert not catalog.stale
+    assert not catalog.refresh()
+    assert catalog.refresh(force=True)
+    assert len(catalog.client.transport.requests) == requests + 2
+
+
+def test_lookups(catalog):
+    assert catalog.coin("BTC") == {"CoinName": "Bitcoin"}
+    assert catalog.coin("XYZ") is None
+    assert catalog.pairs("Bitstamp") == {("BTC", "USD")}
+    assert sorted(catalog.exchanges()) == ["Bitstamp", "Kraken"]
+    assert sorted(catalog.exchanges("BTC", "USD")) == ["Bitstamp", "Kraken"]
+    assert catalog.exchanges("ETH", "EUR") == []
+    assert "EUR" in catalog and "XYZ" not in catalog
+
+
+def test_validate(catalog):
+    catalog.validate(["BTC", "EUR"])
+    assert catalog.unknown_symbols("XYZ") == ["XYZ"]
+    with pytest.raises(CryptoCompareError):
+        catalog.validate(["BTC", "XYZ"])
+
+
+def test_search_and_similar(catalog):
+    assert catalog.search("ET") == ["ETC", "ETH"]
+    assert catalog.search("E", limit=2) == ["ETC", "ETH"]
+    assert catalog.search("Z") == []
+    assert catalog.similar("BTX")[0] == "BTC"
+    assert "ETH" in catalog.similar("etherium")
+
+
+def test_snapshot(catalog, tmp_path):
+    path = str(tmp_path / "catalog.json.gz")
+    catalog.save(path)
+    loaded = Catalog.load(path, max_age=catalog.max_age)
+    assert loaded.updated == catalog.updated and not loaded.stale
+    assert loaded.coin("ETH") == COINS["ETH"]
+    assert loaded.pairs("Kraken") == catalog.pairs("Kraken")
+    assert Catalog.load(path, max_age=0).stale
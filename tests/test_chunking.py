@@ -0,0 +1,69 @@
+"""Chunking of long symbol lists and merging of the chunked results."""
+from cryptocompareapi.cache import bypass_cache
+from cryptocompareapi.wrapper import (MAX_FSYMS_LENGTH, MAX_TSYMS_LENGTH,
+                                      _chunk_param_list, _chunk_symbol_params,
+                                      _merge_nested)
+
+SYMBOLS = ["C%d" % i for i in range(200)]
+
+
+def _prices(path, params):
+    return {fsym: {tsym: 1.0 for tsym in params["tsyms"].split(",")}
+            for fsym in params["fsyms"].split(",")}
+
+
+def test_chunks_stay_within_the_length():
+    chunks = _chunk_param_list(SYMBOLS, MAX_FSYMS_LENGTH)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= MAX_FSYMS_LENGTH for chunk in chunks)
+    assert ",".join(chunks).split(",") == SYMBOLS
+
+
+def test_chunks_drop_duplicates():
+    assert _chunk_param_list(["BTC", "ETH", "BTC"], 100) == ["BTC,ETH"]
+    assert _chunk_param_list("BTC", 100) == ["BTC"]
+
+
+def test_symbol_params_cover_every_pair():
+    to_symbols = ["T%d" % i for i in range(40)]
+    params_list = _chunk_symbol_params({"e": "CCCAGG"}, SYMBOLS, to_symbols)
+    pairs = [(fsym, tsym) for params in params_list
+             for fsym in params["fsyms"].split(",")
+             for tsym in params["tsyms"].split(",")]
+    assert sorted(pairs) == sorted((f, t) for f in SYMBOLS
+                                   for t in to_symbols)
+    assert all(len(params["tsyms"]) <= MAX_TSYMS_LENGTH
+               and params["e"] == "CCCAGG" for params in params_list)
+
+
+def test_merge_nested_does_not_modify_the_results():
+    first = {"BTC": {"USD": 1}}
+    second = {"BTC": {"EUR": 2}, "ETH": {"USD": 3}}
+    merged = _merge_nested([first, second], 2)
+    assert merged == {"BTC": {"USD": 1, "EUR": 2}, "ETH": {"USD": 3}}
+    assert first == {"BTC": {"USD": 1}}
+
+
+def test_long_lists_are_requested_in_chunks(client_factory):
+    cc = client_factory(_prices)
+    result = cc.multiple_symbols_price(SYMBOLS, ["USD", "EUR"])
+    assert len(cc.transport.requests) > 1
+    assert sorted(result) == sorted(SYMBOLS)
+    assert all(prices == {"USD": 1.0, "EUR": 1.0}
+               for prices in result.values())
+
+
+def test_empty_lists_are_not_requested(client_factory):
+    cc = client_factory(_prices)
+    assert cc.multiple_symbols_price([], ["USD"]) == {}
+    assert cc.multiple_symbols_full_data(["BTC"], []) == {}
+    assert cc.transport.requests == []
+
+
+def test_chunks_bypass_the_cache_in_the_context(client_factory):
+    cc = client_factory(_prices)
+    with bypass_cache():
+        cc.multiple_symbols_price(SYMBOLS, ["USD"])
+    assert len(cc.cache) == 0
+    cc.multiple_symbols_price(SYMBOLS, ["USD"])
+    assert len(cc.cache) == len(cc.transport.requests) // 2 > 1
@@ -0,0 +1,81 @@
+"""The command line interface."""
+import io
+import json
+
+import pytest
+
+from cryptocompareapi import __main__ as cli
+from cryptocompareapi.shared import SQLiteCache
+
+PRICES = {"BTC": {"USD": 30000.0, "EUR": 28000.0}, "ETH": {"USD": 2000.0}}
+
+
+def _respond(path, params):
+    if path == "/data/pricemulti":
+        return {fsym: {tsym: PRICES[fsym][tsym]
+                       for tsym in params["tsyms"].split(",")}
+                for fsym in params["fsyms"].split(",")}
+    if path == "/data/histohour":
+        return {"Response": "Success",
+                "Data": [{"time": 3600 * i, "close": float(i)}
+                         for i in range(params["limit"] + 1)]}
+    return {"Response": "Error", "Message": "unknown path %s" % path}
+
+
+@pytest.fixture
+def run(client_factory, monkeypatch):
+    """Run the interface against a fake transport."""
+    clients = []
+
+    def client(args):
+        clients.append(client_factory(_respond))
+        return clients[-1]
+
+    monkeypatch.setattr(cli, "_client", client)
+
+    def run(*argv):
+        out = io.StringIO()
+        status = cli.main(list(argv), out=out)
+        return status, out.getvalue(), clients[-1]
+    return run
+
+
+def test_price_as_json(run):
+    status, out, _ = run("price", "BTC,ETH", "USD")
+    assert status == 0
+    assert json.loads(out) == {"BTC": {"USD": 30000.0},
+                               "ETH": {"USD": 2000.0}}
+
+
+def test_price_as_csv(run):
+    status, out, _ = run("--format", "csv", "price", "BTC", "USD,EUR")
+    assert status == 0
+    assert out.splitlines() == ["fsym,tsym,price", "BTC,USD,30000.0",
+                                "BTC,EUR,28000.0"]
+
+
+def test_histo_passes_the_arguments(run):
+    status, out, client = run("--format", "csv", "histo", "BTC", "USD",
+                              "--resolution", "hour", "--limit", "2",
+                              "--to", "7200")
+    assert status == 0
+    assert out.splitlines() == ["time,close", "0,0.0", "3600,1.0",
+                                "7200,2.0"]
+    path, params = client.transport.requests[0]
+    assert (path, params["limit"], params["toTs"]) == ("/data/histohour",
+                                                        2, 7200)
+
+
+def test_errors_exit_with_status_1(run, capsys):
+    status, out, _ = run("top", "volumes", "USD")
+    assert status == 1
+    assert out == ""
+    assert "CryptoCompareError" in capsys.readouterr().err
+
+
+def test_cache_dir_shares_a_sqlite_cache(tmp_path):
+    args = cli.parser().parse_args(
+        ["--cache-dir", str(tmp_path / "cache"), "price", "BTC", "USD"])
+    with cli._client(args) as client:
+        assert isinstance(client.cache, SQLiteCache)
+    assert (tmp_path / "cache" / cli.CACHE_FILE).exists()
@@ -0,0 +1,52 @@
+"""Coalescing of concurrent single symbol price requests."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.cache import bypass_cache
+
+PRICES = {"BTC": {"USD": 30000.0, "EUR": 28000.0}, "ETH": {"USD": 2000.0}}
+
+
+def _prices(path, params):
+    assert path == "/data/pricemulti"
+    return {fsym: {tsym: PRICES[fsym][tsym]
+                   for tsym in params["tsyms"].split(",")
+                   if tsym in PRICES.get(fsym, {})}
+            for fsym in params["fsyms"].split(",") if fsym in PRICES}
+
+
+def test_concurrent_requests_are_merged(client_factory):
+    cc = client_factory(_prices, coalesce_window=0.2, cache=False)
+    calls = [("BTC", ["USD", "EUR"]), ("ETH", "USD"), ("BTC", "USD")] * 3
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        results = list(executor.map(
+            lambda call: cc.single_symbol_price(*call), calls))
+    assert cc.transport.paths() == ["/data/pricemulti"]
+    assert results[:3] == [{"USD": 30000.0, "EUR": 28000.0},
+                           {"USD": 2000.0}, {"USD": 30000.0}]
+    assert results[3:] == results[:3] * 2
+
+
+def test_identical_requests_share_the_result(client_factory):
+    cc = client_factory(_prices, coalesce_window=0.2, cache=False)
+    first = cc._coalescer.submit("BTC", "USD", "CCCAGG", True)
+    second = cc._coalescer.submit("BTC", "USD", "CCCAGG", True)
+    assert first is second
+    assert first.result(timeout=5) == {"USD": 30000.0}
+
+
+def test_missing_symbols_raise(client_factory):
+    cc = client_factory(_prices, coalesce_window=0.01, cache=False)
+    with pytest.raises(CryptoCompareError):
+        cc.single_symbol_price("XYZ", "USD")
+
+
+def test_batches_bypass_the_cache_in_the_context(client_factory):
+    cc = client_factory(_prices, coalesce_window=0.01)
+    with bypass_cache():
+        assert cc.single_symbol_price("BTC", "USD") == {"USD": 30000.0}
+    assert len(cc.cache) == 0
+    cc.single_symbol_price("BTC", "USD")
+    assert len(cc.cache) > 0
@@ -0,0 +1,64 @@
+"""Columnar OHLCV results of the histo API-methods."""
+import json
+import pickle
+
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.columnar import COLUMNS, OHLCV, parse_ohlcv
+
+BARS = [{"time": 1000 + i * 60, "open": 1.0 + i, "high": 2.0 + i,
+         "low": 0.5 + i, "close": 1.5 + i, "volumefrom": 10.0 * i,
+         "volumeto": 20.0 * i, "conversionType": "direct"}
+        for i in range(5)]
+
+
+def _histo(path, params):
+    return {"Response": "Success", "Data": BARS}
+
+
+def _plain(bar):
+    return {name: bar[name] for name in COLUMNS}
+
+
+def test_parse_ohlcv():
+    bars = parse_ohlcv(json.dumps({"Response": "Success", "Data": BARS}))
+    assert len(bars) == 5
+    assert list(bars) == [_plain(bar) for bar in BARS]
+    assert bars.time.format == "q" and bars.close.format == "d"
+
+
+def test_parse_ohlcv_raises_errors():
+    with pytest.raises(CryptoCompareError):
+        parse_ohlcv(b'{"Response": "Error", "Message": "limit"}')
+
+
+def test_slices_are_views():
+    bars = OHLCV.from_bars(BARS)
+    tail = bars[2:]
+    assert len(tail) == 3 and tail[0] == _plain(BARS[2])
+    assert tail.close.obj is bars.close.obj
+    assert repr(tail) == "OHLCV(3 bars, 1120 - 1240)"
+
+
+def test_concat_and_pickle():
+    bars = OHLCV.from_bars(BARS)
+    joined = OHLCV.concat([bars[:2], bars[::2], OHLCV.empty()])
+    assert list(joined.time) == [1000, 1060, 1000, 1120, 1240]
+    assert list(pickle.loads(pickle.dumps(joined))) == list(joined)
+
+
+def test_to_numpy_shares_the_memory():
+    numpy = pytest.importorskip("numpy")
+    bars = OHLCV.from_bars(BARS)
+    columns = bars.to_numpy()
+    assert columns["time"].dtype == numpy.int64
+    assert numpy.shares_memory(columns["close"], numpy.asarray(bars.close))
+
+
+def test_client_returns_columns(client_factory):
+    cc = client_factory(_histo)
+    bars = cc.historical_minute("BTC", "USD", columnar=True)
+    assert isinstance(bars, OHLCV)
+    assert list(bars.close) == [bar["close"] for bar in BARS]
+    assert cc.historical_minute("BTC", "USD")["Data"] == BARS
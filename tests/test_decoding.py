@@ -0,0 +1,66 @@
+"""Decoding of responses, also while they are streamed."""
+import json
+
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.decoding import (iter_object_items, json_decoder,
+                                       orjson, orjson_decoder)
+from cryptocompareapi.metrics import Observer
+
+COINS = {"BTC": {"Name": "BTC", "CoinName": "Bitcoin", "SortOrder": "1"},
+         "EUR€": {"Name": "EUR€", "Supply": 12345.678e-3},
+         "NUL": {"Tags": [], "Flag": None, "Ok": True}}
+
+
+def _chunks(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 1 << 16])
+def test_members_are_streamed_from_any_chunks(size):
+    body = json.dumps({"Response": "Success", "Data": COINS,
+                       "Type": 100}, ensure_ascii=False).encode()
+    assert list(iter_object_items(_chunks(body, size), "Data")) == list(
+        COINS.items())
+
+
+def test_top_level_object_is_streamed():
+    body = json.dumps(COINS).encode()
+    assert dict(iter_object_items(_chunks(body, 7))) == COINS
+    assert list(iter_object_items([b" { } "])) == []
+
+
+def test_errors_are_raised_after_streaming():
+    body = b'{"Response": "Error", "Message": "limit", "Data": {}}'
+    with pytest.raises(CryptoCompareError):
+        list(iter_object_items(_chunks(body, 4), "Data"))
+
+
+def test_malformed_bodies_are_rejected():
+    with pytest.raises(ValueError):
+        list(iter_object_items([b'["BTC"]']))
+    with pytest.raises(ValueError):
+        list(iter_object_items([b'{"BTC": 1']))
+
+
+def test_decoders_agree():
+    body = json.dumps(COINS).encode()
+    assert json_decoder(body) == COINS
+    if orjson is not None:
+        assert orjson_decoder(body) == COINS
+
+
+def test_client_streams_with_observers(client_factory):
+    events = []
+
+    class Recorder(Observer):
+        def on_call(self, event):
+            events.append(event)
+
+    cc = client_factory(lambda path, params: {"Response": "Success",
+                                              "Data": COINS},
+                        observers=[Recorder()])
+    assert dict(cc.iter_coins()) == COINS
+    assert len(events) == 1 and events[0].size > 0
+    assert events[0].error is None
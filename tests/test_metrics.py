@@ -0,0 +1,79 @@
+"""Instrumentation of the calls and the metrics exports."""
+import json
+
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.methods import CryptoCompareMethod
+from cryptocompareapi.metrics import CallEvent, Histogram, MetricsAggregator
+
+PRICE = CryptoCompareMethod.PRICE
+
+
+def _event(total, error=None, cache_hit=False):
+    event = CallEvent(PRICE)
+    event.timings["total"] = total
+    event.error = error
+    event.cache_hit = cache_hit
+    event.size = 10
+    return event
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_snapshot_and_json():
+    metrics = MetricsAggregator(buckets=(0.1, 1.0))
+    metrics.on_call(_event(0.05))
+    metrics.on_call(_event(0.5, error="HttpError"))
+    metrics.on_call(_event(0.0, cache_hit=True))
+    snapshot = metrics.snapshot()["PRICE"]
+    assert (snapshot["calls"], snapshot["cache_hits"], snapshot["bytes"],
+            snapshot["errors"]) == (3, 1, 30, {"HttpError": 1})
+    assert snapshot["timings"]["total"]["count"] == 3
+    assert snapshot["timings"]["total"]["buckets"] == {
+        "0.1": 2, "1.0": 1, "+Inf": 0}
+    assert json.loads(metrics.to_json()) == json.loads(json.dumps(
+        metrics.snapshot()))
+    assert metrics.histogram(PRICE, "total").count == 3
+
+
+def test_prometheus_export():
+    metrics = MetricsAggregator(buckets=(0.1, 1.0))
+    metrics.on_call(_event(0.05))
+    metrics.on_call(_event(0.5, error="TimeoutException"))
+    lines = metrics.to_prometheus().splitlines()
+    labels = 'method="PRICE",phase="total"'
+    assert 'cryptocompare_call_phase_seconds_bucket{%s,le="0.1"} 1' \
+        % labels in lines
+    assert 'cryptocompare_call_phase_seconds_bucket{%s,le="+Inf"} 2' \
+        % labels in lines
+    assert 'cryptocompare_calls_total{method="PRICE"} 2' in lines
+    assert 'cryptocompare_errors_total{method="PRICE",' \
+        'error="TimeoutException"} 1' in lines
+
+
+def test_client_reports_every_call(client_factory):
+    def respond(path, params):
+        if params["fsym"] == "XYZ":
+            return {"Response": "Error", "Message": "no data"}
+        return {"USD": 1.0}
+
+    metrics = MetricsAggregator()
+    cc = client_factory(respond, observers=[metrics])
+    cc.single_symbol_price("BTC", "USD")
+    cc.single_symbol_price("BTC", "USD")
+    with pytest.raises(CryptoCompareError):
+        cc.single_symbol_price("XYZ", "USD")
+    snapshot = metrics.snapshot()["PRICE"]
+    assert (snapshot["calls"], snapshot["cache_hits"],
+            snapshot["errors"]) == (3, 1, {"CryptoCompareError": 1})
+    assert set(snapshot["timings"]) >= {"parse", "total"}
@@ -0,0 +1,99 @@
+"""Typed results and dropping the DISPLAY data."""
+import json
+
+import pytest
+
+from cryptocompareapi import CryptoCompareError
+from cryptocompareapi.models import Bar, PriceQuote, Ticker, parser
+
+RAW = {"TYPE": "5", "MARKET": "CCCAGG", "FROMSYMBOL": "BTC",
+       "TOSYMBOL": "USD", "PRICE": 30000.0, "VOLUMEDAY": 12.5}
+FULL = {"RAW": {"BTC": {"USD": RAW}},
+        "DISPLAY": {"BTC": {"USD": {"FROMSYMBOL": "Ƀ", "TOSYMBOL": "$",
+                                    "PRICE": "$ 30,000.0"}}}}
+BAR = {"time": 86400, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5,
+       "volumefrom": 10.0, "volumeto": 15.0}
+
+
+def _respond(path, params):
+    if path == "/data/pricemultifull":
+        return FULL
+    if path == "/data/price":
+        return {"USD": 30000.0, "EUR": 28000.0}
+    if path == "/data/pricemulti":
+        return {"BTC": {"USD": 30000.0}, "ETH": {"USD": 2000.0}}
+    assert path == "/data/histoday"
+    return {"Response": "Success", "TimeFrom": 86400, "Data": [BAR]}
+
+
+def test_models_compare_and_convert_by_their_fields():
+    quote = PriceQuote("BTC", "USD", 30000.0)
+    assert quote == PriceQuote.from_api(
+        {"FROMSYMBOL": "BTC", "TOSYMBOL": "USD", "PRICE": 30000.0})
+    assert quote != PriceQuote("BTC", "USD", 1.0)
+    assert quote.as_dict() == {"FROMSYMBOL": "BTC", "TOSYMBOL": "USD",
+                               "PRICE": 30000.0}
+    assert repr(quote) == ("PriceQuote(from_symbol='BTC', to_symbol='USD', "
+                           "price=30000.0)")
+    with pytest.raises(AttributeError):
+        quote.extra = 1
+
+
+def test_missing_fields_are_none():
+    ticker = Ticker.from_api(RAW)
+    assert (ticker.price, ticker.volume_day) == (30000.0, 12.5)
+    assert ticker.market_cap is None
+
+
+def test_parsers_are_shared_and_named_for_the_cache_key():
+    assert parser() is None
+    assert parser(typed=True) is parser(typed=True)
+    assert [parser(True).__name__, parser(False, False).__name__,
+            parser(True, False).__name__] == [
+        "parse_typed", "parse_raw_without_display",
+        "parse_typed_without_display"]
+
+
+def test_parsers_raise_error_messages():
+    body = json.dumps({"Response": "Error", "Message": "limit"})
+    with pytest.raises(CryptoCompareError, match="limit"):
+        parser(True)(body)
+
+
+def test_full_data_without_display(client_factory):
+    cc = client_factory(_respond)
+    result = cc.multiple_symbols_full_data(["BTC"], ["USD"], display=False)
+    assert result == {"RAW": {"BTC": {"USD": RAW}}}
+
+
+def test_typed_full_data(client_factory):
+    cc = client_factory(_respond)
+    result = cc.multiple_symbols_full_data(["BTC"], ["USD"], typed=True)
+    assert result["RAW"]["BTC"]["USD"] == Ticker.from_api(RAW)
+    assert result["DISPLAY"] == FULL["DISPLAY"]
+
+
+def test_typed_prices(client_factory):
+    cc = client_factory(_respond)
+    assert cc.single_symbol_price("BTC", ["USD", "EUR"], typed=True) == {
+        "USD": PriceQuote("BTC", "USD", 30000.0),
+        "EUR": PriceQuote("BTC", "EUR", 28000.0)}
+    result = cc.multiple_symbols_price(["BTC", "ETH"], ["USD"], typed=True)
+    assert result["ETH"]["USD"] == PriceQuote("ETH", "USD", 2000.0)
+
+
+def test_typed_bars(client_factory):
+    cc = client_factory(_respond)
+    result = cc.historical_daily("BTC", "USD", typed=True)
+    assert result["Data"] == [Bar.from_api(BAR)]
+    assert result["TimeFrom"] == 86400
+
+
+def test_typed_and_raw_results_are_cached_apart(client_factory):
+    cc = client_factory(_respond)
+    typed = cc.multiple_symbols_full_data(["BTC"], ["USD"], typed=True)
+    raw = cc.multiple_symbols_full_data(["BTC"], ["USD"])
+    assert isinstance(typed["RAW"]["BTC"]["USD"], Ticker)
+    assert raw == FULL
+    cc.multiple_symbols_full_data(["BTC"], ["USD"], typed=True)
+    assert len(cc.transport.requests) == 2
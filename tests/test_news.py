@@ -0,0 +1,85 @@
+"""Incremental following of the news."""
+import pytest
+
+from cryptocompareapi.news import NewsFollower
+
+PAGE_SIZE = 5
+
+
+class Feed(object):
+    """Serves pages of the newest articles published up to lTs."""
+
+    def __init__(self):
+        self.articles = []
+
+    def publish(self, count):
+        start = len(self.articles)
+        self.articles.extend({"id": i, "published_on": 1000 + 10 * i,
+                              "title": "Article %d" % i}
+                             for i in range(start, start + count))
+
+    def __call__(self, path, params):
+        last = params.get("lTs")
+        page = [a for a in reversed(self.articles)
+                if last is None or a["published_on"] <= last]
+        return {"Type": 100, "Message": "News list successfully returned",
+                "Data": page[:PAGE_SIZE]}
+
+
+@pytest.fixture
+def feed():
+    feed = Feed()
+    feed.publish(3)
+    return feed
+
+
+def test_first_poll_yields_the_latest_page(feed, client_factory):
+    follower = NewsFollower(client_factory(feed, cache=False))
+    assert [a["id"] for a in follower.poll()] == [0, 1, 2]
+    assert follower.poll() == []
+    feed.publish(2)
+    assert [a["id"] for a in follower.poll()] == [3, 4]
+    assert follower.high_water_mark == 1040
+
+
+def test_gaps_are_filled_from_older_pages(feed, client_factory):
+    cc = client_factory(feed, cache=False)
+    follower = NewsFollower(cc)
+    follower.poll()
+    feed.publish(12)  # More than a page since the last poll
+    requests = len(cc.transport.requests)
+    assert [a["id"] for a in follower.poll()] == list(range(3, 15))
+    assert len(cc.transport.requests) - requests == 3
+
+
+def test_start_catches_up(feed, client_factory):
+    feed.publish(10)
+    follower = NewsFollower(client_factory(feed, cache=False), start=1050)
+    assert [a["id"] for a in follower.poll()] == list(range(5, 13))
+
+
+def test_checkpoint(feed, client_factory, tmp_path):
+    checkpoint = str(tmp_path / "news.json")
+    cc = client_factory(feed, cache=False)
+    NewsFollower(cc, checkpoint=checkpoint).poll()
+    other = NewsFollower(cc, feeds=["coindesk"], checkpoint=checkpoint)
+    assert other.high_water_mark is None
+    other.poll()
+
+    feed.publish(2)
+    restarted = NewsFollower(cc, checkpoint=checkpoint)
+    assert restarted.seen(2) and restarted.high_water_mark == 1020
+    assert [a["id"] for a in restarted.poll()] == [3, 4]
+    assert NewsFollower(cc, feeds="coindesk",
+                        checkpoint=checkpoint).high_water_mark == 1020
+
+
+def test_follow_polls_at_the_interval(feed, client_factory):
+    sleeps = []
+    follower = NewsFollower(client_factory(feed, cache=False), seen_size=2)
+    articles = follower.follow(interval=5, sleep=sleeps.append)
+    assert [next(articles)["id"] for _ in range(3)] == [0, 1, 2]
+    feed.publish(1)
+    assert next(articles)["id"] == 3
+    assert sleeps == [5]
+    assert not follower.seen(1) and follower.seen(3)
@@ -0,0 +1,50 @@
+"""Lazy imports of the package."""
+import subprocess
+import sys
+
+import pytest
+
+import cryptocompareapi
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-c", code], check=True,
+                          capture_output=True, text=True).stdout.split()
+
+
+def test_import_loads_no_http_libraries():
+    loaded = _run("import sys, cryptocompareapi\n"
+                  "print(*sorted({'requests', 'urllib3', 'aiohttp', 'numpy',"
+                  " 'cryptocompareapi.wrapper'} & set(sys.modules)))")
+    assert loaded == []
+
+
+def test_backfill_is_the_function_after_importing_the_submodules():
+    import cryptocompareapi.store  # noqa: F401 imports the backfilling
+    assert callable(cryptocompareapi.backfill)
+    assert cryptocompareapi.backfill.__module__ == \
+        "cryptocompareapi.backfilling"
+
+
+@pytest.mark.parametrize("name", sorted(cryptocompareapi._LAZY))
+def test_lazy_names_resolve(name):
+    value = getattr(cryptocompareapi, name)
+    module = cryptocompareapi._LAZY[name]
+    assert value is getattr(getattr(cryptocompareapi, module), name)
+
+
+def test_submodules_are_attributes():
+    for name in cryptocompareapi._SUBMODULES:
+        if name != "analytics":  # Requires numpy
+            assert getattr(cryptocompareapi, name).__name__ == \
+                "cryptocompareapi." + name
+
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError):
+        cryptocompareapi.missing
+
+
+def test_dir_lists_the_lazy_names():
+    names = dir(cryptocompareapi)
+    assert {"CryptoCompare", "backfill", "backfilling"} <= set(names)
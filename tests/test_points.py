@@ -0,0 +1,84 @@
+"""Bulk lookups of historical prices."""
+from cryptocompareapi.methods import CryptoCompareMethod
+from cryptocompareapi.points import _point_params, _windows, historical_prices
+
+DAY = 86400
+START = 1600000000 // DAY * DAY
+MISSING = START + 5 * DAY  # A day without trades
+
+
+def _close(time):
+    return 0.0 if time == MISSING else float((time - START) // DAY + 1)
+
+
+def _prices(path, params):
+    if path == "/data/pricehistorical":
+        return {params["fsym"]: {params["tsym"]: 42.0}}
+    assert path == "/data/histoday"
+    end = params["toTs"]
+    return {"Response": "Success",
+            "Data": [{"time": end - i * DAY, "open": 1.0, "high": 1.0,
+                      "low": 1.0, "close": _close(end - i * DAY),
+                      "volumefrom": 1.0, "volumeto": 1.0}
+                     for i in reversed(range(params["limit"] + 1))]}
+
+
+def test_windows_split_distant_bars():
+    times = [0, 10, 20, 1000, 1010]
+    assert _windows(times, 10, 50) == [(1010, 1), (20, 2)]
+    assert _windows(times, 10, 200) == [(1010, 101)]
+    assert _windows([], 10, 50) == []
+
+
+def test_a_year_of_points_takes_one_request(client_factory):
+    cc = client_factory(_prices)
+    points = [("BTC", "USD", START + i * DAY + 3600) for i in range(365)
+              if START + i * DAY != MISSING]
+    prices = historical_prices(cc, points, fallback=False)
+    assert cc.transport.paths() == ["/data/histoday"]
+    assert prices == [_close(ts // DAY * DAY) for _, _, ts in points]
+
+
+def test_pairs_and_distant_points_are_requested_apart(client_factory):
+    cc = client_factory(_prices)
+    points = [("BTC", "USD", START), ("ETH", "USD", START),
+              ("BTC", "USD", START + 100 * DAY)]
+    prices = historical_prices(cc, points, page_size=50)
+    assert len(cc.transport.requests) == 3
+    assert prices == [1.0, 1.0, 101.0]
+
+
+def test_prices_are_cached_as_day_timestamp_results(client_factory):
+    cc = client_factory(_prices)
+    points = [("BTC", "USD", START + i * DAY) for i in range(3)]
+    historical_prices(cc, points)
+    assert cc.historical_day_timestamp("BTC", "USD", START + DAY) == {
+        "BTC": {"USD": 2.0}}
+    assert historical_prices(cc, points) == [1.0, 2.0, 3.0]
+    assert len(cc.transport.requests) == 1
+
+
+def test_unresolved_points_fall_back_to_day_timestamp(client_factory):
+    cc = client_factory(_prices)
+    points = [("BTC", "USD", START), ("BTC", "USD", MISSING)]
+    assert historical_prices(cc, points, fallback=False) == [1.0, None]
+    assert historical_prices(cc, points) == [1.0, 42.0]
+    assert cc.transport.paths()[-1] == "/data/pricehistorical"
+
+
+def test_hour_points_are_not_cached(client_factory):
+    def hours(path, params):
+        assert path == "/data/histohour"
+        return {"Response": "Success",
+                "Data": [{"time": params["toTs"] - i * 3600, "open": 1.0,
+                          "high": 1.0, "low": 1.0, "close": 2.0,
+                          "volumefrom": 1.0, "volumeto": 1.0}
+                         for i in reversed(range(params["limit"] + 1))]}
+
+    cc = client_factory(hours)
+    points = [("BTC", "USD", START + 7200), ("BTC", "USD", START + 90)]
+    assert historical_prices(cc, points, resolution="hour") == [2.0, 2.0]
+    key = cc._cache_key(CryptoCompareMethod.HISTO_DAY_TIMESTAMP,
+                        _point_params("BTC", "USD", START + 90, "CCCAGG",
+                                      True))
+    assert cc.cache.get(key) == (False, None)
@@ -0,0 +1,71 @@
+"""The client-side rate limiter."""
+import pytest
+
+from cryptocompareapi.methods import RateLimitGroup
+from cryptocompareapi.ratelimit import RateLimiter
+
+PRICE = RateLimitGroup.PRICE
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter({PRICE: {"second": 2, "minute": 3}}, clock=clock)
+
+
+def test_calls_are_paced(limiter, clock):
+    assert [limiter.reserve(PRICE) for _ in range(3)] == [0.0, 0.0, 0.5]
+    # The minute bucket refills a call every 20 seconds
+    assert limiter.reserve(PRICE) == pytest.approx(20.0)
+    clock.now = 40.0
+    assert limiter.reserve(PRICE) == 0.0
+
+
+def test_try_acquire_does_not_reserve_when_limited(limiter, clock):
+    assert limiter.try_acquire(PRICE)
+    assert limiter.try_acquire(PRICE)
+    assert not limiter.try_acquire(PRICE)
+    clock.now = 0.5
+    assert limiter.try_acquire(PRICE)
+    assert limiter.counts(PRICE) == {"second": 3, "minute": 3, "hour": 3}
+
+
+def test_acquire_sleeps_for_the_delay(clock):
+    sleeps = []
+    limiter = RateLimiter({PRICE: {"second": 1}}, clock=clock,
+                          sleep=sleeps.append)
+    limiter.acquire(PRICE)
+    limiter.acquire(PRICE)
+    assert sleeps == [1.0]
+
+
+def test_unlimited_groups_are_not_delayed(limiter):
+    assert all(limiter.reserve(RateLimitGroup.NO) == 0.0 for _ in range(10))
+
+
+def test_counts_reset_with_the_period(limiter, clock):
+    limiter.try_acquire(PRICE)
+    clock.now = 1.0
+    assert limiter.counts(PRICE) == {"second": 0, "minute": 1, "hour": 1}
+
+
+def test_seed_from_the_rate_limits(clock):
+    limiter = RateLimiter({}, clock=clock)
+    limiter.seed({
+        "Second": {"CallsMade": {"Price": 9}, "CallsLeft": {"Price": 1}},
+        "Minute": {"CallsMade": {"Price": 10}, "CallsLeft": {"Price": 90}},
+    })
+    assert limiter.counts(PRICE) == {"second": 9, "minute": 10, "hour": 0}
+    assert limiter.reserve(PRICE) == 0.0
+    assert limiter.reserve(PRICE) == pytest.approx(0.1)
+
+
+def test_client_acquires_per_request(client_factory, clock):
+    sleeps = []
+    limiter = RateLimiter({PRICE: {"second": 1}}, clock=clock,
+                          sleep=sleeps.append)
+    cc = client_factory(lambda path, params: {"USD": 1.0}, cache=False,
+                        rate_limiter=limiter)
+    for _ in range(3):
+        cc.single_symbol_price("BTC", "USD")
+    assert sleeps == [1.0, 2.0]
+    assert limiter.counts(PRICE)["minute"] == 3
@@ -0,0 +1,131 @@
+"""Retries and circuit breaking against a local stand-in of the API."""
+import asyncio
+
+import pytest
+
+from benchmarks.mockserver import MockServer
+from cryptocompareapi import CircuitOpenError, CryptoCompare, HttpError
+from cryptocompareapi.aio import AsyncCryptoCompare
+from cryptocompareapi.methods import RateLimitGroup
+from cryptocompareapi.resilience import (CircuitBreaker, ResiliencePolicy,
+                                         RetryPolicy)
+
+
+def _policy(clock, max_retries=2):
+    return ResiliencePolicy(retry=RetryPolicy(max_retries=max_retries),
+                            failure_threshold=3, reset_timeout=10.0,
+                            hedge_groups=(), clock=clock,
+                            sleep=lambda seconds: None)
+
+
+def test_breaker_opens_and_recovers(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0,
+                             clock=clock)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    clock.now = 10.0
+    breaker.allow()  # The trial request
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_opens_again(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0,
+                             clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retried_calls_count_one_failure(clock):
+    policy = _policy(clock)
+    with MockServer(error_rate=1.0, error_status=503) as server:
+        cc = CryptoCompare("tests", base_url=server.url, cache=False,
+                           resilience=policy)
+        for calls in range(1, 3):
+            with pytest.raises(HttpError) as info:
+                cc.top_pairs("BTC")
+            assert info.value.status_code == 503
+            assert policy.breaker(RateLimitGroup.PRICE).failures == calls
+        assert server.requests == 6  # The first attempts and two retries
+        with pytest.raises(HttpError):
+            cc.top_pairs("BTC")
+        with pytest.raises(CircuitOpenError):
+            cc.top_pairs("BTC")
+        assert server.requests == 9
+        cc.close()
+
+
+def test_wrong_requests_do_not_open_the_circuit(clock):
+    policy = _policy(clock)
+    with MockServer(fixtures={}) as server:
+        cc = CryptoCompare("tests", base_url=server.url, cache=False,
+                           resilience=policy)
+        for _ in range(6):
+            with pytest.raises(HttpError) as info:
+                cc.top_pairs("BTC")
+            assert info.value.status_code == 404
+        assert server.requests == 6  # A 404 is not retried
+        assert policy.breaker(RateLimitGroup.PRICE).state == "closed"
+        cc.close()
+
+
+def test_transient_errors_are_retried(clock):
+    with MockServer(error_rate=0.5, error_status=503, seed=1) as server:
+        cc = CryptoCompare("tests", base_url=server.url, cache=False,
+                           resilience=_policy(clock, max_retries=10))
+        for _ in range(20):
+            assert cc.top_pairs("BTC")["Response"] == "Success"
+        assert server.requests > 20
+        cc.close()
+
+
+def _half_open(policy, clock):
+    breaker = policy.breaker(RateLimitGroup.PRICE)
+    for _ in range(policy.failure_threshold):
+        breaker.record_failure()
+    clock.now += policy.reset_timeout
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_cancelled_trial_releases_the_circuit(clock):
+    policy = _policy(clock)
+    breaker = _half_open(policy, clock)
+
+    async def run(timeout):
+        async with AsyncCryptoCompare("tests", base_url=server.url,
+                                      cache=False, resilience=policy) as cc:
+            return await asyncio.wait_for(cc.top_pairs("BTC"), timeout)
+
+    with MockServer(latency=0.5) as server:
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(run(0.05))
+        assert breaker.state == "open"
+        clock.now += policy.reset_timeout
+        server.latency = 0.0
+        assert asyncio.run(run(5))["Response"] == "Success"
+    assert breaker.state == "closed"
+
+
+def test_interrupted_trial_releases_the_circuit(clock):
+    policy = _policy(clock)
+    breaker = _half_open(policy, clock)
+
+    def interrupted(event):
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        policy.call(interrupted, RateLimitGroup.PRICE)
+    assert breaker.state == "open"
+    clock.now += policy.reset_timeout
+    assert policy.call(lambda event: b"{}", RateLimitGroup.PRICE) == b"{}"
+    assert breaker.state == "closed"
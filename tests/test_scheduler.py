@@ -0,0 +1,117 @@
+"""Polling of subscriptions by the Scheduler."""
+from cryptocompareapi.models import PriceQuote
+from cryptocompareapi.scheduler import Scheduler
+
+PRICES = {"BTC": {"USD": 30000.0, "EUR": 28000.0}, "ETH": {"USD": 2000.0}}
+
+
+def _prices(path, params):
+    if path == "/data/price":
+        return {tsym: PRICES[params["fsym"]][tsym]
+                for tsym in params["tsyms"].split(",")}
+    if path != "/data/pricemulti":
+        return {"Response": "Success", "Data": []}
+    return {fsym: {tsym: PRICES[fsym][tsym]
+                   for tsym in params["tsyms"].split(",")
+                   if tsym in PRICES[fsym]}
+            for fsym in params["fsyms"].split(",")}
+
+
+def test_single_prices_are_batched(client_factory, clock):
+    cc = client_factory(_prices)
+    scheduler = Scheduler(cc, clock=clock)
+    updates = []
+    scheduler.subscribe("single_symbol_price", "BTC", "USD,EUR",
+                        callback=lambda sub, value: updates.append(value))
+    scheduler.subscribe("single_symbol_price", "ETH", ["USD"],
+                        callback=lambda sub, value: updates.append(value))
+    assert scheduler.run_pending() == 2
+    assert cc.transport.paths() == ["/data/pricemulti"]
+    assert updates == [PRICES["BTC"], PRICES["ETH"]]
+
+
+def test_typed_prices_are_fetched_on_their_own(client_factory, clock):
+    cc = client_factory(_prices)
+    scheduler = Scheduler(cc, clock=clock)
+    plain = scheduler.subscribe("single_symbol_price", "BTC", "USD")
+    typed = scheduler.subscribe("single_symbol_price", "ETH", "USD",
+                                typed=True)
+    scheduler.run_pending()
+    assert sorted(cc.transport.paths()) == ["/data/price", "/data/pricemulti"]
+    assert plain.value == {"USD": 30000.0}
+    assert isinstance(typed.value["USD"], PriceQuote)
+
+
+def test_unchanged_values_are_not_notified(client_factory, clock):
+    cc = client_factory(_prices)
+    scheduler = Scheduler(cc, clock=clock)
+    updates = []
+    subscription = scheduler.subscribe(
+        "single_symbol_price", "BTC", "USD",
+        callback=lambda sub, value: updates.append(value))
+    scheduler.run_pending()
+    assert scheduler.run_pending() == 0
+    clock.now = subscription.due
+    assert scheduler.run_pending() == 1
+    assert len(cc.transport.requests) == 2
+    assert updates == [{"USD": 30000.0}]
+
+
+def test_callback_errors_are_reported(client_factory, clock):
+    cc = client_factory(_prices)
+    errors = []
+    updates = []
+    scheduler = Scheduler(cc, on_error=lambda sub, e: errors.append(e),
+                          on_update=lambda sub, value: updates.append(sub),
+                          clock=clock)
+
+    def fail(sub, value):
+        raise RuntimeError("callback failed")
+
+    failing = scheduler.subscribe("single_symbol_price", "BTC", "USD",
+                                  callback=fail)
+    other = scheduler.subscribe("top_volumes", "USD")
+    assert scheduler.run_pending() == 2
+    assert [str(e) for e in errors] == ["callback failed"]
+    assert updates == [failing, other]
+    assert failing.due > clock.now and other.due > clock.now
+
+
+def test_fetch_errors_are_logged_without_on_error(client_factory, clock,
+                                                  caplog):
+    def fail(path, params):
+        return {"Response": "Error", "Message": "rate limit"}
+
+    scheduler = Scheduler(client_factory(fail), clock=clock)
+    subscription = scheduler.subscribe("top_volumes", "USD")
+    scheduler.run_pending()
+    assert "Polling" in caplog.text
+    assert subscription.due > clock.now
+
+
+def test_periods_are_aligned(client_factory, clock):
+    clock.now = 1003.0
+    scheduler = Scheduler(client_factory(_prices), offset=0.5, clock=clock)
+    price = scheduler.subscribe("single_symbol_price", "BTC", "USD")
+    volumes = scheduler.subscribe("top_volumes", "USD", every=150)
+    assert volumes.period == 240  # A multiple of the caching of 120s
+    scheduler.run_pending()
+    assert price.due == 1010.5
+    assert volumes.due == 1200.5
+    assert scheduler.next_due() == 1010.5
+
+
+def test_large_batches_bypass_the_cache(client_factory, clock):
+    symbols = ["C%d" % i for i in range(200)]
+
+    def prices(path, params):
+        return {fsym: {"USD": 1.0} for fsym in params["fsyms"].split(",")}
+
+    cc = client_factory(prices)
+    scheduler = Scheduler(cc, clock=clock)
+    for symbol in symbols:
+        scheduler.subscribe("single_symbol_price", symbol, "USD")
+    scheduler.run_pending()
+    assert len(cc.transport.requests) > 1
+    assert len(cc.cache) == 0
+    assert all(s.value == {"USD": 1.0} for s in scheduler.subscriptions)
@@ -0,0 +1,115 @@
+"""The cache and the rate limiter shared by processes."""
+import multiprocessing
+import os
+import pickle
+import stat
+
+import pytest
+
+from cryptocompareapi import CryptoCompare
+from cryptocompareapi.columnar import OHLCV
+from cryptocompareapi.methods import RateLimitGroup
+from cryptocompareapi.models import Bar, PriceQuote, Ticker
+from cryptocompareapi.shared import (SharedRateLimiter, SQLiteCache, dumps,
+                                     loads)
+
+PRICE = RateLimitGroup.PRICE
+BAR = {"time": 60, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5,
+       "volumefrom": 3.0, "volumeto": 4.5}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite")
+
+
+def test_values_round_trip():
+    bars = OHLCV.from_bars([BAR, dict(BAR, time=120)])
+    value = {"Data": [Bar.from_api(BAR)], "bars": bars,
+             "BTC": {"USD": PriceQuote("BTC", "USD", 1.5)},
+             "RAW": Ticker.from_api({"PRICE": 2.0, "FROMSYMBOL": "BTC"})}
+    loaded = loads(dumps(value))
+    assert list(loaded.pop("bars")) == list(bars)
+    assert loaded == {key: item for key, item in value.items()
+                      if key != "bars"}
+
+
+def test_pickles_are_not_loaded():
+    with pytest.raises(ValueError):
+        loads(pickle.dumps({"Data": []}))
+
+
+def test_cache_is_shared_and_private(path, clock):
+    first = SQLiteCache(path, clock=clock)
+    second = SQLiteCache(path, clock=clock)
+    first.set(("PRICE", ()), {"USD": 1.0}, 10)
+    assert second.get(("PRICE", ())) == (True, {"USD": 1.0})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    clock.now = 10
+    assert second.get(("PRICE", ())) == (False, None)
+    assert second.stats.expirations == 1
+
+
+def test_cache_evicts_the_entries_expiring_first(path, clock):
+    cache = SQLiteCache(path, maxsize=2, clock=clock)
+    cache.set("a", 1, 30)
+    cache.set("b", 2, 10)
+    cache.set("c", 3, 20)
+    assert len(cache) == 2
+    assert cache.get("b") == (False, None)
+    assert cache.stats.evictions == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_limiter_is_shared(path, clock):
+    limits = {PRICE: {"second": 2}}
+    first = SharedRateLimiter(path, limits, clock=clock)
+    second = SharedRateLimiter(path, {PRICE: {"second": 100}}, clock=clock)
+    assert first.try_acquire(PRICE)
+    assert second.try_acquire(PRICE)
+    assert not first.try_acquire(PRICE)
+    assert second.reserve(PRICE) == 0.5
+    assert first.counts(PRICE) == {"second": 3, "minute": 3, "hour": 3}
+
+
+def test_limiter_seed(path, clock):
+    limiter = SharedRateLimiter(path, {}, clock=clock)
+    limiter.seed({"Minute": {"CallsMade": {"Price": 59},
+                             "CallsLeft": {"Price": 1}}})
+    assert limiter.counts(PRICE)["minute"] == 59
+    assert limiter.try_acquire(PRICE)
+    assert not SharedRateLimiter(path, clock=clock).try_acquire(PRICE)
+
+
+def _acquire(path, calls, results):
+    limiter = SharedRateLimiter(path)
+    results.put(sum(limiter.try_acquire(RateLimitGroup.STRICT)
+                    for _ in range(calls)))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="requires fork")
+def test_processes_share_the_budget(path):
+    SharedRateLimiter(path)  # STRICT allows 1 call per second
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=_acquire, args=(path, 5, results))
+                 for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    assert sum(results.get(timeout=5) for _ in processes) == 1
+
+
+def test_shared_clients(path, client_factory):
+    cc = client_factory(lambda path, params: {"USD": 1.0})
+    other = CryptoCompare.shared("tests", path, transport=cc.transport,
+                                 base_url=cc.base_url)
+    again = CryptoCompare.shared("tests", path, transport=cc.transport,
+                                 base_url=cc.base_url)
+    assert other.single_symbol_price("BTC", "USD") == {"USD": 1.0}
+    assert again.single_symbol_price("BTC", "USD") == {"USD": 1.0}
+    assert len(cc.transport.requests) == 1
+    assert again.rate_limiter.counts(PRICE)["minute"] == 1
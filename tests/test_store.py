@@ -0,0 +1,68 @@
+"""The persistent OHLCV store."""
+import pytest
+
+from cryptocompareapi import store as store_module
+from cryptocompareapi.columnar import COLUMNS
+from cryptocompareapi.store import RECORD, OHLCVStore
+
+MINUTE = 60
+START = 1600000000 // MINUTE * MINUTE
+
+
+def _bar(time):
+    return {"time": time, "open": 1.0, "high": 2.0, "low": 0.5,
+            "close": float(time), "volumefrom": 1.0, "volumeto": 1.0}
+
+
+def _histo(path, params):
+    end = params["toTs"]
+    return {"Response": "Success",
+            "Data": [_bar(end - i * MINUTE)
+                     for i in reversed(range(params["limit"] + 1))]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(str(tmp_path))
+
+
+def test_append_and_read(store):
+    times = [START + i * MINUTE for i in range(10)]
+    assert store.append("BTC", "USD", [_bar(t) for t in reversed(times)],
+                        "minute") == 10
+    assert store.append("BTC", "USD", [_bar(times[-1]), _bar(times[0])],
+                        "minute") == 0
+    assert store.last_timestamp("BTC", "USD", "minute") == times[-1]
+    bars = store.read("BTC", "USD", times[2], times[5], "minute")
+    assert list(bars.time) == times[2:6]
+    assert list(bars)[0] == {name: _bar(times[2])[name] for name in COLUMNS}
+    assert len(store.read("BTC", "USD", resolution="minute")) == 10
+
+
+def test_read_missing_pairs(store):
+    assert len(store.read("ETH", "USD")) == 0
+    assert store.last_timestamp("ETH", "USD") is None
+
+
+def test_partial_records_are_dropped(store):
+    store.append("BTC", "USD", [_bar(START)])
+    with open(store.path("BTC", "USD"), "ab") as f:
+        f.write(b"\0" * (RECORD.size // 2))
+    store.append("BTC", "USD", [_bar(START + 86400)])
+    assert list(store.read("BTC", "USD").time) == [START, START + 86400]
+
+
+def test_sync_appends_pages_in_order(store, client_factory, monkeypatch):
+    cc = client_factory(_histo, cache=False)
+    now = START + 5000 * MINUTE
+    monkeypatch.setattr(store_module.time, "time", lambda: now)
+    assert store.sync(cc, "BTC", "USD", START, "minute") == 5000
+    times = list(store.read("BTC", "USD", resolution="minute").time)
+    assert times == list(range(START, now, MINUTE))
+
+    requests = len(cc.transport.requests)
+    now += 10 * MINUTE
+    assert store.sync(cc, "BTC", "USD", START, "minute") == 10
+    assert len(cc.transport.requests) == requests + 1
+    assert store.last_timestamp("BTC", "USD", "minute") == now - MINUTE
+    assert store.sync(cc, "BTC", "USD", START, "minute") == 0
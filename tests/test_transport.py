@@ -0,0 +1,71 @@
+"""The pooled HTTP transport."""
+import pytest
+
+from benchmarks.mockserver import MockServer
+from cryptocompareapi import HttpError, TimeoutException
+from cryptocompareapi.metrics import CallEvent
+from cryptocompareapi.methods import CryptoCompareMethod
+from cryptocompareapi.transport import RequestsTransport
+
+METHOD = CryptoCompareMethod.TOP_PAIRS
+
+
+@pytest.fixture
+def transport():
+    transport = RequestsTransport()
+    yield transport
+    transport.close()
+
+
+def test_get_returns_the_body(transport):
+    with MockServer() as server:
+        body = transport.get(METHOD.url(server.url), {}, 5)
+        assert body == server.bodies[METHOD.path]
+
+
+def test_connections_are_reused(transport):
+    with MockServer() as server:
+        url = METHOD.url(server.url)
+        for _ in range(5):
+            transport.get(url, {}, 5)
+        adapter = transport.session.get_adapter(url)
+        pools = list(adapter.poolmanager.pools._container.values())
+    assert len(pools) == 1
+    assert pools[0].num_connections == 1
+
+
+def test_events_get_the_timings(transport):
+    event = CallEvent(METHOD)
+    with MockServer() as server:
+        transport.get(METHOD.url(server.url), {}, 5, event)
+    assert set(event.timings) >= {"ttfb", "download"}
+    assert event.retries == 0
+
+
+def test_error_status_is_raised(transport):
+    with MockServer(error_rate=1.0, error_status=503) as server:
+        with pytest.raises(HttpError) as info:
+            transport.get(METHOD.url(server.url), {}, 5)
+        with pytest.raises(HttpError):
+            list(transport.stream(METHOD.url(server.url), {}, 5))
+    assert info.value.status_code == 503
+
+
+def test_timeouts_are_raised(transport):
+    with MockServer(latency=0.5) as server:
+        with pytest.raises(TimeoutException):
+            transport.get(METHOD.url(server.url), {}, 0.05)
+
+
+def test_stream_yields_the_body_in_chunks(transport):
+    with MockServer() as server:
+        chunks = list(transport.stream(METHOD.url(server.url), {}, 5,
+                                       chunk_size=100))
+        assert b"".join(chunks) == server.bodies[METHOD.path]
+    assert len(chunks) > 1
+
+
+def test_stream_timeouts_are_raised(transport):
+    with MockServer(latency=0.5) as server:
+        with pytest.raises(TimeoutException):
+            transport.stream(METHOD.url(server.url), {}, 0.05)